@@ -6,7 +6,9 @@
 
 from connectors.core.connector import get_logger, ConnectorError
 
+from .cmdb_mirror import get_cached_response
 from .constants import *
+from .list_query import ListQuery
 from .utils import *
 from .utils import _api_request, _validate_vdom
 
@@ -26,10 +28,11 @@ def generate_body_param(config, params):
         elif params.get('type') == 'FQDN':
             data.update({'fqdn': params.get('fqdn'), 'type': 'fqdn'})
         elif params.get('type') == 'Geography':
-            for item in country_list:
-                if item.get('name') == params.get('country'):
-                    data.update({'type': 'geography', 'country': item.get('id')})
-                    return data
+            from .country_catalog import get_country_catalog
+            country_id = get_country_catalog(config).id_for(params.get('country'))
+            if country_id:
+                data.update({'type': 'geography', 'country': country_id})
+                return data
         elif params.get('type') == 'Device (MAC Address)':
             if params.get('scope') == 'Single Address':
                 data.update({'start-mac': params.get('mac_addrs'), 'end-mac': params.get('mac_addrs'),
@@ -56,10 +59,11 @@ def generate_ipv6_body_param(config, params):
         elif params.get('type') == 'IPv6 FQDN':
             data.update({'fqdn': params.get('fqdn'), 'type': 'fqdn'})
         elif params.get('type') == 'IPv6 Geography':
-            for item in country_list:
-                if item.get('name') == params.get('country'):
-                    data.update({'type': 'geography', 'country': item.get('id')})
-                    return data
+            from .country_catalog import get_country_catalog
+            country_id = get_country_catalog(config).id_for(params.get('country'))
+            if country_id:
+                data.update({'type': 'geography', 'country': country_id})
+                return data
         elif params.get('type') == 'IPv6 Fabric Connector Address':
             data.update({'type': 'dynamic', 'sdn': params.get('sdn_connector')})
         elif params.get('type') == 'IPv6 Template':
@@ -99,13 +103,15 @@ def get_addresses(config, params):
         vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
         app_param = {'vdom': vdom_list} if vdom_list else {}
         if params.get('address_category') == 'IPv6 Address':
-            url = ADD_ADDRESS_IPv6
+            url, table = ADD_ADDRESS_IPv6, 'address6'
         else:
-            url = ADD_ADDRESS
+            url, table = ADD_ADDRESS, 'address'
+        query = ListQuery(params)
         if params.get('name'):
-            return _api_request(config, url + str(params.get('name')).replace('/', '%2f'), parameters=app_param)
+            return query.read(config, url + str(params.get('name')).replace('/', '%2f'), app_param, stale_ok=True)
         else:
-            return _api_request(config, url, parameters=app_param)
+            return query.read(config, url, app_param, cached=get_cached_response(config, table, vdom_list),
+                              paginate=True, stale_ok=True)
     except Exception as Err:
         raise ConnectorError(str(Err))
 
@@ -0,0 +1,196 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import ipaddress
+from bisect import bisect_right
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .object_expansion import merge_intervals, subtract_intervals
+from .utils import _api_request, _run_concurrently
+
+logger = get_logger('fortigate-firewall')
+
+
+def _member_interval(name):
+    """``(family, start, end)`` of a member named the way policy-based blocking names its address objects
+    (``10.0.0.5``, ``10.0.0.0/24`` or ``10.0.0.5-10.0.0.9``), or None for any other member."""
+    try:
+        if '-' in name:
+            first, last = (ipaddress.ip_address(part) for part in name.split('-', 1))
+            if first.version != last.version or first > last:
+                return None
+            return first.version, int(first), int(last)
+        network = ipaddress.ip_network(name)
+        return network.version, int(network.network_address), int(network.broadcast_address)
+    except ValueError:
+        return None
+
+
+def _ip_interval(ip):
+    network = ipaddress.ip_network(ip.strip(), strict=False)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+class AggregateMap(object):
+    """The members of a block group, split into the address objects policy-based blocking manages and the
+    others; managed objects are mapped to the addresses they cover, which their names encode.
+    """
+
+    def __init__(self, members, family):
+        self.family = family
+        self.managed = []
+        self.other = []
+        for name in members:
+            interval = _member_interval(name)
+            if interval and interval[0] == family:
+                self.managed.append((interval[1], interval[2], name))
+            else:
+                self.other.append(name)
+        self.managed.sort()
+        self._starts = [start for start, end, name in self.managed]
+        self.covered = merge_intervals((start, end) for start, end, name in self.managed)
+        self._covered_starts = [start for start, end in self.covered]
+
+    def split_by(self, start, end):
+        """Names of the managed objects that cover part of ``start`` - ``end`` and addresses outside it."""
+        position = bisect_right(self._starts, end)
+        return [name for first, last, name in self.managed[:position]
+                if last >= start and (first < start or last > end)]
+
+    def _covering(self, start):
+        position = bisect_right(self._covered_starts, start) - 1
+        return self.covered[position] if position >= 0 else None
+
+    def covers(self, start, end):
+        interval = self._covering(start)
+        return interval is not None and end <= interval[1]
+
+    def overlaps(self, start, end):
+        interval = self._covering(start)
+        if interval is not None and start <= interval[1]:
+            return True
+        position = bisect_right(self._covered_starts, start)
+        return position < len(self.covered) and self.covered[position][0] <= end
+
+
+def compact_intervals(intervals, family, density=COMPACTION_DENSITY, max_size=COMPACTION_MAX_SIZE):
+    """Fewest CIDR blocks and ranges that cover the merged ``intervals``.
+
+    Blocks are found top down in the CIDR tree. A block is taken whole when all of its addresses are in
+    ``intervals`` or, for blocks of at most ``max_size`` addresses, when at least ``density`` percent are;
+    the latter also blocks the gaps. Runs of adjacent blocks then become one range.
+    """
+    bits = 32 if family == 4 else 128
+    blocks = []
+
+    def _visit(start, prefix, items):
+        size = 1 << (bits - prefix)
+        covered = sum(end - begin + 1 for begin, end in items)
+        if covered == size or (size <= max_size and covered * 100 >= density * size):
+            blocks.append((start, start + size - 1))
+            return
+        middle = start + (size >> 1)
+        lower = [(begin, min(end, middle - 1)) for begin, end in items if begin < middle]
+        upper = [(max(begin, middle), end) for begin, end in items if end >= middle]
+        if lower:
+            _visit(start, prefix + 1, lower)
+        if upper:
+            _visit(middle, prefix + 1, upper)
+
+    if intervals:
+        _visit(0, 0, list(intervals))
+    return merge_intervals(blocks)
+
+
+def address_object(family, start, end):
+    """Name and payload of the address object covering ``start`` - ``end``, marked as created by the connector."""
+    address = ipaddress.IPv4Address if family == 4 else ipaddress.IPv6Address
+    first, last = address(start), address(end)
+    if start == end:
+        name = str(first)
+        subnet = '{0}/{1}'.format(first, first.max_prefixlen)
+    else:
+        networks = list(ipaddress.summarize_address_range(first, last))
+        if len(networks) > 1:
+            return '{0}-{1}'.format(first, last), {'name': '{0}-{1}'.format(first, last), 'type': 'iprange',
+                                                    'start-ip': str(first), 'end-ip': str(last),
+                                                    'comment': CONNECTOR_OBJECT_COMMENT}
+        name = subnet = str(networks[0])
+    payload = {'name': name, 'subnet': subnet} if family == 4 else {'name': name, 'ip6': subnet}
+    payload['comment'] = CONNECTOR_OBJECT_COMMENT
+    return name, payload
+
+
+def _create_objects(config, querystring, objects, family):
+    endpoint = ADD_ADDRESS if family == 4 else ADD_ADDRESS_IPv6
+    failed = []
+    for payload, response, error in _run_concurrently(config, lambda payload: _api_request(
+            config, endpoint, parameters=querystring, body=payload, method='POST'), objects):
+        # An object left behind by an earlier block covers the same addresses, since its name encodes them
+        if error is not None and 'already exists' not in str(error):
+            logger.error('Failed to create address object {0}: {1}'.format(payload.get('name'), error))
+            failed.append(payload.get('name'))
+    return failed
+
+
+def _delete_objects(config, querystring, names, family):
+    endpoint = DELETE_ADDRESS if family == 4 else DELETE_IPv6_ADDRESS
+    for name, response, error in _run_concurrently(config, lambda name: _api_request(
+            config, endpoint.format(ip_name=name.replace('/', '%2f')), parameters=querystring,
+            method='DELETE'), names):
+        if error is not None:
+            logger.debug('Address object {0} not deleted, it may still be referenced: {1}'.format(name, error))
+
+
+def update_compacted_group(config, vdom, ip_group_name, members, ip_type, block=(), unblock=()):
+    """Block the ``block`` and unblock the ``unblock`` IP addresses or CIDRs through the group, with the
+    addresses blocked through it compacted into as few address objects as ``compaction_density`` allows.
+
+    Unblocking an address inside an aggregate replaces the aggregate by the objects covering the rest of
+    it. Members that aren't objects named by policy-based blocking are kept as they are. Returns the
+    ``(added, removed, still_blocked)`` object names and the ``unblock`` entries that the resulting
+    objects still cover, which is none unless the compaction is wrong.
+    """
+    family = 6 if ip_type == 'IPv6' else 4
+    aggregates = AggregateMap(members, family)
+    added_intervals = merge_intervals((int(network.network_address), int(network.broadcast_address))
+                                      for network in ipaddress.collapse_addresses(
+        ipaddress.ip_network(ip, strict=False) for ip in block))
+    removed_intervals = merge_intervals((int(network.network_address), int(network.broadcast_address))
+                                        for network in ipaddress.collapse_addresses(
+        ipaddress.ip_network(ip, strict=False) for ip in unblock))
+    density = float(config.get('compaction_density') or COMPACTION_DENSITY)
+    max_size = int(config.get('compaction_max_size') or COMPACTION_MAX_SIZE)
+    if density < 100 and added_intervals:
+        # Only the addresses blocked now are widened to the density: a gap next to earlier blocks may be an
+        # address that was unblocked on purpose
+        added_intervals = compact_intervals(added_intervals, family, density, max_size)
+    # Gaps inside existing aggregates are blocked already and stay blocked; unblocked addresses are taken
+    # out last, so no widening covers them again
+    target = subtract_intervals(merge_intervals(aggregates.covered + added_intervals), removed_intervals)
+    objects = dict(address_object(family, start, end) for start, end in compact_intervals(target, family, 100))
+    blocking = AggregateMap(objects, family)
+    still_blocked = [ip for ip in unblock if blocking.overlaps(*_ip_interval(ip))]
+    current = {name for start, end, name in aggregates.managed}
+    added = [name for name in objects if name not in current]
+    removed = sorted(current - set(objects))
+    if not added and not removed:
+        return [], [], still_blocked
+    member_names = aggregates.other + list(objects)
+    if len(member_names) > MAX_GROUP_SIZE:
+        raise ConnectorError('Maximum {0} items exceeded for {1} group.'.format(MAX_GROUP_SIZE, ip_group_name))
+    querystring = {'vdom': ','.join(vdom)} if vdom else {}
+    failed = _create_objects(config, querystring, [objects[name] for name in added], family)
+    if failed:
+        raise ConnectorError('Failed to create address objects {0}'.format(', '.join(failed)))
+    endpoint = ADDRESS_GROUP_API if family == 4 else ADDRESS_GROUP_API_IPv6
+    _api_request(config, endpoint.format(ip_group_name=ip_group_name.replace('/', '%2f')), parameters=querystring,
+                 body={'member': [{'name': name} for name in member_names]}, method='PUT')
+    logger.debug('Address group {0}: added {1}, removed {2}'.format(ip_group_name, added, removed))
+    _delete_objects(config, querystring, removed, family)
+    return added, removed, still_blocked
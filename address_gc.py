@@ -0,0 +1,135 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import time
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .cmdb_mirror import get_table_rows
+from .constants import *
+from .utils import _api_request, _validate_vdom, _run_concurrently
+
+logger = get_logger('fortigate-firewall')
+
+GC_TABLES = ('address', 'address6', 'addrgrp', 'addrgrp6', 'policy')
+GROUP_REFERENCE_FIELDS = ('member', 'exclude-member')
+POLICY_REFERENCE_FIELDS = {4: ('srcaddr', 'dstaddr'), 6: ('srcaddr6', 'dstaddr6')}
+
+
+def is_connector_object(row):
+    """Whether an address object was created by the connector, which marks the comment of every address
+    object it creates for a block. Objects named after their own address by hand are left alone."""
+    return CONNECTOR_OBJECT_MARKER in (row.get('comment') or '')
+
+
+class ReferenceGraph(object):
+    """Which address groups and policies reference each address object, per IP family.
+
+    Edges come from the members and excluded members of the address groups and from the source and
+    destination addresses of the policies. A group referencing an object keeps it, whether or not the
+    group itself is in use.
+    """
+
+    def __init__(self, tables):
+        self.referrers = {4: {}, 6: {}}
+        for family, table in ((4, 'addrgrp'), (6, 'addrgrp6')):
+            for group in tables.get(table, []):
+                for field in GROUP_REFERENCE_FIELDS:
+                    for member in group.get(field) or []:
+                        self._add(family, member.get('name'), '{0}:{1}'.format(table, group.get('name')))
+        for policy in tables.get('policy', []):
+            for family, fields in POLICY_REFERENCE_FIELDS.items():
+                for field in fields:
+                    for member in policy.get(field) or []:
+                        self._add(family, member.get('name'), 'policy:{0}'.format(policy.get('policyid')))
+
+    def _add(self, family, name, referrer):
+        self.referrers[family].setdefault(name, set()).add(referrer)
+
+    def is_referenced(self, name, family):
+        return bool(self.referrers[family].get(name))
+
+    def orphans(self, rows, family):
+        """Names of the connector objects among ``rows`` that nothing references."""
+        return [row.get('name') for row in rows if is_connector_object(row)
+                and not self.is_referenced(row.get('name'), family)]
+
+
+def _delete_batch(config, vdom, family, names):
+    endpoint = DELETE_ADDRESS if family == 4 else DELETE_IPv6_ADDRESS
+    querystring = {'vdom': vdom} if vdom else {}
+    deleted, not_deleted = [], []
+    for name, response, error in _run_concurrently(config, lambda name: _api_request(
+            config, endpoint.format(ip_name=name.replace('/', '%2f')), parameters=querystring,
+            method='DELETE'), names):
+        if error is not None:
+            # Referenced by a table outside the graph (VIP, proxy or local-in policy, ...) or since the read
+            logger.info('Address object {0} not deleted: {1}'.format(name, error))
+            not_deleted.append(name)
+        else:
+            deleted.append(name)
+    return deleted, not_deleted
+
+
+def _vdom_orphans(config, vdom):
+    """Tables of one VDOM and its ``(family, name)`` orphans; objects and references don't cross VDOMs."""
+    tables = {table: get_table_rows(config, table, [vdom] if vdom else []) for table in GC_TABLES}
+    graph = ReferenceGraph(tables)
+    orphans = [(4, name) for name in graph.orphans(tables['address'], 4)] + \
+              [(6, name) for name in graph.orphans(tables['address6'], 6)]
+    return tables, orphans
+
+
+def collect_orphaned_addresses(config, params):
+    """Delete the address objects created by the connector that no address group or policy references.
+
+    The address, address group and policy tables of each VDOM are read once (from the CMDB mirror when
+    enabled) and the orphans of the VDOM are deleted in it, ``batch_size`` at a time, with
+    ``batch_interval`` seconds between the batches to spare the management plane. Only objects carrying
+    the connector's comment marker are candidates. FortiOS refuses to delete an object that is still
+    referenced, so references the graph doesn't cover only show up as ``not_deleted``.
+    """
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        dry_run = params.get('dry_run', True) is not False
+        batch_size = max(int(params.get('batch_size') or GC_BATCH_SIZE), 1)
+        batch_interval = float(params.get('batch_interval') if params.get('batch_interval') not in (None, '')
+                               else GC_BATCH_INTERVAL)
+        max_deletions = int(params.get('max_deletions') or 0)
+        result = {'vdom': vdom_list[0] if vdom_list else None, 'dry_run': dry_run, 'scanned': 0,
+                  'connector_objects': 0, 'orphaned': [], 'deleted': [], 'not_deleted': [], 'passes': 0,
+                  'remaining': 0, 'vdoms': {}}
+        orphans = []
+        for vdom in vdom_list or [None]:
+            tables, vdom_orphans = _vdom_orphans(config, vdom)
+            result['scanned'] += len(tables['address']) + len(tables['address6'])
+            result['connector_objects'] += sum(1 for table in ('address', 'address6') for row in tables[table]
+                                               if is_connector_object(row))
+            result['orphaned'] += [name for family, name in vdom_orphans]
+            result['vdoms'][vdom or ''] = {'orphaned': [name for family, name in vdom_orphans], 'deleted': [],
+                                           'not_deleted': []}
+            orphans += [(vdom, family, name) for family, name in vdom_orphans]
+        selected = orphans[:max_deletions] if max_deletions else orphans
+        result['remaining'] = len(orphans) - len(selected)
+        if dry_run:
+            return result
+        for position in range(0, len(selected), batch_size):
+            if position:
+                time.sleep(batch_interval)
+            batch = selected[position:position + batch_size]
+            for vdom, family in sorted({(vdom, family) for vdom, family, name in batch}, key=str):
+                names = [name for name_vdom, name_family, name in batch if (name_vdom, name_family) == (vdom, family)]
+                deleted, not_deleted = _delete_batch(config, vdom, family, names)
+                result['deleted'] += deleted
+                result['not_deleted'] += not_deleted
+                result['vdoms'][vdom or '']['deleted'] += deleted
+                result['vdoms'][vdom or '']['not_deleted'] += not_deleted
+            result['passes'] += 1
+        logger.info('Deleted {0} orphaned address objects in {1} passes, {2} not deleted'.format(
+            len(result['deleted']), result['passes'], len(result['not_deleted'])))
+        return result
+    except Exception as Err:
+        raise ConnectorError(str(Err))
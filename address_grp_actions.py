@@ -6,15 +6,17 @@
 
 from connectors.core.connector import get_logger, ConnectorError
 
+from .cmdb_mirror import get_cached_response
 from .constants import *
+from .list_query import ListQuery
 from .utils import *
-from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list
+from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list, _fan_out_vdoms
 
 logger = get_logger('fortigate-firewall')
 
 
 def get_members_list(config, params, vdom_list):
-    curr_mem_list = get_address_groups(config, params, vdom_list).get('results', [])
+    curr_mem_list = get_address_groups(config, params, vdom_list, stale_ok=False).get('results', [])
     if len(curr_mem_list) != 1:
         raise ConnectorError('Input Address Group name not found')
 
@@ -57,7 +59,7 @@ def create_address_group(config, params):
         raise ConnectorError(str(Err))
 
 
-def get_address_groups(config, params, vdom_list=None):
+def get_address_groups(config, params, vdom_list=None, stale_ok=True):
     try:
         if not vdom_list:
             vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
@@ -66,16 +68,19 @@ def get_address_groups(config, params, vdom_list=None):
             querystring.update({'vdom': ','.join(vdom_list)})
 
         if params.get('address_group_category') == 'IPv6 Group':
-            url = ADDRESS_GROUP_ALL_API_IPv6
+            url, table = ADDRESS_GROUP_ALL_API_IPv6, 'addrgrp6'
         else:
-            url = ADDRESS_GROUP_ALL_API
+            url, table = ADDRESS_GROUP_ALL_API, 'addrgrp'
+        query = ListQuery(params)
         if params.get('group_name'):
 
-            response = _api_request(config, '{0}/{1}'.format(url, params.get('group_name')), parameters=querystring)
+            response = query.read(config, '{0}/{1}'.format(url, params.get('group_name')), querystring,
+                                  stale_ok=stale_ok)
         else:
             if vdom_list:
                 querystring.update({'vdom': ','.join(vdom_list)})
-            response = _api_request(config, url, parameters=querystring)
+            response = query.read(config, url, querystring, cached=get_cached_response(config, table, vdom_list),
+                                  paginate=True, stale_ok=stale_ok)
         return response
     except Exception as Err:
         raise ConnectorError(str(Err))
@@ -84,16 +89,13 @@ def get_address_groups(config, params, vdom_list=None):
 def update_address_group(config, params):
     try:
         vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
-        querystring = {}
-        if vdom_list:
-            querystring.update({'vdom': ','.join(vdom_list)})
-        response_list = []
-        for vdom in vdom_list:
+        if params.get('address_group_category') == 'IPv4 Group':
+            url = ADDRESS_GROUP_API
+        else:
+            url = ADDRESS_GROUP_API_IPv6
+
+        def _update(vdom):
             members_list, exclude_mem_list = get_members_list(config, params, [vdom])
-            if params.get('address_group_category') == 'IPv4 Group':
-                url = ADDRESS_GROUP_API
-            else:
-                url = ADDRESS_GROUP_API_IPv6
             data = {
                 'name': params.get('group_name'),
                 'comment': params.get('comment'),
@@ -108,10 +110,11 @@ def update_address_group(config, params):
                 data['member'] = generate_dict_from_list(members_list)
             if params.get('new_group_name'):
                 data.update({'name': params.get('new_group_name')})
-            response = _api_request(config, url.format(ip_group_name=params.get('group_name').replace('/', '%2f')),
-                                    parameters={'vdom': vdom}, body=data, method='PUT')
-            response_list.append(response)
-        return response_list
+            return _api_request(config, url.format(ip_group_name=params.get('group_name').replace('/', '%2f')),
+                                parameters={'vdom': vdom}, body=data, method='PUT')
+
+        # Each VDOM's GET and PUT is independent of the others
+        return _fan_out_vdoms(config, vdom_list, _update) if vdom_list else []
     except Exception as Err:
         raise ConnectorError(str(Err))
 
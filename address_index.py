@@ -0,0 +1,206 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import ipaddress
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .cmdb_mirror import get_derived
+from .constants import *
+from .object_expansion import ObjectExpander, IPV4_SPACE, IPV6_SPACE
+from .policy_match import IntervalIndex, lowest_bit
+from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list
+
+logger = get_logger('fortigate-firewall')
+
+ADDRESS_INDEX_TABLES = ('address', 'address6', 'addrgrp', 'addrgrp6', 'policy')
+POLICY_ADDRESS_FIELDS = ('srcaddr', 'dstaddr', 'srcaddr6', 'dstaddr6')
+
+
+class AddressIndex(object):
+    """Reverse lookup from an IP or CIDR to the address objects, groups and policies that cover it.
+
+    Subnet objects live in one hash table per prefix length (a flattened CIDR trie), so a lookup is at
+    most one dict probe per distinct prefix length in use. Ranges and FQDN results, which are far fewer,
+    go to an interval index and are verified against the query.
+    """
+
+    def __init__(self, tables, fqdn_resolved=None, include_catch_all=False):
+        self.expander = ObjectExpander(addresses=tables.get('address', []), addrgrps=tables.get('addrgrp', []),
+                                       addresses6=tables.get('address6', []),
+                                       addrgrps6=tables.get('addrgrp6', []), fqdn_resolved=fqdn_resolved)
+        self.include_catch_all = include_catch_all
+        self.prefixes = {4: {}, 6: {}}
+        self.ranges = {4: [], 6: []}
+        self.range_index = {4: IntervalIndex(), 6: IntervalIndex()}
+        for family in (4, 6):
+            for name in self.expander.address_objects[family]:
+                self._add_object(name, family)
+            for position, (start, end, name) in enumerate(self.ranges[family]):
+                self.range_index[family].add(1 << position, [(start, end)])
+            self.range_index[family].build()
+        self.parents = {4: {}, 6: {}}
+        for family in (4, 6):
+            for group in self.expander.address_groups[family].values():
+                for member in group.get('member', []):
+                    self.parents[family].setdefault(member.get('name'), set()).add(group.get('name'))
+        self.policies = {}
+        for policy in tables.get('policy', []):
+            for field in POLICY_ADDRESS_FIELDS:
+                for member in policy.get(field, []):
+                    self.policies.setdefault(member.get('name'), []).append((policy, field))
+
+    def _add_object(self, name, family):
+        bits = 32 if family == 4 else 128
+        intervals, resolved = self.expander.address(name, family)
+        for start, end in intervals:
+            if (start, end) == (IPV4_SPACE if family == 4 else IPV6_SPACE) and not self.include_catch_all:
+                continue
+            size = end - start + 1
+            prefix_len = bits - size.bit_length() + 1
+            if size & (size - 1) == 0 and start % size == 0:
+                self.prefixes[family].setdefault(prefix_len, {}).setdefault(start >> (bits - prefix_len),
+                                                                            []).append(name)
+            else:
+                self.ranges[family].append((start, end, name))
+
+    def objects_for(self, value):
+        """Address objects whose addresses contain the whole IP/CIDR ``value``, also accepted in the
+        ``10.0.0.0 255.255.255.0`` form of the IP address parameters."""
+        network = ipaddress.ip_network('/'.join(value.split()), strict=False)
+        family = network.version
+        bits = network.max_prefixlen
+        start, end = int(network.network_address), int(network.broadcast_address)
+        names = []
+        for prefix_len, table in self.prefixes[family].items():
+            if prefix_len <= network.prefixlen:
+                names += table.get(start >> (bits - prefix_len), [])
+        mask = self.range_index[family].lookup(start)
+        while mask:
+            position = lowest_bit(mask)
+            range_start, range_end, name = self.ranges[family][position]
+            if range_end >= end:
+                names.append(name)
+            mask &= mask - 1
+        return family, sorted(set(names))
+
+    def groups_for(self, names, family):
+        """Groups containing any of ``names`` directly or through nested groups, honouring exclude-member.
+
+        The groups reachable from ``names`` are collected first; exclusions are applied after, so a group
+        is dropped when one of its excluded members covers the query through any path.
+        """
+        reachable = set()
+        pending = list(names)
+        while pending:
+            for group_name in self.parents[family].get(pending.pop(), ()):
+                if group_name not in reachable:
+                    reachable.add(group_name)
+                    pending.append(group_name)
+        names = set(names)
+        groups = self.expander.address_groups[family]
+        covers = {}
+
+        def _covers(name, seen=()):
+            if name not in reachable:
+                return name in names
+            if name not in covers:
+                if name in seen:
+                    # A loop FortiOS would have refused; it covers nothing through itself
+                    return False
+                group, seen = groups[name], seen + (name,)
+                covers[name] = any(_covers(member.get('name'), seen) for member in group.get('member', [])) and \
+                    not (group.get('exclude') == 'enable' and any(
+                        _covers(member.get('name'), seen) for member in group.get('exclude-member', [])))
+            return covers[name]
+
+        return sorted(name for name in reachable if _covers(name))
+
+    def policies_for(self, names):
+        policies = {}
+        for name in names:
+            for policy, field in self.policies.get(name, []):
+                entry = policies.setdefault(policy.get('policyid'), {'policyid': policy.get('policyid'),
+                                                                     'name': policy.get('name'),
+                                                                     'action': policy.get('action'),
+                                                                     'fields': []})
+                if field not in entry['fields']:
+                    entry['fields'].append(field)
+        return sorted(policies.values(), key=lambda entry: entry['policyid'])
+
+    def lookup(self, value):
+        family, objects = self.objects_for(value)
+        groups = self.groups_for(objects, family)
+        return {'ip': value, 'address_objects': objects, 'address_groups': groups,
+                'policies': self.policies_for(objects + groups)}
+
+    def lookup_many(self, values):
+        results = []
+        for value in values:
+            try:
+                results.append(self.lookup(value))
+            except ValueError as err:
+                results.append({'ip': value, 'error': str(err)})
+        return results
+
+
+def _resolved_addresses(item):
+    """The ``addrs`` of one entry of the FQDN monitor, or None if the entry doesn't have that shape."""
+    addrs = item.get('addrs') if isinstance(item, dict) else None
+    if not isinstance(addrs, list):
+        return None
+    try:
+        return [ipaddress.ip_address(addr).compressed for addr in addrs]
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_fqdn_resolved(config, vdom_list):
+    """Resolved addresses of FQDN address objects, as cached by the FortiGate DNS resolver.
+
+    The monitor answers ``results`` keyed by address object name, each with the ``addrs`` the FQDN
+    resolved to. Objects missing from the answer, or whose entry has another shape, stay unresolved.
+    """
+    resolved = {}
+    parameters = {'vdom': ','.join(vdom_list)} if vdom_list else {}
+    for endpoint in (ADDRESS_FQDNS_API, ADDRESS6_FQDNS_API):
+        try:
+            response = _api_request(config, endpoint, parameters=dict(parameters))
+        except Exception as err:
+            logger.debug('Unable to read resolved FQDN addresses from {0}: {1}'.format(endpoint, err))
+            continue
+        results = response.get('results') if isinstance(response, dict) else None
+        if not isinstance(results, dict):
+            logger.warning('Unexpected response from {0}, FQDN addresses are not resolved'.format(endpoint))
+            continue
+        for name, item in results.items():
+            addrs = _resolved_addresses(item)
+            if addrs is None:
+                logger.warning('Unexpected entry for {0} from {1}, left unresolved'.format(name, endpoint))
+                continue
+            resolved.setdefault(name, []).extend(addrs)
+    return resolved
+
+
+def get_address_index(config, vdom_list, resolve_fqdn=False, include_catch_all=False):
+    if resolve_fqdn:
+        fqdn_resolved = _get_fqdn_resolved(config, vdom_list)
+        return get_derived(config, vdom_list, ADDRESS_INDEX_TABLES, None,
+                           lambda tables: AddressIndex(tables, fqdn_resolved, include_catch_all))
+    return get_derived(config, vdom_list, ADDRESS_INDEX_TABLES,
+                       'address_index_all' if include_catch_all else 'address_index',
+                       lambda tables: AddressIndex(tables, include_catch_all=include_catch_all))
+
+
+def lookup_ip_references(config, params):
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        ip_list = _get_list_from_str_or_list(params, 'ip_addresses', is_ip=True)
+        index = get_address_index(config, vdom_list, resolve_fqdn=bool(params.get('resolve_fqdn')),
+                                  include_catch_all=bool(params.get('include_catch_all')))
+        return {'vdom': vdom_list[0] if vdom_list else None, 'results': index.lookup_many(ip_list)}
+    except Exception as Err:
+        raise ConnectorError(str(Err))
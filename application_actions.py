@@ -7,6 +7,7 @@
 from connectors.core.connector import get_logger, ConnectorError
 
 from .constants import *
+from .list_query import ListQuery
 from .utils import *
 from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list, _get_vdom
 
@@ -31,14 +32,23 @@ def _get_app_block_profile(config, params):
                 app_block_policy_name=app_block_policy_name, vdom=', '.join(vdom)))
 
 
+def _iter_applications(config, params):
+    vdom = _get_vdom(config, params, check_multiple_vdom=True)
+    app_param = {'vdom': vdom} if vdom else {}
+    return _api_request(config, GET_LIST_OF_APPLICATIONS, parameters=app_param, stream=True)
+
+
 def _get_app_id(config, params, app_name_list):
     result = []
-    # Get application details for getting application id
-    all_apps_details = get_list_of_applications(config, params)
+    # Stream the application catalog and keep only the requested applications
+    app_names = set(app_name_list)
+    matched_apps = {}
+    for app_details in _iter_applications(config, params):
+        if app_details.get("name") in app_names:
+            matched_apps.setdefault(app_details.get("name"), []).append(app_details)
     app_id_list = []
     for app in app_name_list:
-        temp_id = list(filter(lambda app_details: app == app_details.get("name"),
-                              all_apps_details.get("results")))
+        temp_id = matched_apps.get(app)
         if temp_id:
             app_id_list += temp_id
         else:
@@ -51,7 +61,7 @@ def get_list_of_applications(config, params):
     try:
         vdom = _get_vdom(config, params, check_multiple_vdom=True)
         app_param = {'vdom': vdom} if vdom  else {}
-        return _api_request(config, GET_LIST_OF_APPLICATIONS, parameters=app_param)
+        return ListQuery(params).read(config, GET_LIST_OF_APPLICATIONS, app_param, paginate=True, stale_ok=True)
     except Exception as Err:
         raise ConnectorError(Err)
 
@@ -174,10 +184,10 @@ def get_blocked_applications(config, params):
             logger.error("Application control profile name is not defined in configuration parameter.")
             raise ConnectorError("Application control profile name is not defined in configuration parameter.")
 
-        all_apps_details = get_list_of_applications(config, params)
         # Get default application block policy
         block_policy_details = _api_request(config, BLOCK_APP.format(app_block_policy=
-                                                                     app_block_policy_name), parameters=app_param)
+                                                                     app_block_policy_name), parameters=app_param,
+                                            stale_ok=True)
         if not block_policy_details.get('results')[0].get('entries', []):
             logger.error(APP_PERMISSION)
             raise ConnectorError(APP_PERMISSION)
@@ -188,11 +198,16 @@ def get_blocked_applications(config, params):
         app_id_list = []
         for policy in block_policy_list:
             app_id_list += list(map(lambda app_id: app_id.get("id"), policy.get("application")))
+        # Stream the application catalog and keep only the blocked applications
+        blocked_ids = set(app_id_list)
+        blocked_apps = {}
+        for app_details in _iter_applications(config, params):
+            if app_details.get("id") in blocked_ids:
+                blocked_apps.setdefault(app_details.get("id"), []).append(app_details)
         block_app_details = []
         for app in app_id_list:
-            block_app_details += list(filter(lambda app_details: app_details.get("id") == app,
-                                             all_apps_details.get("results")))
-        return block_app_details
+            block_app_details += blocked_apps.get(app, [])
+        return ListQuery(params).filter_records(block_app_details)
     except Exception as Err:
         if '404' in str(Err):
             logger.exception(
@@ -0,0 +1,81 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+# Cold-start cost of the connector: time and peak memory of importing the connector package in a fresh
+# interpreter, with lazily resolved operations (what a worker pays on start-up) and with every operation
+# resolved. With ``--baseline`` the same is measured for another revision of the connector, checked out
+# in a temporary git worktree, such as the one from before handlers, their dependencies and the country
+# data were loaded on demand.
+#
+# Run from a FortiSOAR environment (or with the ``connectors`` SDK on PYTHONPATH):
+#
+#     python benchmarks/import_time.py [--runs 10] [--baseline <git revision>]
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CONNECTOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import importlib, json, resource, sys, time
+sys.path.insert(0, {parent!r})
+start = time.perf_counter()
+connector = importlib.import_module({package!r} + '.connector')
+if {resolve_all!r}:
+    operations = importlib.import_module({package!r} + '.operation').fortigate_operations
+    for name in list(operations):
+        operations[name]
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  'modules': len(sys.modules)}}))
+"""
+
+
+def measure(connector_dir, resolve_all, runs):
+    code = PROBE.format(parent=os.path.dirname(connector_dir), package=os.path.basename(connector_dir),
+                        resolve_all=resolve_all)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', code], env=os.environ.copy())
+        samples.append(json.loads(output.decode().strip().splitlines()[-1]))
+    return {'median_ms': round(statistics.median(s['seconds'] for s in samples) * 1000, 2),
+            'max_rss_kb': max(s['max_rss_kb'] for s in samples),
+            'modules': samples[-1]['modules']}
+
+
+def measure_revision(revision, runs):
+    """Both modes for ``revision`` of the connector, checked out under the same package name."""
+    parent = tempfile.mkdtemp()
+    connector_dir = os.path.join(parent, os.path.basename(CONNECTOR_DIR))
+    subprocess.check_call(['git', '-C', CONNECTOR_DIR, 'worktree', 'add', '--detach', connector_dir, revision],
+                          stdout=subprocess.DEVNULL)
+    try:
+        return {'lazy': measure(connector_dir, False, runs), 'all_operations': measure(connector_dir, True, runs)}
+    finally:
+        subprocess.call(['git', '-C', CONNECTOR_DIR, 'worktree', 'remove', '--force', connector_dir])
+        shutil.rmtree(parent, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure connector cold-start time and memory')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--baseline', help='Git revision of the connector to compare with')
+    args = parser.parse_args()
+    results = {'lazy': measure(CONNECTOR_DIR, False, args.runs),
+               'all_operations': measure(CONNECTOR_DIR, True, args.runs)}
+    if args.baseline:
+        results['baseline'] = measure_revision(args.baseline, args.runs)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+# Decode and encode cost of the JSON codecs available to the connector (see json_codec.py) on the large
+# payloads of the simulator: the policy table, the application catalog and the address table, plus a
+# full address group update body. ``response.json()`` of requests is included as the previous baseline.
+#
+# Run from a FortiSOAR environment (or with the ``connectors`` SDK on PYTHONPATH):
+#
+#     python benchmarks/json_codec.py [--policies 10000] [--apps 5000] [--addresses 20000] [--runs 10]
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+CONNECTOR_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from simulator import Simulator, seed  # noqa: E402
+
+ROW = '{payload:<24} {size_mb:>8} {codec:<16} {decode_ms:>10} {encode_ms:>10}'
+PAYLOADS = (
+    ('policy table', '/api/v2/cmdb/firewall/policy'),
+    ('application catalog', '/api/v2/cmdb/application/name'),
+    ('address table', '/api/v2/cmdb/firewall/address')
+)
+
+
+def build_payloads(args):
+    simulator = Simulator()
+    seed(simulator, addresses=args.addresses, apps=args.apps, policies=args.policies)
+    payloads = []
+    for label, path in PAYLOADS:
+        status, payload = simulator.handle('GET', path, {'vdom': ['root']}, b'')
+        payloads.append((label, json.dumps(payload).encode('utf-8')))
+    members = [{'name': name} for name in simulator.tables['firewall/address']][:600]
+    payloads.append(('address group update', json.dumps({'member': members}).encode('utf-8')))
+    return payloads
+
+
+def _median_ms(func, runs):
+    timings = []
+    for i in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 2)
+
+
+def _response(data):
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = data
+    response.headers['Content-Type'] = 'application/json'
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the JSON codecs of the connector on large payloads.')
+    parser.add_argument('--policies', type=int, default=10000)
+    parser.add_argument('--apps', type=int, default=5000)
+    parser.add_argument('--addresses', type=int, default=20000)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(CONNECTOR_DIR))
+    json_codec = importlib.import_module(os.path.basename(CONNECTOR_DIR) + '.json_codec')
+    print(ROW.format(payload='payload', size_mb='MB', codec='codec', decode_ms='decode ms', encode_ms='encode ms'))
+    for label, data in build_payloads(args):
+        value = json.loads(data)
+        size_mb = round(len(data) / 1048576, 2)
+        print(ROW.format(payload=label, size_mb=size_mb, codec='response.json()',
+                         decode_ms=_median_ms(lambda: _response(data).json(), args.runs),
+                         encode_ms=_median_ms(lambda: json.dumps(value), args.runs)))
+        for codec in json_codec.CODECS:
+            json_codec.use_codec(codec)
+            print(ROW.format(payload=label, size_mb=size_mb, codec=codec,
+                             decode_ms=_median_ms(lambda: json_codec.decode_response(_response(data)), args.runs),
+                             encode_ms=_median_ms(lambda: json_codec.dumps(value), args.runs)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+# Runs every connector operation against the local FortiOS simulator at realistic scale and reports
+# latency, REST calls per action and peak memory of the connector side. With --record the REST traffic
+# is also written to a cassette (see cassette.py); --replay runs the actions against a cassette instead,
+# e.g. one recorded from a production-sized device with the connector's cassette_mode config set.
+#
+# Run from a FortiSOAR environment (or with the ``connectors`` SDK on PYTHONPATH):
+#
+#     python benchmarks/run_benchmarks.py [--iterations 3] [--only 'block|unblock'] [--json results.json]
+
+import argparse
+import importlib
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from urllib.request import Request, urlopen
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+CONNECTOR_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from simulator import APP_BLOCK_PROFILE, BLOCK_GROUP, BLOCK_POLICY, URL_BLOCK_PROFILE, vdom_names  # noqa: E402
+
+POLICY_BLOCK = {'method': 'Policy Based', 'ip_block_policy': BLOCK_POLICY, 'ip_group_name': BLOCK_GROUP,
+                'ip_type': 'IPv4', 'ngfw_mode': 'Profile Based'}
+MIRROR = {'cmdb_mirror': True}
+ROW = '{action:<38} {median_ms:>10} {p95_ms:>10} {calls_per_action:>8} {peak_mb:>9} {errors:>4}'
+
+
+def _block_group_ip(i):
+    return '10.0.{0}.{1}'.format(i >> 8 & 255, i & 255)
+
+
+def scenarios(sizes, feed):
+    """(label, operation, params(i), config overrides) in run order; create/update/delete chains share names."""
+    new_policy = sizes['policies'] + 1
+    return [
+        ('get_addresses', 'get_addresses', lambda i: {'address_category': 'IPv4'}, {}),
+        ('get_addresses[mirror]', 'get_addresses', lambda i: {'address_category': 'IPv4'}, MIRROR),
+        ('get_address_groups', 'get_address_groups', lambda i: {'address_group_category': 'IPv4 Group'}, {}),
+        ('get_firewall_services', 'get_firewall_services', lambda i: {}, {}),
+        ('get_service_groups', 'get_service_groups', lambda i: {}, {}),
+        ('get_users', 'get_users', lambda i: {'start': '0'}, {}),
+        ('get_list_of_policies', 'get_list_of_policies', lambda i: {}, {}),
+        ('get_list_of_policies[mirror]', 'get_list_of_policies', lambda i: {}, MIRROR),
+        ('get_addresses[fields]', 'get_addresses', lambda i: {'address_category': 'IPv4', 'fields': 'name,subnet',
+                                                           'filter': 'type==ipmask'}, {}),
+        ('get_list_of_policies[fields]', 'get_list_of_policies', lambda i: {'fields': 'policyid,name,action',
+                                                                         'filter': 'action==deny'}, {}),
+        ('get_list_of_applications', 'get_list_of_applications', lambda i: {}, {}),
+        ('get_blocked_applications', 'get_blocked_applications', lambda i: {}, {}),
+        ('get_blocked_urls', 'get_blocked_urls', lambda i: {}, {}),
+        ('get_quarantine_hosts', 'get_quarantine_hosts', lambda i: {}, {}),
+        ('get_country_names', 'get_country_names', lambda i: {}, {}),
+        ('get_blocked_ip[quarantine]', 'get_blocked_ip', lambda i: {'method': 'Quarantine Based'}, {}),
+        ('get_blocked_ip[policy]', 'get_blocked_ip', lambda i: dict(POLICY_BLOCK), {}),
+        ('block_ip[quarantine]', 'block_ip', lambda i: {'method': 'Quarantine Based', 'time_to_live': '1 Hour',
+                                                         'ip_addresses': '203.0.113.{0}'.format(i + 1)}, {}),
+        ('unblock_ip[quarantine]', 'unblock_ip', lambda i: {'method': 'Quarantine Based',
+                                                             'ip_addresses': '203.0.113.{0}'.format(i + 1)}, {}),
+        # The block group is full (600 members); make room first, then refill it with both block actions
+        ('unblock_ip[policy]', 'unblock_ip', lambda i: dict(POLICY_BLOCK, ip='{0},{1}'.format(
+            _block_group_ip(2 * i), _block_group_ip(2 * i + 1))), {}),
+        ('block_ip[policy]', 'block_ip', lambda i: dict(POLICY_BLOCK, ip=_block_group_ip(2 * i)), {}),
+        ('block_ip_new', 'block_ip_new', lambda i: dict(POLICY_BLOCK, ip=_block_group_ip(2 * i + 1), is_new=True),
+         {}),
+        ('block_applications', 'block_applications', lambda i: {'app_list': 'App.{0}'.format(1000 + i)}, {}),
+        ('unblock_applications', 'unblock_applications', lambda i: {'app_list': 'App.{0}'.format(1000 + i)}, {}),
+        ('block_url', 'block_url', lambda i: {'url': 'bench{0}.example.com'.format(i)}, {}),
+        ('unblock_url', 'unblock_url', lambda i: {'url': 'bench{0}.example.com'.format(i)}, {}),
+        ('quarantine_host', 'quarantine_host', lambda i: {'macs': '02:00:00:00:00:{0:02x}'.format(i)}, {}),
+        ('unquarantine_host', 'unquarantine_host', lambda i: {'macs': '02:00:00:00:00:{0:02x}'.format(i)}, {}),
+        ('create_address', 'create_address', lambda i: {'address_category': 'IPv4 Address', 'type': 'Subnet',
+                                                         'name': 'bench-addr-{0}'.format(i),
+                                                         'subnet': '192.168.200.{0}'.format(i + 1)}, {}),
+        ('update_address', 'update_address', lambda i: {'address_category': 'IPv4 Address', 'type': 'Subnet',
+                                                         'name': 'bench-addr-{0}'.format(i),
+                                                         'subnet': '192.168.201.{0}'.format(i + 1),
+                                                         'comment': 'updated'}, {}),
+        ('delete_address', 'delete_address', lambda i: {'address_category': 'IPv4 Address',
+                                                         'name': 'bench-addr-{0}'.format(i)}, {}),
+        ('create_address_group', 'create_address_group', lambda i: {
+            'address_group_category': 'IPv4 Group', 'group_name': 'bench-grp-{0}'.format(i),
+            'member': 'addr-1000,addr-1001'}, {}),
+        ('update_address_group', 'update_address_group', lambda i: {
+            'address_group_category': 'IPv4 Group', 'group_name': 'bench-grp-{0}'.format(i),
+            'add_member': 'addr-1002'}, {}),
+        ('delete_address_group', 'delete_address_group', lambda i: {
+            'address_group_category': 'IPv4 Group', 'group_name': 'bench-grp-{0}'.format(i)}, {}),
+        ('create_firewall_service', 'create_firewall_service', lambda i: {
+            'name': 'bench-svc-{0}'.format(i), 'protocol': 'TCP/UDP/SCTP', 'tcp_portrange': str(30000 + i)}, {}),
+        ('update_firewall_service', 'update_firewall_service', lambda i: {
+            'name': 'bench-svc-{0}'.format(i), 'comment': 'updated'}, {}),
+        ('delete_firewall_service', 'delete_firewall_service', lambda i: {'name': 'bench-svc-{0}'.format(i)}, {}),
+        ('create_service_group', 'create_service_group', lambda i: {
+            'name': 'bench-svcgrp-{0}'.format(i), 'members': 'svc-1,svc-2'}, {}),
+        ('update_service_group', 'update_service_group', lambda i: {
+            'name': 'bench-svcgrp-{0}'.format(i), 'add_member': 'svc-3'}, {}),
+        ('delete_service_group', 'delete_service_group', lambda i: {'name': 'bench-svcgrp-{0}'.format(i)}, {}),
+        ('create_policy', 'create_policy', lambda i: {
+            'name': 'bench-policy-{0}'.format(i), 'srcintf': 'port1', 'dstintf': 'port2', 'srcaddr': 'all',
+            'dstaddr': 'all', 'service': 'ALL', 'schedule': 'always', 'action': 'Accept'}, {}),
+        ('update_policy', 'update_policy', lambda i: {'policyid': new_policy + i, 'add_srcaddr': 'addr-1003'}, {}),
+        ('delete_policy', 'delete_policy', lambda i: {'policyid': new_policy + i}, {}),
+        ('create_user', 'create_user', lambda i: {'user_type': 'Local User', 'name': 'bench-user-{0}'.format(i),
+                                                   'passwd': 'Bench-Passw0rd', 'status': 'Enable'}, {}),
+        ('update_user', 'update_user', lambda i: {'user_type': 'Local User', 'name': 'bench-user-{0}'.format(i),
+                                                   'new_username': '', 'passwd': 'Bench-Passw0rd2',
+                                                   'user_group_name': '', 'user_group_name_to_remove': ''}, {}),
+        ('delete_user', 'delete_user', lambda i: {'name': 'bench-user-{0}'.format(i)}, {}),
+        ('get_system_events', 'get_system_events', lambda i: {'location': 'Memory', 'rows': 100}, {}),
+        ('get_user_list_login_details', 'get_user_list_login_details', lambda i: {'username': 'admin'}, {}),
+        ('get_profile_schedule_used_reference', 'get_profile_schedule_used_reference',
+         lambda i: {'profile_name': 'always'}, {}),
+        ('create_profile_schedule', 'create_profile_schedule', lambda i: {
+            'name': 'bench-schedule-{0}'.format(i), 'start': '00:00 2024/01/01', 'end': '00:00 2024/01/02',
+            'color': 0, 'expiration': 3, 'fabric': 'disable'}, {}),
+        ('get_address_reference', 'get_address_reference', lambda i: {'address_name': 'addr-1004'}, {}),
+        ('get_service_reference', 'get_service_reference', lambda i: {'service_name': 'svc-1'}, {}),
+        ('get_all_profile_schedule', 'get_all_profile_schedule', lambda i: {}, {}),
+        ('get_policy_details_used', 'get_policy_details_used', lambda i: {'policy_id': 2}, {}),
+        ('sync_cmdb_mirror', 'sync_cmdb_mirror', lambda i: {}, MIRROR),
+        ('match_policy', 'match_policy', lambda i: {'src_ip': '10.0.3.{0}'.format(i + 1), 'dst_ip': '10.0.9.9',
+                                                     'protocol': 'TCP', 'port': 1030}, MIRROR),
+        ('lookup_ip_references', 'lookup_ip_references', lambda i: {
+            'ip_addresses': '10.0.0.5,10.0.2.{0},172.16.1.20'.format(i + 1)}, MIRROR),
+        ('get_indicator_status', 'get_indicator_status', lambda i: {
+            'ip_addresses': '192.0.2.{0},10.0.0.{0},203.0.113.{0}'.format(i + 1), 'ip_group_name': BLOCK_GROUP,
+            'urls': 'blocked{0}.example.com'.format(i), 'mac_addresses': '00:11:22:33:00:{0:02x}'.format(i)}, {}),
+        ('reconcile_block_list', 'reconcile_block_list', lambda i: {
+            'indicator_type': 'IP Address', 'method': 'Quarantine Based',
+            'desired_entries': ['198.51.{0}.{1}'.format(n >> 8, n & 255) for n in range(5000 + i)]}, {}),
+        ('update_threat_feed', 'update_threat_feed', lambda i: {
+            'feed_name': 'bench-feed', 'add_indicators': ['198.51.{0}.{1}'.format(n >> 8, n & 255)
+                                                          for n in range(i * 5000, (i + 1) * 5000)],
+            'remove_indicators': '198.51.0.{0}'.format(i + 1)}, feed),
+        ('collect_orphaned_addresses', 'collect_orphaned_addresses', lambda i: {'batch_interval': 0}, {}),
+        ('analyze_policy_ruleset', 'analyze_policy_ruleset', lambda i: {}, MIRROR),
+        ('get_bulk_policy_usage', 'get_bulk_policy_usage', lambda i: {}, {}),
+        ('get_bulk_object_usage', 'get_bulk_object_usage', lambda i: {'object_type': 'Service'}, {}),
+        ('geo_block_countries', 'geo_block_countries', lambda i: {
+            'countries': 'Russia,Iran,North Korea', 'ip_group_name': 'bench-geo-{0}'.format(i)}, {}),
+        ('get_connector_metrics', 'get_connector_metrics', lambda i: {'format': 'Prometheus'},
+         {'collect_metrics': True})
+    ]
+
+
+def _free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_simulator(args):
+    port = _free_port()
+    command = [sys.executable, os.path.join(BENCHMARK_DIR, 'simulator.py'), '--port', str(port),
+               '--addresses', str(args.addresses), '--group-members', str(args.group_members),
+               '--apps', str(args.apps), '--policies', str(args.policies), '--services', str(args.services),
+               '--latency-ms', str(args.latency_ms), '--vdoms', str(args.vdoms), '--tail-rate', str(args.tail_rate),
+               '--tail-ms', str(args.tail_ms)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    process.stdout.readline()
+    return process, port
+
+
+def start_feed_server():
+    """Feed server owned by the run, so that Update Threat Feed finds it and starts none that outlives the run."""
+    port = _free_port()
+    directory = tempfile.mkdtemp(prefix='fortigate-bench-feeds-')
+    process = subprocess.Popen([sys.executable, os.path.join(CONNECTOR_DIR, 'feed_server.py'), '--port', str(port),
+                                '--directory', directory, '--bind', '127.0.0.1'])
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return process, {'threat_feed_port': port, 'threat_feed_url': 'http://127.0.0.1:{0}'.format(port),
+                     'threat_feed_directory': directory, 'threat_feed_bind_address': '127.0.0.1'}
+
+
+def simulator_stats(port, reset=False):
+    request = Request('http://127.0.0.1:{0}/__sim__/{1}'.format(port, 'reset' if reset else 'stats'),
+                      data=b'' if reset else None)
+    return json.loads(urlopen(request).read().decode('utf-8'))
+
+
+def run_scenario(operations, config, count_calls, label, operation, params, overrides, iterations):
+    handler = operations.get(operation)
+    config = dict(config, **overrides)
+    timings, errors = [], []
+
+    def _run(i):
+        try:
+            handler(config, params(i))
+        except Exception as err:
+            errors.append(str(err)[:200])
+
+    calls_before = count_calls()
+    for i in range(iterations):
+        started = time.perf_counter()
+        _run(i)
+        timings.append(time.perf_counter() - started)
+    # One more run under tracemalloc; it slows execution, so it is kept out of the timings
+    tracemalloc.start()
+    _run(iterations)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    calls = count_calls() - calls_before
+    timings.sort()
+    return {'action': label, 'runs': iterations, 'errors': len(errors), 'first_error': errors[0] if errors else None,
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 2),
+            'calls_per_action': round(calls / float(iterations + 1), 1),
+            'peak_mb': round(peak / 1048576.0, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark connector operations against the FortiOS simulator')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--only', help='Regular expression selecting the actions to run')
+    parser.add_argument('--addresses', type=int, default=20000)
+    parser.add_argument('--group-members', type=int, default=600)
+    parser.add_argument('--apps', type=int, default=5000)
+    parser.add_argument('--policies', type=int, default=10000)
+    parser.add_argument('--services', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--tail-rate', type=float, default=0,
+                        help='Share of simulator responses delayed by --tail-ms, to measure tail latency')
+    parser.add_argument('--tail-ms', type=float, default=0)
+    parser.add_argument('--hedged-reads', action='store_true', help='Run with the hedged_reads config enabled')
+    parser.add_argument('--vdoms', type=int, default=1,
+                        help='Run every action against this many VDOMs (root, vdom1, ...) of the simulator')
+    parser.add_argument('--record', metavar='CASSETTE', help='Record the REST traffic of the run to a cassette')
+    parser.add_argument('--replay', metavar='CASSETTE',
+                        help='Serve REST calls from a cassette instead of the simulator; the table size options '
+                             'must match the recorded run')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='Multiplier for recorded latencies when replaying; 0 replays without delay')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(CONNECTOR_DIR))
+    package = os.path.basename(CONNECTOR_DIR)
+    operations = importlib.import_module(package + '.operation').fortigate_operations
+    config = {'address': 'http://127.0.0.1', 'api_key': 'benchmark', 'verify_ssl': False,
+              'vdom': ','.join(vdom_names(args.vdoms)),
+              'url_block_policy': URL_BLOCK_PROFILE, 'app_block_policy': APP_BLOCK_PROFILE,
+              'mirror_poll_interval': 3600, 'hedged_reads': args.hedged_reads}
+    if args.replay:
+        process, config['port'] = None, 443
+        config.update({'cassette_mode': 'replay', 'cassette_path': args.replay,
+                       'cassette_latency_scale': args.latency_scale})
+        cassette = importlib.import_module(package + '.cassette').get_cassette(config)
+        count_calls = lambda: cassette.replayed
+    else:
+        process, config['port'] = start_simulator(args)
+        if args.record:
+            config.update({'cassette_mode': 'record', 'cassette_path': args.record})
+        count_calls = lambda: simulator_stats(config['port'])['requests']
+    sizes = {'policies': args.policies}
+    feed_process, feed = start_feed_server()
+    results = []
+    print(ROW.format(action='action', median_ms='median ms', p95_ms='p95 ms', calls_per_action='calls',
+                     peak_mb='peak MB', errors='err'))
+    try:
+        for label, operation, params, overrides in scenarios(sizes, feed):
+            if args.only and not re.search(args.only, label):
+                continue
+            result = run_scenario(operations, config, count_calls, label, operation, params, overrides,
+                                  args.iterations)
+            results.append(result)
+            print(ROW.format(**result), flush=True)
+        print('execute_command is not benchmarked: it runs over SSH, not the REST API.')
+    finally:
+        feed_process.terminate()
+        if process is not None:
+            process.terminate()
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'sizes': vars(args), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
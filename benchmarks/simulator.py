@@ -0,0 +1,594 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+# Local stand-in for the FortiOS REST API, used to benchmark the connector without a firewall.
+#
+# Implements the CMDB tables and the monitor/log endpoints referenced in constants.py with FortiOS-like
+# envelopes (results, revision, mkey, http_status) and query handling (filter, key/pattern, format,
+# start/count). Latency, table sizes and error injection are configurable:
+#
+#     python benchmarks/simulator.py --port 8080 --addresses 20000 --policies 10000 --latency-ms 20
+#
+# and the connector configured with address http://127.0.0.1 and port 8080. GET /__sim__/stats returns
+# request counters, POST /__sim__/reset clears them.
+
+import argparse
+import importlib.util
+import ipaddress
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+CONNECTOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# CMDB path -> primary key; 'user/quarantine' is a single object rather than a table
+CMDB_TABLES = {
+    'firewall/address': 'name',
+    'firewall/address6': 'name',
+    'firewall/addrgrp': 'name',
+    'firewall/addrgrp6': 'name',
+    'firewall/policy': 'policyid',
+    'firewall/security-policy': 'policyid',
+    'firewall.service/custom': 'name',
+    'firewall.service/group': 'name',
+    'firewall.schedule/onetime': 'name',
+    'firewall.schedule/recurring': 'name',
+    'firewall.schedule/group': 'name',
+    'application/name': 'id',
+    'application/list': 'name',
+    'webfilter/profile': 'name',
+    'webfilter/urlfilter': 'id',
+    'system/vdom': 'name',
+    'system/geoip-country': 'id',
+    'system/external-resource': 'name',
+    'user/local': 'name',
+    'user/group': 'name'
+}
+SINGLETONS = ('user/quarantine',)
+BLOCK_POLICY = 'Block-IP-Policy'
+BLOCK_GROUP = 'FortiSOAR-Blocked'
+APP_BLOCK_PROFILE = 'block-apps'
+URL_BLOCK_PROFILE = 'block-urls'
+
+
+class SimulatorError(Exception):
+    def __init__(self, status, error=-1, message=''):
+        super(SimulatorError, self).__init__(message)
+        self.status = status
+        self.error = error
+
+
+class Simulator(object):
+    """In-memory FortiOS configuration and runtime state behind the simulated REST API."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, error_paths=None, seed=1, log_polls=0,
+                 serial='FGVMSIM000000001', tail_rate=0.0, tail_ms=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.error_paths = error_paths or {}
+        self.log_polls = log_polls
+        self.serial = serial
+        self.ha_peers = []  # serials of the other units of the simulated HA cluster
+        self.random = random.Random(seed)
+        self.lock = threading.RLock()
+        self.revision = 1
+        self.tables = {path: {} for path in CMDB_TABLES}
+        self.singletons = {'user/quarantine': {'quarantine': 'enable', 'traffic-policy': '', 'firewall-groups': '',
+                                               'targets': []}}
+        self.banned = {}
+        self.policy_stats = {}
+        self.log_sessions = {}
+        self.stats = {'requests': 0, 'errors': 0, 'bytes_in': 0, 'bytes_out': 0, 'by_endpoint': {}}
+
+    # -- state -----------------------------------------------------------------------------------------
+
+    def insert(self, path, entry):
+        key_field = CMDB_TABLES[path]
+        table = self.tables[path]
+        if key_field == 'policyid' and not entry.get('policyid'):
+            entry['policyid'] = max(table or [0]) + 1
+        key = entry.get(key_field)
+        if key in table:
+            raise SimulatorError(500, -5, 'entry already exists')
+        entry.setdefault('q_origin_key', key)
+        table[key] = entry
+        self.revision += 1
+        return key
+
+    def _key(self, path, mkey):
+        return int(mkey) if CMDB_TABLES[path] in ('policyid', 'id') and str(mkey).isdigit() else mkey
+
+    def get_entry(self, path, mkey):
+        entry = self.tables[path].get(self._key(path, mkey))
+        if entry is None:
+            raise SimulatorError(404, -3, 'entry not found')
+        return entry
+
+    # -- request dispatch ------------------------------------------------------------------------------
+
+    def handle(self, method, path, query, body):
+        """Return (status, payload) for one request."""
+        for pattern, status in self.error_paths.items():
+            if re.search(pattern, path):
+                raise SimulatorError(status)
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise SimulatorError(500)
+        vdoms = _vdoms(query)
+        if method == 'GET' and len(vdoms) > 1:
+            # Several VDOMs in one request: one envelope per VDOM, all VDOMs share the same tables
+            return 200, [self.handle(method, path, dict(query, vdom=[vdom]), body)[1] for vdom in vdoms]
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+        if parts[:2] != ['api', 'v2'] or len(parts) < 4:
+            raise SimulatorError(404)
+        with self.lock:
+            if parts[2] == 'cmdb':
+                return self._cmdb(method, parts[3:], query, body)
+            if parts[2] == 'monitor':
+                return self._monitor(method, '/'.join(parts[3:]), query, body)
+            if parts[2] == 'log':
+                return self._log(query)
+        raise SimulatorError(404)
+
+    def _envelope(self, method, path, query, **kwargs):
+        vdom = (query.get('vdom') or ['root'])[0].split(',')[0] or 'root'
+        path_name = path.rsplit('/', 1)
+        response = {'http_method': method.upper(), 'revision': str(self.revision), 'vdom': vdom,
+                    'path': path_name[0], 'name': path_name[-1], 'status': 'success', 'http_status': 200,
+                    'serial': self.serial, 'version': 'v7.2.5', 'build': 1517}
+        response.update(kwargs)
+        return response
+
+    def _cmdb(self, method, parts, query, body):
+        path = '/'.join(parts[:2])
+        if path in SINGLETONS:
+            if method == 'GET':
+                return 200, self._envelope(method, path, query, results=self.singletons[path])
+            if method == 'PUT':
+                self.singletons[path] = body or {}
+                self.revision += 1
+                return 200, self._envelope(method, path, query)
+            raise SimulatorError(405)
+        if path not in CMDB_TABLES:
+            raise SimulatorError(404)
+        mkey = parts[2] if len(parts) > 2 and parts[2] != '' else None
+        child = parts[3] if len(parts) > 3 else None
+        if method == 'GET':
+            if mkey is None:
+                rows = _query_rows(list(self.tables[path].values()), query)
+                matched = len(rows)
+                start = int((query.get('start') or [0])[0] or 0)
+                count = (query.get('count') or [None])[0]
+                rows = rows[start:start + int(count)] if count else rows[start:]
+                return 200, self._envelope(method, path, query, results=_project(rows, query),
+                                           matched_count=matched, next_idx=start + len(rows) - 1)
+            entry = self.get_entry(path, mkey)
+            results = entry.get(child, []) if child else [entry]
+            return 200, self._envelope(method, path, query, results=_project(results, query), mkey=entry.get(
+                CMDB_TABLES[path]))
+        if method == 'POST':
+            if mkey is not None and child:
+                entry = self.get_entry(path, mkey)
+                members = body if isinstance(body, list) else [body]
+                entry.setdefault(child, []).extend(members)
+                self.revision += 1
+                return 200, self._envelope(method, path, query, mkey=mkey)
+            key = self.insert(path, dict(body or {}))
+            return 200, self._envelope(method, path, query, mkey=key)
+        if method == 'PUT':
+            entry = self.get_entry(path, mkey)
+            key_field = CMDB_TABLES[path]
+            entry.update(body or {})
+            new_key = entry.get(key_field)
+            old_key = self._key(path, mkey)
+            if new_key != old_key:
+                self.tables[path][new_key] = self.tables[path].pop(old_key)
+                entry['q_origin_key'] = new_key
+            self.revision += 1
+            return 200, self._envelope(method, path, query, mkey=new_key)
+        if method == 'DELETE':
+            self.get_entry(path, mkey)
+            del self.tables[path][self._key(path, mkey)]
+            self.revision += 1
+            return 200, self._envelope(method, path, query, mkey=mkey)
+        raise SimulatorError(405)
+
+    def _monitor(self, method, path, query, body):
+        body = body or {}
+        if path == 'user/banned/select':
+            results = [dict(entry, ip_address=ip) for ip, entry in self.banned.items()
+                       if not entry['expires'] or entry['expires'] > time.time()]
+            return 200, self._envelope(method, path, query, results=results)
+        if path == 'user/banned/add_users':
+            expiry = int(body.get('expiry') or 0)
+            for ip in body.get('ip_addresses', []):
+                self.banned[ip] = {'created': int(time.time()), 'expires': int(time.time()) + expiry if expiry else 0,
+                                   'source': body.get('src', 'ips'), 'ipv6': ':' in ip}
+            return 200, self._envelope(method, path, query, results={})
+        if path == 'user/banned/clear_users':
+            for ip in body.get('ip_addresses', []):
+                self.banned.pop(ip, None)
+            return 200, self._envelope(method, path, query, results={})
+        if path == 'firewall/policy':
+            policyid = (query.get('policyid') or [None])[0]
+            results = [self._policy_stats(key) for key in self.tables['firewall/policy']
+                       if policyid is None or str(key) == str(policyid)]
+            return 200, self._envelope(method, path, query, results=_query_rows(results, query))
+        if path == 'system/object/usage':
+            return 200, self._envelope(method, path, query, results={'currently_using': self._usage(
+                (query.get('mkey') or [''])[0], (query.get('qtypes') or [''])[0])})
+        if path in ('firewall/address-fqdns', 'firewall/address-fqdns6'):
+            table = 'firewall/address' if path.endswith('fqdns') else 'firewall/address6'
+            results = {name: {'fqdn': entry.get('fqdn'), 'addrs': [_fake_ip(name, table == 'firewall/address6')]}
+                       for name, entry in self.tables[table].items() if entry.get('type') == 'fqdn'}
+            return 200, self._envelope(method, path, query, results=results)
+        if path == 'system/ha-peer':
+            return 200, self._envelope(method, path, query, results=[
+                {'serial_no': serial, 'vcluster_id': 0, 'priority': 200 if serial == self.serial else 100,
+                 'hostname': 'FGT-{0}'.format(serial[-4:])} for serial in [self.serial] + self.ha_peers])
+        if path == 'system/external-resource/refresh':
+            return 200, self._envelope(method, path, query, results={})
+        if path == 'user/fortitoken/send-activation':
+            return 200, self._envelope(method, path, query, results={})
+        raise SimulatorError(404)
+
+    def _policy_stats(self, policyid):
+        stats = self.policy_stats.get(policyid)
+        if stats is None:
+            hits = 0 if policyid % 7 == 0 else (policyid * 7919) % 100000
+            stats = {'policyid': policyid, 'hit_count': hits, 'bytes': hits * 1500, 'packets': hits * 3,
+                     'active_sessions': hits % 50, 'last_used': 1700000000 + hits if hits else None,
+                     'first_used': 1690000000 if hits else None}
+            self.policy_stats[policyid] = stats
+        return stats
+
+    def _usage(self, name, qtypes):
+        using = []
+        fields = {'[31]': ('srcaddr', 'dstaddr', 'srcaddr6', 'dstaddr6'), '[36]': ('service',),
+                  '[38]': ('schedule',)}.get(qtypes, ())
+        for policyid, policy in self.tables['firewall/policy'].items():
+            for field in fields:
+                value = policy.get(field)
+                names = [item.get('name') for item in value] if isinstance(value, list) else [value]
+                if name in names:
+                    using.append({'path': 'firewall', 'name': 'policy', 'mkey': policyid, 'attribute': field})
+                    break
+        if qtypes == '[31]':
+            for group_name, group in self.tables['firewall/addrgrp'].items():
+                if name in [item.get('name') for item in group.get('member', [])]:
+                    using.append({'path': 'firewall', 'name': 'addrgrp', 'mkey': group_name, 'attribute': 'member'})
+        return using
+
+    def _log(self, query):
+        session_id = (query.get('session_id') or [None])[0]
+        if session_id is None:
+            session_id = str(len(self.log_sessions) + 1)
+            self.log_sessions[session_id] = 0
+        self.log_sessions[session_id] = self.log_sessions.get(session_id, 0) + 1
+        done = self.log_sessions[session_id] > self.log_polls
+        rows = int((query.get('rows') or [100])[0] or 100)
+        results = [{'date': '2024-01-01', 'time': '00:00:{0:02d}'.format(i % 60), 'logid': '0100032001',
+                    'type': 'event', 'subtype': 'system', 'level': 'information', 'user': 'admin',
+                    'logdesc': 'Admin login successful', 'msg': 'Administrator admin logged in successfully'}
+                   for i in range(rows)] if done else []
+        return 200, {'http_method': 'GET', 'results': results, 'session_id': int(session_id),
+                     'percent_logs_processed': 100 if done else 50, 'completed': 100 if done else 50,
+                     'status': 'success', 'http_status': 200}
+
+    def record(self, path, status, bytes_in, bytes_out):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['errors'] += status >= 400
+            self.stats['bytes_in'] += bytes_in
+            self.stats['bytes_out'] += bytes_out
+            self.stats['by_endpoint'][path] = self.stats['by_endpoint'].get(path, 0) + 1
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {'requests': 0, 'errors': 0, 'bytes_in': 0, 'bytes_out': 0, 'by_endpoint': {}}
+
+    def delay(self, vdoms=1):
+        """Sleep for the simulated latency; FortiOS handles the VDOMs of one request one after the other."""
+        if self.latency_ms or self.jitter_ms or self.tail_rate:
+            with self.lock:
+                jitter = self.random.uniform(0, self.jitter_ms)
+                # A busy management plane: some requests stall independently of the others
+                if self.tail_rate and self.random.random() < self.tail_rate:
+                    jitter += self.tail_ms
+            time.sleep((self.latency_ms + jitter) * max(vdoms, 1) / 1000.0)
+
+
+def _vdoms(query):
+    return [vdom for vdom in (query.get('vdom') or [''])[0].split(',') if vdom]
+
+
+def _match(row, condition):
+    for operator in ('==', '!=', '=@', '!@', '<=', '>=', '<', '>'):
+        if operator in condition:
+            field, value = condition.split(operator, 1)
+            actual = row.get(field)
+            if isinstance(actual, list):
+                actual = ' '.join(str(item.get('name', item)) if isinstance(item, dict) else str(item)
+                                  for item in actual)
+            actual = '' if actual is None else str(actual)
+            value = unquote(value).strip('"')
+            if operator == '==':
+                return actual == value
+            if operator == '!=':
+                return actual != value
+            if operator == '=@':
+                return value in actual
+            if operator == '!@':
+                return value not in actual
+            try:
+                actual, value = float(actual), float(value)
+            except ValueError:
+                pass
+            return {'<=': actual <= value, '>=': actual >= value, '<': actual < value, '>': actual > value}[operator]
+    return True
+
+
+def _query_rows(rows, query):
+    """Apply FortiOS filter (AND across parameters, OR within a comma list) and key/pattern selection."""
+    for expression in query.get('filter', []):
+        conditions = expression.split(',')
+        rows = [row for row in rows if any(_match(row, condition) for condition in conditions)]
+    if query.get('key') and query.get('pattern'):
+        key, pattern = query['key'][0], query['pattern'][0]
+        rows = [row for row in rows if str(row.get(key)) == pattern]
+    return rows
+
+
+def _project(rows, query):
+    if not query.get('format'):
+        return rows
+    fields = query['format'][0].split('|')
+    return [{field: row.get(field) for field in fields if field in row} for row in rows]
+
+
+def _fake_ip(name, ipv6=False):
+    value = sum(ord(char) * (i + 1) for i, char in enumerate(name))
+    if ipv6:
+        return str(ipaddress.ip_address((0x20010db8 << 96) + value))
+    return str(ipaddress.ip_address((198 << 24) + (51 << 16) + value % 65536))
+
+
+def _names(items):
+    return [{'name': item, 'q_origin_key': item} for item in items]
+
+
+def _load_countries():
+    spec = importlib.util.spec_from_file_location('fortigate_countries', os.path.join(CONNECTOR_DIR, 'countries.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.country_list
+
+
+def vdom_names(vdoms):
+    return ['root'] + ['vdom{0}'.format(i) for i in range(1, vdoms)]
+
+
+def seed(simulator, addresses=20000, group_members=600, apps=5000, policies=10000, services=500, users=200,
+         banned=100, vdoms=1):
+    """Fill the simulator with a configuration of realistic size."""
+    rng = simulator.random
+    insert = simulator.insert
+    for name in vdom_names(vdoms):
+        insert('system/vdom', {'name': name, 'vdom': name})
+    for item in _load_countries():
+        insert('system/geoip-country', {'id': item['id'], 'name': item['name']})
+    address_names = []
+    for i in range(addresses):
+        name = 'addr-{0}'.format(i)
+        if i < group_members:
+            # Members of the block group are named by their IP, like the objects Block IP Address creates
+            name = '10.{0}.{1}.{2}'.format(i >> 16 & 255, i >> 8 & 255, i & 255)
+            entry = {'name': name, 'type': 'ipmask', 'subnet': '{0} 255.255.255.255'.format(name)}
+        elif i % 50 == 1:
+            entry = {'name': name, 'type': 'iprange', 'start-ip': '172.16.{0}.1'.format(i % 256),
+                     'end-ip': '172.16.{0}.200'.format(i % 256), 'subnet': '0.0.0.0 0.0.0.0'}
+        elif i % 50 == 2:
+            entry = {'name': name, 'type': 'fqdn', 'fqdn': 'host{0}.example.com'.format(i),
+                     'subnet': '0.0.0.0 0.0.0.0'}
+        else:
+            entry = {'name': name, 'type': 'ipmask',
+                     'subnet': '10.{0}.{1}.{2} 255.255.255.255'.format(i >> 16 & 255, i >> 8 & 255, i & 255)}
+        insert('firewall/address', dict(entry, comment='', color=0, uuid='00000000-0000-0000-0000-{0:012d}'.format(i)))
+        address_names.append(name)
+    for i in range(min(addresses // 10, 2000)):
+        insert('firewall/address6', {'name': 'addr6-{0}'.format(i), 'type': 'ipprefix',
+                                     'ip6': '2001:db8::{0:x}/128'.format(i + 1)})
+    members = address_names[:group_members]
+    insert('firewall/addrgrp', {'name': BLOCK_GROUP, 'member': _names(members), 'exclude': 'disable',
+                                'exclude-member': []})
+    insert('firewall/addrgrp6', {'name': BLOCK_GROUP, 'member': [], 'exclude': 'disable', 'exclude-member': []})
+    group_names = [BLOCK_GROUP]
+    for i in range(max(addresses // 100, 1)):
+        name = 'grp-{0}'.format(i)
+        insert('firewall/addrgrp', {'name': name, 'member': _names(rng.sample(address_names, min(20, addresses))),
+                                    'exclude': 'disable', 'exclude-member': []})
+        group_names.append(name)
+    service_names = []
+    for i in range(services):
+        name = 'svc-{0}'.format(i)
+        protocol = 'TCP/UDP/SCTP'
+        insert('firewall.service/custom', {'name': name, 'protocol': protocol,
+                                           'tcp-portrange': '{0}'.format(1024 + i), 'udp-portrange': ''})
+        service_names.append(name)
+    insert('firewall.service/custom', {'name': 'HTTPS', 'protocol': 'TCP/UDP/SCTP', 'tcp-portrange': '443'})
+    insert('firewall.service/custom', {'name': 'ALL', 'protocol': 'IP', 'protocol-number': 0})
+    for i in range(max(services // 10, 1)):
+        insert('firewall.service/group', {'name': 'svcgrp-{0}'.format(i),
+                                          'member': _names(rng.sample(service_names, min(10, services)))})
+    for name in ('always', 'weekdays'):
+        insert('firewall.schedule/recurring', {'name': name, 'day': 'monday tuesday wednesday thursday friday'})
+    insert('firewall.schedule/onetime', {'name': 'maintenance', 'start': '00:00 2024/01/01',
+                                         'end': '00:00 2024/01/02'})
+    insert('firewall.schedule/group', {'name': 'sched-grp', 'member': _names(['maintenance'])})
+    insert('firewall/policy', {'policyid': 1, 'name': BLOCK_POLICY, 'action': 'deny', 'status': 'enable',
+                               'srcintf': _names(['any']), 'dstintf': _names(['any']), 'srcaddr': _names(['all']),
+                               'dstaddr': _names([BLOCK_GROUP]), 'srcaddr6': [], 'dstaddr6': _names([BLOCK_GROUP]),
+                               'service': _names(['ALL']), 'schedule': 'always'})
+    objects = address_names + group_names
+    for policyid in range(2, policies + 1):
+        insert('firewall/policy', {
+            'policyid': policyid, 'name': 'policy-{0}'.format(policyid), 'status': 'enable',
+            'action': 'accept' if policyid % 5 else 'deny',
+            'srcintf': _names(['port{0}'.format(policyid % 8 + 1)]), 'dstintf': _names(['port{0}'.format(
+                (policyid + 3) % 8 + 1)]),
+            'srcaddr': _names(rng.sample(objects, 2)), 'dstaddr': _names(rng.sample(objects, 3)),
+            'srcaddr6': [], 'dstaddr6': [],
+            'service': _names(rng.sample(service_names, min(2, services)) if services else ['ALL']),
+            'schedule': 'always', 'logtraffic': 'all', 'nat': 'disable'})
+    categories = [2, 3, 5, 6, 7, 8, 12, 15, 17, 21, 22, 23, 25, 26, 28, 29, 30, 31, 32]
+    for i in range(1, apps + 1):
+        insert('application/name', {'id': i, 'name': 'App.{0}'.format(i), 'category': categories[i % len(categories)],
+                                    'popularity': i % 5 + 1, 'risk': i % 5 + 1, 'protocol': 'TCP', 'vendor': '0'})
+    insert('application/list', {'name': APP_BLOCK_PROFILE, 'entries': [
+        {'id': 1, 'q_origin_key': 1, 'action': 'block', 'application': [{'id': i, 'q_origin_key': i}
+                                                                        for i in range(1, min(apps, 50) + 1)],
+         'category': [], 'risk': [], 'sub-category': []}]})
+    insert('webfilter/urlfilter', {'id': 1, 'name': URL_BLOCK_PROFILE, 'entries': [
+        {'id': i + 1, 'url': 'blocked{0}.example.com'.format(i), 'type': 'simple', 'action': 'block',
+         'status': 'enable'} for i in range(100)]})
+    insert('webfilter/profile', {'name': URL_BLOCK_PROFILE, 'web': {'urlfilter-table': 1, 'blocklist': 'disable'}})
+    user_names = []
+    for i in range(users):
+        name = 'user{0}'.format(i)
+        insert('user/local', {'name': name, 'type': 'password', 'status': 'enable', 'two-factor': 'disable'})
+        user_names.append(name)
+    insert('user/group', {'name': 'SSO_Guest_Users', 'member': _names(user_names[:50])})
+    simulator.singletons['user/quarantine']['targets'] = [
+        {'entry': 'host{0}'.format(i), 'description': '', 'macs': [{'mac': '00:11:22:33:{0:02x}:{1:02x}'.format(
+            i >> 8, i & 255), 'description': ''}]} for i in range(50)]
+    for i in range(banned):
+        simulator.banned['192.0.2.{0}'.format(i % 254 + 1) if i < 254 else '198.18.{0}.{1}'.format(
+            i >> 8, i & 255)] = {'created': int(time.time()), 'expires': 0, 'source': 'ips', 'ipv6': False}
+    return simulator
+
+
+class _Handler(BaseHTTPRequestHandler):
+    simulator = None
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY each keep-alive response stalls on
+    # the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status, payload, path):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        return len(data)
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        query = parse_qs(url.query, keep_blank_values=True)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if url.path.startswith('/__sim__/'):
+            if url.path == '/__sim__/reset':
+                self.simulator.reset_stats()
+            with self.simulator.lock:
+                stats = json.loads(json.dumps(self.simulator.stats))
+            self._respond(200, stats, url.path)
+            return
+        try:
+            body = json.loads(raw.decode('utf-8')) if raw else None
+        except ValueError:
+            body = {key: values[0] for key, values in parse_qs(raw.decode('utf-8')).items()}
+        self.simulator.delay(len(_vdoms(query)) if method == 'GET' else 1)
+        try:
+            status, payload = self.simulator.handle(method, url.path, query, body)
+        except SimulatorError as err:
+            status, payload = err.status, {'http_method': method, 'status': 'error', 'http_status': err.status,
+                                           'error': err.error}
+        sent = self._respond(status, payload, url.path)
+        self.simulator.record(url.path, status, len(raw), sent)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients close connections they no longer need, e.g. the losing copy of a hedged read
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            ThreadingHTTPServer.handle_error(self, request, client_address)
+
+
+def make_server(simulator, host='127.0.0.1', port=0):
+    handler = type('SimulatorHandler', (_Handler,), {'simulator': simulator})
+    server = _Server((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated FortiOS REST API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--addresses', type=int, default=20000)
+    parser.add_argument('--group-members', type=int, default=600)
+    parser.add_argument('--apps', type=int, default=5000)
+    parser.add_argument('--policies', type=int, default=10000)
+    parser.add_argument('--services', type=int, default=500)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--vdoms', type=int, default=1, help='Number of VDOMs: root, vdom1, vdom2, ...')
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--tail-rate', type=float, default=0, help='Share of requests delayed by --tail-ms more')
+    parser.add_argument('--tail-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--error-path', action='append', default=[], metavar='REGEX=STATUS',
+                        help='Answer requests whose path matches REGEX with STATUS; may be repeated')
+    parser.add_argument('--log-polls', type=int, default=0,
+                        help='Log searches report progress this many times before returning results')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    error_paths = {}
+    for item in args.error_path:
+        pattern, status = item.rsplit('=', 1)
+        error_paths[pattern] = int(status)
+    simulator = Simulator(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, tail_rate=args.tail_rate,
+                          tail_ms=args.tail_ms, error_rate=args.error_rate,
+                          error_paths=error_paths, seed=args.seed, log_polls=args.log_polls)
+    seed(simulator, addresses=args.addresses, group_members=args.group_members, apps=args.apps,
+         policies=args.policies, services=args.services, users=args.users, vdoms=args.vdoms)
+    server = make_server(simulator, args.host, args.port)
+    print('FortiOS simulator listening on http://{0}:{1}'.format(*server.server_address), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
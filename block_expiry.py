@@ -0,0 +1,126 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import heapq
+import re
+import time
+from datetime import datetime, timezone
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .pagination import read_all_pages
+from .utils import get_address_grp, _api_request, _validate_vdom, _get_list_from_str_or_list, _run_concurrently
+
+logger = get_logger('fortigate-firewall')
+
+_EXPIRES = re.compile(r'{0}(\d+)'.format(EXPIRY_COMMENT_MARKER))
+
+
+def get_block_duration(params):
+    """Seconds a block lasts according to ``time_to_live``; 0 for ever."""
+    time_to_live = params.get('time_to_live') or 'Never'
+    if time_to_live == 'Custom Time':
+        return int(params.get('duration') or 0)
+    if time_to_live not in time_to_live_values:
+        raise ConnectorError('Invalid Time to Live: {0}'.format(time_to_live))
+    return int(time_to_live_values.get(time_to_live))
+
+
+def expiry_comment(params, now=None):
+    """Comment that records the expiry of the address objects of a policy-based block, or None."""
+    duration = get_block_duration(params)
+    if not duration:
+        return None
+    expires = int((now or time.time()) + duration)
+    return '{0} until {1} {2}{3}'.format(
+        CONNECTOR_OBJECT_COMMENT, datetime.fromtimestamp(expires, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        EXPIRY_COMMENT_MARKER, expires)
+
+
+def parse_expiry(comment):
+    match = _EXPIRES.search(comment or '')
+    return int(match.group(1)) if match else None
+
+
+class ExpiryStore(object):
+    """Address objects with an expiry, ordered by it on a heap so the expired ones are popped first."""
+
+    def __init__(self):
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, name, expires):
+        heapq.heappush(self._heap, (expires, name))
+
+    def next_expiry(self):
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now):
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            expired.append(heapq.heappop(self._heap)[1])
+        return expired
+
+
+def _load_store(config, vdom, members, ip_type):
+    """Expiry store of the group members, from the comments of their address objects."""
+    url = ADD_ADDRESS if ip_type == 'IPv4' else ADD_ADDRESS_IPv6
+    parameters = {'filter': 'comment=@{0}'.format(EXPIRY_COMMENT_MARKER), 'format': 'name|comment'}
+    if vdom:
+        parameters['vdom'] = ','.join(vdom)
+    response = read_all_pages(config, url, parameters)
+    if not isinstance(response, dict) or 'results' not in response:
+        raise ConnectorError('Check Firewall Address permission to read address objects. Response: {0}'.format(
+            response))
+    members = set(members)
+    store = ExpiryStore()
+    for address in response['results']:
+        expires = parse_expiry(address.get('comment'))
+        if expires is not None and address.get('name') in members:
+            store.push(address.get('name'), expires)
+    return store
+
+
+def sweep_expired_blocks(config, params):
+    try:
+        vdom, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        ip_type = params.get('ip_type') or 'IPv4'
+        dry_run = bool(params.get('dry_run'))
+        now = time.time()
+        result = []
+        for ip_group_name in _get_list_from_str_or_list(params, 'ip_group_name'):
+            members = get_address_grp(config, ip_group_name, vdom, type=ip_type)
+            if isinstance(members, bool):
+                raise ConnectorError('Check Firewall Address permission to read the members of {0}.'.format(
+                    ip_group_name))
+            store = _load_store(config, vdom, members, ip_type)
+            expired = store.pop_expired(now)
+            group_result = {'name': ip_group_name, 'expired': expired, 'removed': [], 'not_deleted': [],
+                            'remaining_with_expiry': len(store), 'next_expiry': store.next_expiry()}
+            result.append(group_result)
+            if not expired or dry_run:
+                continue
+            expired_names = set(expired)
+            querystring = {'vdom': ','.join(vdom)} if vdom else {}
+            endpoint = ADDRESS_GROUP_API if ip_type == 'IPv4' else ADDRESS_GROUP_API_IPv6
+            # One update of the group for all expired members, then their address objects
+            _api_request(config, endpoint.format(ip_group_name=ip_group_name.replace('/', '%2f')),
+                         parameters=querystring, method='PUT',
+                         body={'member': [{'name': name} for name in members if name not in expired_names]})
+            group_result['removed'] = expired
+            delete_endpoint = DELETE_ADDRESS if ip_type == 'IPv4' else DELETE_IPv6_ADDRESS
+            for name, response, error in _run_concurrently(config, lambda name: _api_request(
+                    config, delete_endpoint.format(ip_name=name.replace('/', '%2f')), parameters=querystring,
+                    method='DELETE'), expired):
+                if error is not None:
+                    logger.info('Address object {0} not deleted, it may still be referenced: {1}'.format(name, error))
+                    group_result['not_deleted'].append(name)
+        return {'swept_at': int(now), 'dry_run': dry_run, 'groups': result}
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -0,0 +1,163 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import atexit
+import gzip
+import json
+import threading
+import time
+
+import requests
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+
+logger = get_logger('fortigate-firewall')
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def _sanitize(value):
+    if isinstance(value, dict):
+        return {key: CASSETTE_MASK if key in CASSETTE_SENSITIVE_FIELDS and value[key] not in (None, '')
+                else _sanitize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_sanitize(item) for item in value]
+    return value
+
+
+def _canonical_query(parameters):
+    query = {}
+    for key, value in (parameters or {}).items():
+        if key in CASSETTE_SENSITIVE_FIELDS or value is None or value == []:
+            continue
+        query[key] = ','.join(str(item) for item in value) if isinstance(value, (list, tuple)) else str(value)
+    return query
+
+
+def _unordered(value):
+    # Member lists are built from sets in several actions, so their order changes between runs
+    if isinstance(value, dict):
+        return {key: _unordered(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return sorted((_unordered(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    return value
+
+
+def _canonical_body(body):
+    if not body:
+        return None
+    try:
+        return _sanitize(json.loads(body))
+    except ValueError:
+        return body
+
+
+class Cassette(object):
+    """Sanitized REST request/response pairs of one connector run, stored as gzip-compressed JSON lines.
+
+    Each line holds method, path, query, body, status, response body and elapsed seconds; the API key
+    and the fields in ``CASSETTE_SENSITIVE_FIELDS`` are masked. On replay, requests are matched on
+    method, path, query and body (ignoring the order of list items); repeated identical requests get their recorded responses in order,
+    and the last one again once those run out.
+    """
+
+    def __init__(self, path, mode, latency_scale=1.0):
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._file = None
+        self._queues = {}
+        self._last = {}
+        self.recorded = 0
+        self.replayed = 0
+        if mode == 'replay':
+            self._load()
+
+    @staticmethod
+    def _key(method, url, query, body):
+        return json.dumps([method.upper(), url, query, _unordered(body)], sort_keys=True)
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as cassette:
+            for line in cassette:
+                entry = json.loads(line)
+                if 'm' not in entry:
+                    continue
+                key = self._key(entry['m'], entry['u'], entry.get('q') or {}, entry.get('b'))
+                self._queues.setdefault(key, []).append(entry)
+        for key, entries in self._queues.items():
+            entries.reverse()
+
+    def record(self, method, url, parameters, body, response, elapsed):
+        try:
+            content = _sanitize(response.json())
+        except ValueError:
+            content = response.text
+        entry = {'m': method.upper(), 'u': url, 'q': _canonical_query(parameters), 'b': _canonical_body(body),
+                 's': response.status_code, 'r': content, 't': round(elapsed, 4)}
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = gzip.open(self.path, 'at', encoding='utf-8')
+                self._file.write(json.dumps({'version': 1, 'recorded_at': int(time.time())}) + '\n')
+                atexit.register(self.close)
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def replay(self, method, url, parameters, body):
+        key = self._key(method, url, _canonical_query(parameters), _canonical_body(body))
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                entry = queue.pop()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+            if entry is None:
+                raise ConnectorError('No recorded response in cassette {0} for {1} {2} {3}'.format(
+                    self.path, method.upper(), url, _canonical_query(parameters)))
+            self.replayed += 1
+        if self.latency_scale:
+            time.sleep(entry.get('t', 0) * self.latency_scale)
+        response = requests.models.Response()
+        response.status_code = entry['s']
+        content = entry.get('r')
+        response._content = (content if isinstance(content, str) else json.dumps(content)).encode('utf-8')
+        response._content_consumed = True
+        response.encoding = 'utf-8'
+        response.headers['Content-Type'] = 'application/json'
+        response.url = url
+        return response
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def get_cassette(config):
+    """Cassette of ``config['cassette_mode']`` ('record' or 'replay') at ``config['cassette_path']``, if set."""
+    mode = config.get('cassette_mode')
+    if not mode:
+        return None
+    mode = str(mode).lower()
+    if mode not in ('record', 'replay'):
+        raise ConnectorError('Unsupported cassette mode {0}'.format(config.get('cassette_mode')))
+    path = config.get('cassette_path')
+    if not path:
+        raise ConnectorError('Cassette path is required in {0} mode'.format(mode))
+    scale = float(config.get('cassette_latency_scale', 1.0))
+    with _cassettes_lock:
+        cassette = _cassettes.get((mode, path))
+        if cassette is None:
+            cassette = _cassettes[(mode, path)] = Cassette(path, mode, scale)
+        cassette.latency_scale = scale
+        return cassette
@@ -7,9 +7,7 @@
 from io import StringIO
 from os.path import join
 
-import paramiko
 from connectors.core.connector import get_logger, ConnectorError
-from connectors.cyops_utilities.builtins import download_file_from_cyops
 
 from .utils import *
 from .utils import _get_list_from_str_or_list
@@ -19,6 +17,7 @@ logger = get_logger('fortigate-firewall')
 
 def read_file_data(params):
     try:
+        from connectors.cyops_utilities.builtins import download_file_from_cyops
         file_meta = params.get('private_key')
         file_path = join('/tmp', download_file_from_cyops(file_meta.get('@id'))['cyops_file_path'])
         with open(file_path, 'rb') as attachment:
@@ -32,6 +31,8 @@ def read_file_data(params):
 
 def _prepare_ssh_client(config, params):
     try:
+        # paramiko is only needed by Execute Command, so it is not imported with the connector
+        import paramiko
         # extract host info
         host = config.get('address').strip('/')
         host = host.split('//')
@@ -0,0 +1,246 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import hashlib
+import json
+import threading
+import time
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .pagination import read_all_pages
+from .utils import _api_request, _get_config, _validate_vdom
+
+logger = get_logger('fortigate-firewall')
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+_derived = {}
+
+
+def _entry_digest(entry):
+    return hashlib.sha1(json.dumps(entry, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class CmdbTable(object):
+    """Local copy of one CMDB table, keyed by the table primary key and kept in device order."""
+
+    def __init__(self, name, endpoint, key):
+        self.name = name
+        self.endpoint = endpoint
+        self.key = key
+        self.revision = None
+        self.checksum = None
+        self.entries = {}
+        self.digests = {}
+        self.order = []
+        self.version = 0
+        self.synced_at = 0
+
+    def rows(self):
+        return [self.entries[k] for k in self.order]
+
+    def apply(self, results):
+        """Apply a freshly fetched table and return the per-entry difference against the mirror."""
+        diff = {'added': [], 'updated': [], 'removed': []}
+        entries = {}
+        digests = {}
+        order = []
+        for entry in results:
+            key = entry.get(self.key, entry.get('q_origin_key'))
+            digest = _entry_digest(entry)
+            if key not in self.digests:
+                diff['added'].append(key)
+            elif self.digests[key] != digest:
+                diff['updated'].append(key)
+            entries[key] = entry
+            digests[key] = digest
+            order.append(key)
+        diff['removed'] = [key for key in self.order if key not in entries]
+        checksum = hashlib.sha1(''.join(digests[k] for k in order).encode('utf-8')).hexdigest()
+        if checksum != self.checksum:
+            self.entries, self.digests, self.order = entries, digests, order
+            self.checksum = checksum
+            self.version += 1
+        self.synced_at = time.time()
+        return diff
+
+
+class CmdbMirror(object):
+    """Keeps CMDB tables of one device/VDOM in sync by polling the config revision.
+
+    The revision FortiOS returns is config-wide: any configuration change moves it for every table, and
+    no per-table checksum is exposed. So once it moves, every mirrored table is downloaded again; the
+    download is merged entry by entry and ``version`` only moves for tables whose content changed, so
+    readers keep their rows (and anything derived from ``version``) for the tables that didn't.
+    """
+
+    def __init__(self, config, vdom=None, tables=None, poll_interval=MIRROR_POLL_INTERVAL):
+        self.config = config
+        self.vdom = vdom
+        self.poll_interval = poll_interval
+        self.tables = {}
+        for name in tables or MIRROR_TABLES.keys():
+            endpoint, key = MIRROR_TABLES[name]
+            self.tables[name] = CmdbTable(name, endpoint, key)
+        self.last_poll = 0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _parameters(self, **kwargs):
+        parameters = {'vdom': self.vdom} if self.vdom else {}
+        parameters.update(kwargs)
+        return parameters
+
+    def _probe_revision(self, table):
+        response = _api_request(self.config, table.endpoint, parameters=self._parameters(format=table.key, count=1))
+        return response.get('revision') if isinstance(response, dict) else None
+
+    def _fetch(self, table):
+        response = read_all_pages(self.config, table.endpoint, parameters=self._parameters())
+        if not isinstance(response, dict) or 'results' not in response:
+            raise ConnectorError('Check VDOM/user or API key permission to read {0}. Response: {1}'.format(
+                table.name, response))
+        return response.get('revision'), response.get('results', [])
+
+    def sync_table(self, name, force=False, revision=None):
+        table = self.tables[name]
+        with self._lock:
+            if revision is None:
+                revision = self._probe_revision(table)
+            if not force and revision is not None and revision == table.revision:
+                table.synced_at = time.time()
+                return {'revision': revision, 'changed': False}
+            fetched_revision, results = self._fetch(table)
+            diff = table.apply(results)
+            table.revision = fetched_revision if fetched_revision is not None else revision
+            logger.debug('Mirror {0} synced, revision {1}: {2} added, {3} updated, {4} removed'.format(
+                name, table.revision, len(diff['added']), len(diff['updated']), len(diff['removed'])))
+            diff.update({'revision': table.revision, 'changed': any(diff[k] for k in ('added', 'updated', 'removed'))})
+            return diff
+
+    def sync(self, force=False):
+        with self._lock:
+            # One probe answers for all tables, since the revision is the same for each of them
+            revision = self._probe_revision(next(iter(self.tables.values()))) if self.tables else None
+            summary = {name: self.sync_table(name, force=force, revision=revision) for name in self.tables}
+            self.last_poll = time.time()
+            return summary
+
+    def refresh(self, name):
+        """Probe the table revision unless it was confirmed within the last MIRROR_PROBE_INTERVAL."""
+        if time.time() - self.tables[name].synced_at >= MIRROR_PROBE_INTERVAL:
+            self.sync_table(name)
+
+    def rows(self, name):
+        self.refresh(name)
+        return self.tables[name].rows()
+
+    def version(self, name):
+        return self.tables[name].version
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='fortigate-cmdb-mirror', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.sync()
+            except Exception as err:
+                logger.error('CMDB mirror sync failed: {0}'.format(str(err)))
+
+
+def is_mirror_enabled(config):
+    return bool(config.get('cmdb_mirror'))
+
+
+def get_mirror(config, vdom=None, start=True):
+    server_url, api_key, verify_ssl = _get_config(config)
+    mirror_key = (server_url, api_key, vdom)
+    with _mirrors_lock:
+        mirror = _mirrors.get(mirror_key)
+        if mirror is None:
+            poll_interval = int(config.get('mirror_poll_interval') or MIRROR_POLL_INTERVAL)
+            mirror = CmdbMirror(config, vdom=vdom, poll_interval=poll_interval)
+            _mirrors[mirror_key] = mirror
+    if mirror.last_poll == 0:
+        mirror.sync()
+    if start:
+        mirror.start()
+    return mirror
+
+
+def get_cached_response(config, table, vdom_list):
+    """Serve a full-table GET from the mirror; returns None when the mirror can't answer it."""
+    if not is_mirror_enabled(config) or len(vdom_list or []) > 1:
+        return None
+    vdom = vdom_list[0] if vdom_list else None
+    mirror = get_mirror(config, vdom)
+    rows = mirror.rows(table)
+    return {'http_method': 'GET', 'results': rows, 'vdom': vdom, 'revision': mirror.tables[table].revision,
+            'status': 'success', 'http_status': 200}
+
+
+def get_table_rows(config, table, vdom_list):
+    """Rows of a CMDB table from the mirror when enabled, otherwise straight from the device."""
+    cached = get_cached_response(config, table, vdom_list)
+    if cached is not None:
+        return cached.get('results', [])
+    endpoint, key = MIRROR_TABLES[table]
+    parameters = {'vdom': ','.join(vdom_list)} if vdom_list else {}
+    response = _api_request(config, endpoint, parameters=parameters)
+    if isinstance(response, list):
+        return [row for record in response for row in record.get('results', [])]
+    return response.get('results', [])
+
+
+def get_derived(config, vdom_list, tables, name, builder):
+    """Structure built by ``builder`` from the rows of ``tables``.
+
+    With the mirror enabled the result is reused until one of the tables changes version; without it, or
+    when ``name`` is None, the tables are fetched and the structure is built for this call only. The
+    versions are read before the rows and checked again after the build, so a sync in between doesn't
+    leave a structure built from older rows cached under the newer versions.
+    """
+    if name is None or not is_mirror_enabled(config) or len(vdom_list or []) > 1:
+        return builder({table: get_table_rows(config, table, vdom_list) for table in tables})
+    mirror = get_mirror(config, vdom_list[0] if vdom_list else None)
+    for table in tables:
+        mirror.refresh(table)
+    versions = tuple(mirror.version(table) for table in tables)
+    cached = _derived.get((id(mirror), name))
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    value = builder({table: get_table_rows(config, table, vdom_list) for table in tables})
+    if tuple(mirror.version(table) for table in tables) == versions:
+        _derived[(id(mirror), name)] = (versions, value)
+    return value
+
+
+def sync_cmdb_mirror(config, params):
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        vdom = vdom_list[0] if vdom_list else None
+        mirror = get_mirror(config, vdom, start=is_mirror_enabled(config))
+        summary = mirror.sync(force=bool(params.get('force')))
+        return {'vdom': vdom, 'tables': {name: {'revision': diff.get('revision'),
+                                                'changed': diff.get('changed'),
+                                                'added': len(diff.get('added', [])),
+                                                'updated': len(diff.get('updated', [])),
+                                                'removed': len(diff.get('removed', [])),
+                                                'entries': len(mirror.tables[name].order)}
+                                         for name, diff in summary.items()}}
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -14,13 +14,26 @@ class FortiGate(Connector):
     def execute(self, config, operation, params, **kwargs):
         try:
             logger.info('In execute() Operation:[{}]'.format(operation))
+            operation_name = operation
             operation = fortigate_operations.get(operation, None)
-            result = operation(config, params)
-            return result
+            if config.get('profile_operations') or config.get('profile_sample_percent'):
+                # cProfile and pstats are only loaded when profiling is configured
+                from .profiling import should_profile, profile_operation
+                if should_profile(config, operation_name):
+                    with profile_operation(config, operation_name):
+                        return self._run(config, operation_name, operation, params)
+            return self._run(config, operation_name, operation, params)
         except Exception as e:
             logger.error('Error in Operation:[{0}] \n{1}'.format(operation.__name__, str(e)))
             raise ConnectorError(e)
 
+    def _run(self, config, operation_name, operation, params):
+        if config.get('collect_metrics'):
+            from .metrics import track_operation
+            with track_operation(operation_name):
+                return operation(config, params)
+        return operation(config, params)
+
     def check_health(self, config):
         try:
             return check_health(config)
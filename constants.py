@@ -39,11 +39,101 @@ SYSTEM_EVENTS = '/api/v2/log/{0}/event/system'
 USER_ACTIVATION_API = '/api/v2/monitor/user/fortitoken/send-activation'
 USER_API = '/api/v2/cmdb/user/local/'
 USER_GROUP = '/api/v2/cmdb/user/group/{group_name}'
+ADDRESS_FQDNS_API = '/api/v2/monitor/firewall/address-fqdns'
+ADDRESS6_FQDNS_API = '/api/v2/monitor/firewall/address-fqdns6'
+POLICY_STATS_API = '/api/v2/monitor/firewall/policy'
+OBJECT_USAGE_API = '/api/v2/monitor/system/object/usage'
 
 ADDRESS_GROUP_MEMBER_API = '/api/v2/cmdb/firewall/addrgrp/{ip_group_name}/member'
 ADDRESS_GROUP_MEMBER_API_IPv6 = '/api/v2/cmdb/firewall/addrgrp6/{ip_group_name}/member'
 MAX_GROUP_SIZE = 600  # 300 limit for 6.0.5 version
 MAX_RETRY = 5
+MAX_WORKERS = 8  # default bound for concurrent REST calls
+PAGE_SIZE = 1000
+OBJECT_USAGE_QTYPES = {
+    'address': '[31]',
+    'service': '[36]',
+    'schedule': '[38]'
+}
+
+# CMDB tables kept in the local mirror: table name -> (endpoint, primary key)
+MIRROR_TABLES = {
+    'address': (ADD_ADDRESS, 'name'),
+    'address6': (ADD_ADDRESS_IPv6, 'name'),
+    'addrgrp': (ADDRESS_GROUP_ALL_API, 'name'),
+    'addrgrp6': (ADDRESS_GROUP_ALL_API_IPv6, 'name'),
+    'service': (FIREWALL_SERVICE_API, 'name'),
+    'service_group': (FIREWALL_SERVICE_GRP_API, 'name'),
+    'policy': (LIST_OF_POLICIES_API, 'policyid'),
+    'user': (USER_API, 'name')
+}
+MIRROR_POLL_INTERVAL = 30  # seconds between background syncs of all mirrored tables
+MIRROR_PROBE_INTERVAL = 1  # reads within this many seconds of the last probe skip the revision check
+COUNTRY_CATALOG_TTL = 86400  # seconds a country list read from the device is reused
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRICS_API_CALL_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Masked in recorded cassettes, in query parameters as well as in request and response bodies
+CASSETTE_SENSITIVE_FIELDS = ('access_token', 'api_key', 'passwd', 'password', 'psksecret', 'private_key', 'secret',
+                             'fortitoken', 'sms-phone', 'email-to', 'two-factor-authentication')
+CASSETTE_MASK = '******'
+PROFILE_DIRECTORY_NAME = 'fortigate-profiles'  # under the system temp directory unless profile_directory is set
+PROFILE_MAX_ARTIFACTS = 50
+PROFILE_TOP_FUNCTIONS = 25
+PROFILE_EXCLUDED_OPERATIONS = ('get_operation_profiles', 'get_connector_metrics')
+STREAM_CHUNK_SIZE = 65536
+DEVICE_FILTER_OPERATORS = ('==', '!=', '=@', '!@', '<=', '>=', '<', '>')
+FILTER_OPERATORS = DEVICE_FILTER_OPERATORS + ('=~',)  # =~ (regular expression) is evaluated locally
+# Actions that Run Fleet Operation can send to several devices: title -> operation
+FLEET_OPERATIONS = {
+    'Block IP Address': 'block_ip',
+    'Unblock IP Address': 'unblock_ip',
+    'Block URL': 'block_url',
+    'Unblock URL': 'unblock_url',
+    'Block Application': 'block_applications',
+    'Unblock Application': 'unblock_applications',
+    'Quarantine Host': 'quarantine_host',
+    'Unquarantine Host': 'unquarantine_host',
+    'Get Blocked IP Addresses': 'get_blocked_ip'
+}
+FLEET_DEVICE_TIMEOUT = 60  # seconds each device gets to finish the operation
+FLEET_MAX_DEVICES = 16  # devices worked on in parallel
+FLEET_DEVICE_KEYS = ('config', 'name', 'vdom')  # keys a device of Run Fleet Operation can set
+CONNECTOR_CONFIGURATIONS_API = '/api/integration/connectors/{name}/{version}/'
+HA_PEER_API = '/api/v2/monitor/system/ha-peer'
+# Reads that a secondary HA unit can answer: synchronized configuration and the quarantine list. Not logs,
+# which each unit stores on its own
+HA_READ_ENDPOINTS = ('/api/v2/cmdb/', '/api/v2/monitor/user/banned/select')
+HA_DISCOVERY_INTERVAL = 300  # seconds between checks of the cluster members
+HA_MEMBER_RETRY_INTERVAL = 30  # seconds a failed secondary is skipped
+HA_WRITE_STICKINESS = 10  # seconds after a write during which reads stay on the primary
+HA_PROBE_TIMEOUT = 5
+HEDGE_PERCENTILE = 95  # default latency percentile after which a read is duplicated
+HEDGE_INITIAL_DELAY = 0.25  # seconds, until HEDGE_MIN_SAMPLES latencies of the endpoint are known
+HEDGE_MIN_DELAY = 0.005
+HEDGE_MIN_SAMPLES = 20
+HEDGE_SAMPLE_SIZE = 200  # latencies kept per endpoint
+HEDGE_MAX_THREADS = 64
+HEDGE_EXCLUDED_ENDPOINTS = ('/api/v2/log/',)  # log reads start and poll search sessions
+RECONCILE_INDICATOR_TYPES = ('IP Address', 'URL', 'Application')
+RECONCILE_BATCH_SIZE = 1000  # IP addresses per ban/clear request of Reconcile Block List
+COMPACTION_DENSITY = 100  # percent of a CIDR block that must be blocked to block the whole block
+COMPACTION_MAX_SIZE = 256  # addresses of the largest block blocked whole below 100% density
+EXPIRY_COMMENT_MARKER = 'expires='  # followed by the epoch time in address object comments
+CONNECTOR_OBJECT_MARKER = '[fortisoar-block]'  # in the comment of every address object blocking creates
+CONNECTOR_OBJECT_COMMENT = CONNECTOR_OBJECT_MARKER + ' Blocked by FortiSOAR'
+EXTERNAL_RESOURCE_API = '/api/v2/cmdb/system/external-resource'
+REFRESH_EXTERNAL_RESOURCE_API = '/api/v2/monitor/system/external-resource/refresh'
+# Feed type of Update Threat Feed -> type of the FortiOS external resource
+THREAT_FEED_TYPES = {
+    'IP Address': 'address',
+    'Domain': 'domain'
+}
+THREAT_FEED_DIRECTORY_NAME = 'fortigate-threat-feeds'  # under the system temp directory by default
+THREAT_FEED_REFRESH_RATE = 5  # minutes between downloads of a feed by the FortiGate
+THREAT_FEED_DOMAIN_CATEGORY = 192  # first of the remote categories (192-221) of domain feeds
+THREAT_FEED_SERVER_START_TIMEOUT = 5  # seconds to wait for a newly started feed server to listen
+GC_BATCH_SIZE = 50  # address objects deleted concurrently per pass of Collect Orphaned Addresses
+GC_BATCH_INTERVAL = 1  # seconds between the passes
 time_to_live_values = {
     '1 Hour': 3600,
     '6 Hour': 21600,
@@ -82,1018 +172,3 @@ security_profiles = {
     "File Filter": "file-filter-profile",
     "SSL Inspection": "ssl-ssh-profile"
 }
-
-country_list = [
-    {
-        "id": "AD",
-        "name": "Andorra"
-    },
-    {
-        "id": "AE",
-        "name": "United Arab Emirates"
-    },
-    {
-        "id": "AF",
-        "name": "Afghanistan"
-    },
-    {
-        "id": "AG",
-        "name": "Antigua and Barbuda"
-    },
-    {
-        "id": "AI",
-        "name": "Anguilla"
-    },
-    {
-        "id": "AL",
-        "name": "Albania"
-    },
-    {
-        "id": "AM",
-        "name": "Armenia"
-    },
-    {
-        "id": "AN",
-        "name": "Netherlands Antilles"
-    },
-    {
-        "id": "AO",
-        "name": "Angola"
-    },
-    {
-        "id": "AQ",
-        "name": "Antarctica"
-    },
-    {
-        "id": "AR",
-        "name": "Argentina"
-    },
-    {
-        "id": "AS",
-        "name": "American Samoa"
-    },
-    {
-        "id": "AT",
-        "name": "Austria"
-    },
-    {
-        "id": "AU",
-        "name": "Australia"
-    },
-    {
-        "id": "AW",
-        "name": "Aruba"
-    },
-    {
-        "id": "AX",
-        "name": "Aland Islands"
-    },
-    {
-        "id": "AZ",
-        "name": "Azerbaijan"
-    },
-    {
-        "id": "BA",
-        "name": "Bosnia and Herzegovina"
-    },
-    {
-        "id": "BB",
-        "name": "Barbados"
-    },
-    {
-        "id": "BD",
-        "name": "Bangladesh"
-    },
-    {
-        "id": "BE",
-        "name": "Belgium"
-    },
-    {
-        "id": "BF",
-        "name": "Burkina Faso"
-    },
-    {
-        "id": "BG",
-        "name": "Bulgaria"
-    },
-    {
-        "id": "BH",
-        "name": "Bahrain"
-    },
-    {
-        "id": "BI",
-        "name": "Burundi"
-    },
-    {
-        "id": "BJ",
-        "name": "Benin"
-    },
-    {
-        "id": "BL",
-        "name": "Saint Bartelemey"
-    },
-    {
-        "id": "BM",
-        "name": "Bermuda"
-    },
-    {
-        "id": "BN",
-        "name": "Brunei Darussalam"
-    },
-    {
-        "id": "BO",
-        "name": "Bolivia"
-    },
-    {
-        "id": "BQ",
-        "name": "Bonaire, Saint Eustatius and Saba"
-    },
-    {
-        "id": "BR",
-        "name": "Brazil"
-    },
-    {
-        "id": "BS",
-        "name": "Bahamas"
-    },
-    {
-        "id": "BT",
-        "name": "Bhutan"
-    },
-    {
-        "id": "BV",
-        "name": "Bouvet Island"
-    },
-    {
-        "id": "BW",
-        "name": "Botswana"
-    },
-    {
-        "id": "BY",
-        "name": "Belarus"
-    },
-    {
-        "id": "BZ",
-        "name": "Belize"
-    },
-    {
-        "id": "CA",
-        "name": "Canada"
-    },
-    {
-        "id": "CC",
-        "name": "Cocos (Keeling) Islands"
-    },
-    {
-        "id": "CD",
-        "name": "Congo, The Democratic Republic of the"
-    },
-    {
-        "id": "CF",
-        "name": "Central African Republic"
-    },
-    {
-        "id": "CG",
-        "name": "Congo"
-    },
-    {
-        "id": "CH",
-        "name": "Switzerland"
-    },
-    {
-        "id": "CI",
-        "name": "Cote d'Ivoire"
-    },
-    {
-        "id": "CK",
-        "name": "Cook Islands"
-    },
-    {
-        "id": "CL",
-        "name": "Chile"
-    },
-    {
-        "id": "CM",
-        "name": "Cameroon"
-    },
-    {
-        "id": "CN",
-        "name": "China"
-    },
-    {
-        "id": "CO",
-        "name": "Colombia"
-    },
-    {
-        "id": "CR",
-        "name": "Costa Rica"
-    },
-    {
-        "id": "CU",
-        "name": "Cuba"
-    },
-    {
-        "id": "CV",
-        "name": "Cape Verde"
-    },
-    {
-        "id": "CW",
-        "name": "Curacao"
-    },
-    {
-        "id": "CX",
-        "name": "Christmas Island"
-    },
-    {
-        "id": "CY",
-        "name": "Cyprus"
-    },
-    {
-        "id": "CZ",
-        "name": "Czech Republic"
-    },
-    {
-        "id": "DE",
-        "name": "Germany"
-    },
-    {
-        "id": "DJ",
-        "name": "Djibouti"
-    },
-    {
-        "id": "DK",
-        "name": "Denmark"
-    },
-    {
-        "id": "DM",
-        "name": "Dominica"
-    },
-    {
-        "id": "DO",
-        "name": "Dominican Republic"
-    },
-    {
-        "id": "DZ",
-        "name": "Algeria"
-    },
-    {
-        "id": "EC",
-        "name": "Ecuador"
-    },
-    {
-        "id": "EE",
-        "name": "Estonia"
-    },
-    {
-        "id": "EG",
-        "name": "Egypt"
-    },
-    {
-        "id": "EH",
-        "name": "Western Sahara"
-    },
-    {
-        "id": "ER",
-        "name": "Eritrea"
-    },
-    {
-        "id": "ES",
-        "name": "Spain"
-    },
-    {
-        "id": "ET",
-        "name": "Ethiopia"
-    },
-    {
-        "id": "FI",
-        "name": "Finland"
-    },
-    {
-        "id": "FJ",
-        "name": "Fiji"
-    },
-    {
-        "id": "FK",
-        "name": "Falkland Islands (Malvinas)"
-    },
-    {
-        "id": "FM",
-        "name": "Micronesia, Federated States of"
-    },
-    {
-        "id": "FO",
-        "name": "Faroe Islands"
-    },
-    {
-        "id": "FR",
-        "name": "France"
-    },
-    {
-        "id": "GA",
-        "name": "Gabon"
-    },
-    {
-        "id": "GB",
-        "name": "United Kingdom"
-    },
-    {
-        "id": "GD",
-        "name": "Grenada"
-    },
-    {
-        "id": "GE",
-        "name": "Georgia"
-    },
-    {
-        "id": "GF",
-        "name": "French Guiana"
-    },
-    {
-        "id": "GG",
-        "name": "Guernsey"
-    },
-    {
-        "id": "GH",
-        "name": "Ghana"
-    },
-    {
-        "id": "GI",
-        "name": "Gibraltar"
-    },
-    {
-        "id": "GL",
-        "name": "Greenland"
-    },
-    {
-        "id": "GM",
-        "name": "Gambia"
-    },
-    {
-        "id": "GN",
-        "name": "Guinea"
-    },
-    {
-        "id": "GP",
-        "name": "Guadeloupe"
-    },
-    {
-        "id": "GQ",
-        "name": "Equatorial Guinea"
-    },
-    {
-        "id": "GR",
-        "name": "Greece"
-    },
-    {
-        "id": "GS",
-        "name": "South Georgia and the South Sandwich Islands"
-    },
-    {
-        "id": "GT",
-        "name": "Guatemala"
-    },
-    {
-        "id": "GU",
-        "name": "Guam"
-    },
-    {
-        "id": "GW",
-        "name": "Guinea-Bissau"
-    },
-    {
-        "id": "GY",
-        "name": "Guyana"
-    },
-    {
-        "id": "HK",
-        "name": "Hong Kong"
-    },
-    {
-        "id": "HM",
-        "name": "Heard Island and McDonald Islands"
-    },
-    {
-        "id": "HN",
-        "name": "Honduras"
-    },
-    {
-        "id": "HR",
-        "name": "Croatia"
-    },
-    {
-        "id": "HT",
-        "name": "Haiti"
-    },
-    {
-        "id": "HU",
-        "name": "Hungary"
-    },
-    {
-        "id": "ID",
-        "name": "Indonesia"
-    },
-    {
-        "id": "IE",
-        "name": "Ireland"
-    },
-    {
-        "id": "IL",
-        "name": "Israel"
-    },
-    {
-        "id": "IM",
-        "name": "Isle of Man"
-    },
-    {
-        "id": "IN",
-        "name": "India"
-    },
-    {
-        "id": "IO",
-        "name": "British Indian Ocean Territory"
-    },
-    {
-        "id": "IQ",
-        "name": "Iraq"
-    },
-    {
-        "id": "IR",
-        "name": "Iran, Islamic Republic of"
-    },
-    {
-        "id": "IS",
-        "name": "Iceland"
-    },
-    {
-        "id": "IT",
-        "name": "Italy"
-    },
-    {
-        "id": "JE",
-        "name": "Jersey"
-    },
-    {
-        "id": "JM",
-        "name": "Jamaica"
-    },
-    {
-        "id": "JO",
-        "name": "Jordan"
-    },
-    {
-        "id": "JP",
-        "name": "Japan"
-    },
-    {
-        "id": "KE",
-        "name": "Kenya"
-    },
-    {
-        "id": "KG",
-        "name": "Kyrgyzstan"
-    },
-    {
-        "id": "KH",
-        "name": "Cambodia"
-    },
-    {
-        "id": "KI",
-        "name": "Kiribati"
-    },
-    {
-        "id": "KM",
-        "name": "Comoros"
-    },
-    {
-        "id": "KN",
-        "name": "Saint Kitts and Nevis"
-    },
-    {
-        "id": "KP",
-        "name": "Korea, Democratic People's Republic of"
-    },
-    {
-        "id": "KR",
-        "name": "Korea, Republic of"
-    },
-    {
-        "id": "KW",
-        "name": "Kuwait"
-    },
-    {
-        "id": "KY",
-        "name": "Cayman Islands"
-    },
-    {
-        "id": "KZ",
-        "name": "Kazakhstan"
-    },
-    {
-        "id": "LA",
-        "name": "Lao People's Democratic Republic"
-    },
-    {
-        "id": "LB",
-        "name": "Lebanon"
-    },
-    {
-        "id": "LC",
-        "name": "Saint Lucia"
-    },
-    {
-        "id": "LI",
-        "name": "Liechtenstein"
-    },
-    {
-        "id": "LK",
-        "name": "Sri Lanka"
-    },
-    {
-        "id": "LR",
-        "name": "Liberia"
-    },
-    {
-        "id": "LS",
-        "name": "Lesotho"
-    },
-    {
-        "id": "LT",
-        "name": "Lithuania"
-    },
-    {
-        "id": "LU",
-        "name": "Luxembourg"
-    },
-    {
-        "id": "LV",
-        "name": "Latvia"
-    },
-    {
-        "id": "LY",
-        "name": "Libyan Arab Jamahiriya"
-    },
-    {
-        "id": "MA",
-        "name": "Morocco"
-    },
-    {
-        "id": "MC",
-        "name": "Monaco"
-    },
-    {
-        "id": "MD",
-        "name": "Moldova, Republic of"
-    },
-    {
-        "id": "ME",
-        "name": "Montenegro"
-    },
-    {
-        "id": "MF",
-        "name": "Saint Martin"
-    },
-    {
-        "id": "MG",
-        "name": "Madagascar"
-    },
-    {
-        "id": "MH",
-        "name": "Marshall Islands"
-    },
-    {
-        "id": "MK",
-        "name": "Macedonia"
-    },
-    {
-        "id": "ML",
-        "name": "Mali"
-    },
-    {
-        "id": "MM",
-        "name": "Myanmar"
-    },
-    {
-        "id": "MN",
-        "name": "Mongolia"
-    },
-    {
-        "id": "MO",
-        "name": "Macao"
-    },
-    {
-        "id": "MP",
-        "name": "Northern Mariana Islands"
-    },
-    {
-        "id": "MQ",
-        "name": "Martinique"
-    },
-    {
-        "id": "MR",
-        "name": "Mauritania"
-    },
-    {
-        "id": "MS",
-        "name": "Montserrat"
-    },
-    {
-        "id": "MT",
-        "name": "Malta"
-    },
-    {
-        "id": "MU",
-        "name": "Mauritius"
-    },
-    {
-        "id": "MV",
-        "name": "Maldives"
-    },
-    {
-        "id": "MW",
-        "name": "Malawi"
-    },
-    {
-        "id": "MX",
-        "name": "Mexico"
-    },
-    {
-        "id": "MY",
-        "name": "Malaysia"
-    },
-    {
-        "id": "MZ",
-        "name": "Mozambique"
-    },
-    {
-        "id": "NA",
-        "name": "Namibia"
-    },
-    {
-        "id": "NC",
-        "name": "New Caledonia"
-    },
-    {
-        "id": "NE",
-        "name": "Niger"
-    },
-    {
-        "id": "NF",
-        "name": "Norfolk Island"
-    },
-    {
-        "id": "NG",
-        "name": "Nigeria"
-    },
-    {
-        "id": "NI",
-        "name": "Nicaragua"
-    },
-    {
-        "id": "NL",
-        "name": "Netherlands"
-    },
-    {
-        "id": "NO",
-        "name": "Norway"
-    },
-    {
-        "id": "NP",
-        "name": "Nepal"
-    },
-    {
-        "id": "NR",
-        "name": "Nauru"
-    },
-    {
-        "id": "NU",
-        "name": "Niue"
-    },
-    {
-        "id": "NZ",
-        "name": "New Zealand"
-    },
-    {
-        "id": "O1",
-        "name": "Other Country"
-    },
-    {
-        "id": "OM",
-        "name": "Oman"
-    },
-    {
-        "id": "PA",
-        "name": "Panama"
-    },
-    {
-        "id": "PE",
-        "name": "Peru"
-    },
-    {
-        "id": "PF",
-        "name": "French Polynesia"
-    },
-    {
-        "id": "PG",
-        "name": "Papua New Guinea"
-    },
-    {
-        "id": "PH",
-        "name": "Philippines"
-    },
-    {
-        "id": "PK",
-        "name": "Pakistan"
-    },
-    {
-        "id": "PL",
-        "name": "Poland"
-    },
-    {
-        "id": "PM",
-        "name": "Saint Pierre and Miquelon"
-    },
-    {
-        "id": "PN",
-        "name": "Pitcairn"
-    },
-    {
-        "id": "PR",
-        "name": "Puerto Rico"
-    },
-    {
-        "id": "PS",
-        "name": "Palestinian Territory"
-    },
-    {
-        "id": "PT",
-        "name": "Portugal"
-    },
-    {
-        "id": "PW",
-        "name": "Palau"
-    },
-    {
-        "id": "PY",
-        "name": "Paraguay"
-    },
-    {
-        "id": "QA",
-        "name": "Qatar"
-    },
-    {
-        "id": "RE",
-        "name": "Reunion"
-    },
-    {
-        "id": "RO",
-        "name": "Romania"
-    },
-    {
-        "id": "RS",
-        "name": "Serbia"
-    },
-    {
-        "id": "RU",
-        "name": "Russian Federation"
-    },
-    {
-        "id": "RW",
-        "name": "Rwanda"
-    },
-    {
-        "id": "SA",
-        "name": "Saudi Arabia"
-    },
-    {
-        "id": "SB",
-        "name": "Solomon Islands"
-    },
-    {
-        "id": "SC",
-        "name": "Seychelles"
-    },
-    {
-        "id": "SD",
-        "name": "Sudan"
-    },
-    {
-        "id": "SE",
-        "name": "Sweden"
-    },
-    {
-        "id": "SG",
-        "name": "Singapore"
-    },
-    {
-        "id": "SH",
-        "name": "Saint Helena"
-    },
-    {
-        "id": "SI",
-        "name": "Slovenia"
-    },
-    {
-        "id": "SJ",
-        "name": "Svalbard and Jan Mayen"
-    },
-    {
-        "id": "SK",
-        "name": "Slovakia"
-    },
-    {
-        "id": "SL",
-        "name": "Sierra Leone"
-    },
-    {
-        "id": "SM",
-        "name": "San Marino"
-    },
-    {
-        "id": "SN",
-        "name": "Senegal"
-    },
-    {
-        "id": "SO",
-        "name": "Somalia"
-    },
-    {
-        "id": "SR",
-        "name": "Suriname"
-    },
-    {
-        "id": "SS",
-        "name": "South Sudan"
-    },
-    {
-        "id": "ST",
-        "name": "Sao Tome and Principe"
-    },
-    {
-        "id": "SV",
-        "name": "El Salvador"
-    },
-    {
-        "id": "SX",
-        "name": "Sint Maarten"
-    },
-    {
-        "id": "SY",
-        "name": "Syrian Arab Republic"
-    },
-    {
-        "id": "SZ",
-        "name": "Swaziland"
-    },
-    {
-        "id": "TC",
-        "name": "Turks and Caicos Islands"
-    },
-    {
-        "id": "TD",
-        "name": "Chad"
-    },
-    {
-        "id": "TF",
-        "name": "French Southern Territories"
-    },
-    {
-        "id": "TG",
-        "name": "Togo"
-    },
-    {
-        "id": "TH",
-        "name": "Thailand"
-    },
-    {
-        "id": "TJ",
-        "name": "Tajikistan"
-    },
-    {
-        "id": "TK",
-        "name": "Tokelau"
-    },
-    {
-        "id": "TL",
-        "name": "Timor-Leste"
-    },
-    {
-        "id": "TM",
-        "name": "Turkmenistan"
-    },
-    {
-        "id": "TN",
-        "name": "Tunisia"
-    },
-    {
-        "id": "TO",
-        "name": "Tonga"
-    },
-    {
-        "id": "TR",
-        "name": "Turkey"
-    },
-    {
-        "id": "TT",
-        "name": "Trinidad and Tobago"
-    },
-    {
-        "id": "TV",
-        "name": "Tuvalu"
-    },
-    {
-        "id": "TW",
-        "name": "Taiwan"
-    },
-    {
-        "id": "TZ",
-        "name": "Tanzania, United Republic of"
-    },
-    {
-        "id": "UA",
-        "name": "Ukraine"
-    },
-    {
-        "id": "UG",
-        "name": "Uganda"
-    },
-    {
-        "id": "UM",
-        "name": "United States Minor Outlying Islands"
-    },
-    {
-        "id": "US",
-        "name": "United States"
-    },
-    {
-        "id": "UY",
-        "name": "Uruguay"
-    },
-    {
-        "id": "UZ",
-        "name": "Uzbekistan"
-    },
-    {
-        "id": "VA",
-        "name": "Holy See (Vatican City State)"
-    },
-    {
-        "id": "VC",
-        "name": "Saint Vincent and the Grenadines"
-    },
-    {
-        "id": "VE",
-        "name": "Venezuela"
-    },
-    {
-        "id": "VG",
-        "name": "Virgin Islands, British"
-    },
-    {
-        "id": "VI",
-        "name": "Virgin Islands, U.S."
-    },
-    {
-        "id": "VN",
-        "name": "Vietnam"
-    },
-    {
-        "id": "VU",
-        "name": "Vanuatu"
-    },
-    {
-        "id": "WF",
-        "name": "Wallis and Futuna"
-    },
-    {
-        "id": "WS",
-        "name": "Samoa"
-    },
-    {
-        "id": "XK",
-        "name": "Kosovo"
-    },
-    {
-        "id": "YE",
-        "name": "Yemen"
-    },
-    {
-        "id": "YT",
-        "name": "Mayotte"
-    },
-    {
-        "id": "ZA",
-        "name": "South Africa"
-    },
-    {
-        "id": "ZM",
-        "name": "Zambia"
-    },
-    {
-        "id": "ZW",
-        "name": "Zimbabwe"
-    },
-    {
-        "id": "ZZ",
-        "name": "Reserved"
-    }
-]
@@ -0,0 +1,170 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import threading
+import time
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .utils import _api_request, _get_config, _validate_vdom, _get_list_from_str_or_list, _run_concurrently
+
+logger = get_logger('fortigate-firewall')
+
+# Common names that differ from the FortiOS country names, keyed case-insensitively
+COUNTRY_ALIASES = {
+    'usa': 'US', 'united states of america': 'US', 'america': 'US',
+    'uk': 'GB', 'great britain': 'GB', 'britain': 'GB', 'england': 'GB',
+    'russia': 'RU', 'iran': 'IR', 'north korea': 'KP', 'south korea': 'KR', 'korea': 'KR',
+    'syria': 'SY', 'laos': 'LA', 'libya': 'LY', 'moldova': 'MD', 'tanzania': 'TZ', 'vatican': 'VA',
+    'vatican city': 'VA', 'palestine': 'PS', 'brunei': 'BN', 'micronesia': 'FM', 'macau': 'MO',
+    'ivory coast': 'CI', 'north macedonia': 'MK', 'czechia': 'CZ', 'eswatini': 'SZ', 'cabo verde': 'CV',
+    'east timor': 'TL', 'dr congo': 'CD', 'drc': 'CD', 'democratic republic of the congo': 'CD',
+    'republic of the congo': 'CG', 'falkland islands': 'FK', 'british virgin islands': 'VG',
+    'us virgin islands': 'VI', 'turkiye': 'TR', 'uae': 'AE', 'viet nam': 'VN'
+}
+GEO_BLOCK_TYPES = {
+    'IPv4 Address': (ADD_ADDRESS, ADDRESS_GROUP_ALL_API, ADDRESS_GROUP_API),
+    'IPv6 Address': (ADD_ADDRESS_IPv6, ADDRESS_GROUP_ALL_API_IPv6, ADDRESS_GROUP_API_IPv6)
+}
+
+_device_catalogs = {}
+_device_catalogs_lock = threading.Lock()
+_builtin_catalog = None
+
+
+class CountryCatalog(object):
+    """Country id <-> name lookups, built once from a list of ``{'id': ..., 'name': ...}`` entries.
+
+    ``id_for`` accepts the exact FortiOS name, any casing of a name or id, or one of ``COUNTRY_ALIASES``.
+    """
+
+    def __init__(self, countries):
+        self.by_id = {}
+        self.by_name = {}
+        for item in countries:
+            if item.get('id') and item.get('name'):
+                self.by_id[item.get('id')] = item.get('name')
+                self.by_name[item.get('name')] = item.get('id')
+        self.names = list(self.by_name)
+        self._keys = {alias: country_id for alias, country_id in COUNTRY_ALIASES.items() if country_id in self.by_id}
+        self._keys.update({country_id.lower(): country_id for country_id in self.by_id})
+        self._keys.update({name.lower(): country_id for name, country_id in self.by_name.items()})
+
+    def id_for(self, value):
+        if value is None:
+            return None
+        value = str(value).strip()
+        return self.by_name.get(value) or self._keys.get(value.lower())
+
+    def name_for(self, country_id):
+        return self.by_id.get(str(country_id).strip().upper()) if country_id else None
+
+
+def _get_builtin_catalog():
+    global _builtin_catalog
+    if _builtin_catalog is None:
+        from .countries import country_list
+        _builtin_catalog = CountryCatalog(country_list)
+    return _builtin_catalog
+
+
+def _load_device_countries(config):
+    response = _api_request(config, COUNTRY_NAMES_API, parameters={'format': 'id|name'})
+    records = response if isinstance(response, list) else [response]
+    return [item for record in records for item in record.get('results', [])]
+
+
+def get_country_catalog(config):
+    """Catalog of the device's geoip-country table when ``device_country_list`` is set, else the built-in list.
+
+    The device table is read once per ``COUNTRY_CATALOG_TTL``. If it can't be read, the previous catalog or the
+    built-in list is used and the device is not asked again for ``HA_MEMBER_RETRY_INTERVAL`` seconds.
+    """
+    if not config.get('device_country_list'):
+        return _get_builtin_catalog()
+    server_url = _get_config(config)[0]
+    with _device_catalogs_lock:
+        expires_at, catalog = _device_catalogs.get(server_url, (0, None))
+        if time.time() >= expires_at:
+            try:
+                countries = _load_device_countries(config)
+                if not countries:
+                    raise ConnectorError('The device returned no countries')
+                catalog = CountryCatalog(countries)
+                _device_catalogs[server_url] = (time.time() + COUNTRY_CATALOG_TTL, catalog)
+            except Exception as err:
+                logger.warning('Unable to load country list from the device, retrying in {0} seconds: {1}'.format(
+                    HA_MEMBER_RETRY_INTERVAL, err))
+                _device_catalogs[server_url] = (time.time() + HA_MEMBER_RETRY_INTERVAL, catalog)
+        return catalog or _get_builtin_catalog()
+
+
+def _create_geography_address(config, url, parameters, name, country_id):
+    data = {'name': name, 'type': 'geography', 'country': country_id}
+    return _api_request(config, url, parameters=parameters, body=data, method='POST')
+
+
+def geo_block_countries(config, params):
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        parameters = {'vdom': vdom_list[0]} if vdom_list else {}
+        address_url, group_list_url, group_url = GEO_BLOCK_TYPES[params.get('address_category') or 'IPv4 Address']
+        group_name = params.get('ip_group_name')
+        prefix = params.get('name_prefix') or 'geo-'
+        catalog = get_country_catalog(config)
+        result = {'group': group_name, 'existing': [], 'created': [], 'unknown': [], 'errors': []}
+
+        country_ids = []
+        for country in _get_list_from_str_or_list(params, 'countries'):
+            country_id = catalog.id_for(country)
+            if country_id is None:
+                result['unknown'].append(country)
+            elif country_id not in country_ids:
+                country_ids.append(country_id)
+
+        # One read of the existing geography objects instead of a lookup per country
+        response = _api_request(config, address_url, parameters=dict(parameters, filter='type==geography',
+                                                                       format='name|country'))
+        existing = {}
+        for item in response.get('results', []):
+            existing.setdefault(item.get('country'), item.get('name'))
+        members = []
+        missing = []
+        for country_id in country_ids:
+            if country_id in existing:
+                members.append(existing[country_id])
+                result['existing'].append({'country': country_id, 'name': existing[country_id]})
+            else:
+                missing.append(country_id)
+        created = _run_concurrently(config, lambda country_id: _create_geography_address(
+            config, address_url, parameters, prefix + country_id, country_id), missing)
+        for country_id, response, error in created:
+            if error is not None:
+                result['errors'].append({'country': country_id, 'error': str(error)})
+            else:
+                members.append(prefix + country_id)
+                result['created'].append({'country': country_id, 'name': prefix + country_id})
+
+        response = _api_request(config, group_list_url, parameters=dict(parameters, filter='name==' + group_name,
+                                                                          format='name|member'))
+        groups = response.get('results', [])
+        if groups:
+            current = [member.get('name') for member in groups[0].get('member', [])]
+            new_members = current + [name for name in members if name not in current]
+            if len(new_members) > MAX_GROUP_SIZE:
+                raise ConnectorError('Maximum {} items exceeded for {} group.'.format(MAX_GROUP_SIZE, group_name))
+            if len(new_members) > len(current):
+                _api_request(config, group_url.format(ip_group_name=group_name.replace('/', '%2f')),
+                             parameters=parameters, body={'member': [{'name': name} for name in new_members]},
+                             method='PUT')
+        elif members:
+            _api_request(config, group_list_url, parameters=parameters, method='POST',
+                         body={'name': group_name, 'member': [{'name': name} for name in members]})
+        result['members'] = members
+        return result
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -0,0 +1,103 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+# Serves the threat feed files to the FortiGate. Runs as its own process, started by threat_feed.py, so the
+# feeds stay reachable while connector workers come and go; only the standard library is used.
+
+import argparse
+import errno
+import os
+import re
+import shutil
+import socket
+import sys
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FEED_NAME = re.compile(r'^[\w.\-]{1,35}$')
+FEED_SERVER_VERSION = 'FortiSOARThreatFeed/1.0'  # Server header, which tells the feed server from other listeners
+
+
+def feed_path(directory, name):
+    return os.path.join(directory, name + '.txt')
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves ``/<feed>.txt`` from the feed directory and nothing else.
+
+    A feed file is opened once per request and its size taken from that handle: feeds are replaced
+    whole by renaming a new file over them, so the handle keeps the file the headers describe.
+    """
+    directory = None
+    server_version = FEED_SERVER_VERSION
+    sys_version = ''
+
+    def _open(self):
+        name = self.path.split('?', 1)[0].lstrip('/')
+        if not name.endswith('.txt') or not FEED_NAME.match(name[:-4]):
+            return None
+        try:
+            return open(feed_path(self.directory, name[:-4]), 'rb')
+        except OSError:
+            return None
+
+    def _headers(self, feed_file):
+        if feed_file is None:
+            self.send_error(404)
+            return False
+        stat = os.fstat(feed_file.fileno())
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(stat.st_size))
+        self.send_header('Last-Modified', formatdate(stat.st_mtime, usegmt=True))
+        self.end_headers()
+        return True
+
+    def do_HEAD(self):
+        feed_file = self._open()
+        try:
+            self._headers(feed_file)
+        finally:
+            if feed_file is not None:
+                feed_file.close()
+
+    def do_GET(self):
+        feed_file = self._open()
+        if feed_file is None:
+            self._headers(None)
+            return
+        with feed_file:
+            if self._headers(feed_file):
+                shutil.copyfileobj(feed_file, self.wfile)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, directory, address):
+    """Serve the feeds of ``directory`` on ``address``:``port`` until the process is stopped."""
+    os.makedirs(directory, exist_ok=True)
+    handler = type('FeedHandler', (FeedHandler,), {'directory': directory})
+    server_class = type('FeedServer', (ThreadingHTTPServer,), {
+        'address_family': socket.AF_INET6 if ':' in address else socket.AF_INET, 'daemon_threads': True})
+    try:
+        server = server_class((address, port), handler)
+    except OSError as err:
+        if err.errno == errno.EADDRINUSE:
+            # Another worker started the server first
+            return 0
+        raise
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve FortiSOAR threat feed files over HTTP')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--directory', required=True)
+    parser.add_argument('--bind', required=True, help='Local address to listen on')
+    args = parser.parse_args()
+    sys.exit(serve(args.port, args.directory, args.bind))
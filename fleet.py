@@ -0,0 +1,168 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import monotonic
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .metrics import propagate_invocation
+
+logger = get_logger('fortigate-firewall')
+
+
+def _get_json_param(params, name, default):
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError as err:
+            raise ConnectorError('{0} is not valid JSON: {1}'.format(name, err))
+    return value
+
+
+def _get_configurations():
+    """Configurations of this connector on FortiSOAR, by name."""
+    from integrations.crudhub import make_request
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'info.json')) as info_file:
+        info = json.load(info_file)
+    response = make_request(CONNECTOR_CONFIGURATIONS_API.format(name=info['name'], version=info['version']), 'GET')
+    return {item.get('name'): item.get('config') or {} for item in response.get('configuration', [])}
+
+
+def _get_devices(params):
+    """``(name, config)`` of each device, each one a configuration of this connector referenced by name.
+
+    API keys are never taken from the action parameters, which playbook execution history keeps; a device
+    may only override the VDOM of its configuration.
+    """
+    devices = _get_json_param(params, 'devices', [])
+    if isinstance(devices, (str, dict)):
+        devices = [devices]
+    if not devices:
+        raise ConnectorError('Specify at least one device')
+    configurations = _get_configurations()
+    device_configs = []
+    for index, device in enumerate(devices):
+        if isinstance(device, str):
+            device = {'config': device}
+        if not isinstance(device, dict) or not device.get('config'):
+            raise ConnectorError('Device {0} names no configuration: {1}'.format(index + 1, device))
+        unsupported = set(device) - set(FLEET_DEVICE_KEYS)
+        if unsupported:
+            raise ConnectorError('Device {0} sets {1}; only {2} can be set, the rest comes from the '
+                                 'configuration'.format(index + 1, ', '.join(sorted(unsupported)),
+                                                        ', '.join(FLEET_DEVICE_KEYS)))
+        if device['config'] not in configurations:
+            raise ConnectorError('Device {0}: no configuration named {1}'.format(index + 1, device['config']))
+        device_config = dict(configurations[device['config']])
+        if device.get('vdom'):
+            device_config['vdom'] = device['vdom']
+        device_configs.append((device.get('name') or device['config'], device_config))
+    return device_configs
+
+
+class FleetRun(object):
+    """One operation run against several FortiGates concurrently, ``max_devices`` at a time.
+
+    Each device gets ``timeout`` seconds from the moment its run starts, which also bounds each of its REST
+    calls. A device that runs over is reported as ``unknown``: a thread can't be cancelled, so the calls it
+    has started still run until their own timeout expires and the action may still be applied.
+    """
+
+    def __init__(self, handler, devices, params, timeout, max_devices):
+        self.handler = handler
+        self.devices = devices
+        self.params = params
+        self.timeout = timeout
+        self.max_devices = max_devices
+        self.started = {}
+
+    def _run_device(self, index):
+        name, device_config = self.devices[index]
+        self.started[index] = monotonic()
+        return self.handler(device_config, dict(self.params))
+
+    def _report(self, index, status, result=None, error=None):
+        name, device_config = self.devices[index]
+        started = self.started.get(index)
+        report = {'name': name, 'address': device_config.get('address'), 'status': status,
+                  'duration': round(monotonic() - started, 3) if started is not None else 0}
+        if status == 'success':
+            report['result'] = result
+        else:
+            report['error'] = error
+        return report
+
+    def run(self):
+        reports = [None] * len(self.devices)
+        executor = ThreadPoolExecutor(max_workers=min(self.max_devices, len(self.devices)))
+        run_device = propagate_invocation(self._run_device)
+        try:
+            pending = {executor.submit(run_device, index): index for index in range(len(self.devices))}
+            while pending:
+                done, not_done = wait(pending, timeout=self._next_deadline(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        reports[index] = self._report(index, 'success', result=future.result())
+                    except Exception as err:
+                        logger.warning('Fleet device {0} failed: {1}'.format(self.devices[index][0], err))
+                        reports[index] = self._report(index, 'failed', error=str(err))
+                now = monotonic()
+                for future in [future for future in not_done if future in pending]:
+                    index = pending[future]
+                    if index in self.started and now - self.started[index] >= self.timeout:
+                        del pending[future]
+                        logger.warning('Fleet device {0} timed out'.format(self.devices[index][0]))
+                        reports[index] = self._report(index, 'unknown', error=(
+                            'No response within {0:g} seconds, the action may still be applied on the '
+                            'device'.format(self.timeout)))
+        finally:
+            # Timed out devices must not hold up the report
+            executor.shutdown(wait=False)
+        return reports
+
+    def _next_deadline(self, pending):
+        now = monotonic()
+        deadlines = [self.started[index] + self.timeout - now for index in pending.values() if index in self.started]
+        # Devices still queued have no deadline yet; look again shortly
+        return max(min(deadlines + [1.0]), 0.01)
+
+
+def run_fleet_operation(config, params):
+    try:
+        title = params.get('operation')
+        operation = FLEET_OPERATIONS.get(title, title)
+        if operation not in FLEET_OPERATIONS.values():
+            raise ConnectorError('Operation {0} can not be run on a fleet, supported operations: {1}'.format(
+                title, ', '.join(FLEET_OPERATIONS)))
+        from .operation import fortigate_operations
+        timeout = float(params.get('timeout') or FLEET_DEVICE_TIMEOUT)
+        max_devices = int(params.get('max_devices') or FLEET_MAX_DEVICES)
+        devices = [(name, dict(device_config, request_timeout=min(
+            float(device_config.get('request_timeout') or timeout), timeout)))
+            for name, device_config in _get_devices(params)]
+        operation_params = _get_json_param(params, 'operation_params', {})
+        if not isinstance(operation_params, dict):
+            raise ConnectorError('Operation Parameters must be a JSON object')
+        reports = FleetRun(fortigate_operations[operation], devices, operation_params, timeout, max_devices).run()
+        statuses = [report['status'] for report in reports]
+        return {
+            'operation': operation,
+            'total': len(reports),
+            'succeeded': statuses.count('success'),
+            'failed': statuses.count('failed'),
+            'unknown': statuses.count('unknown'),
+            'devices': reports
+        }
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -0,0 +1,148 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import re
+import threading
+import time
+
+from connectors.core.connector import get_logger
+
+from .constants import *
+
+logger = get_logger('fortigate-firewall')
+
+_routers = {}
+_routers_lock = threading.Lock()
+_PORT = re.compile(r'(^[^:]+|\])(:\d+)$')
+
+
+def _server_url(address, port):
+    address = address.strip().strip('/')
+    # The port of the primary unless the address has its own
+    has_port = _PORT.search(address.split('://', 1)[-1])
+    server_url = '{0}:{1}'.format(address, port) if port and not has_port else address
+    if server_url[:7] != 'http://' and server_url[:8] != 'https://':
+        server_url = 'https://{0}'.format(server_url)
+    return server_url
+
+
+class ReadSession(object):
+    """Unit of the HA cluster that the requests of one multi-request read are pinned to.
+
+    The first request picks the unit as any ``stale_ok`` read would; the following ones go to the same
+    unit whatever happens to the router in between, and fail rather than fall back to the primary, since
+    mixing the answers of two units could skip or repeat entries.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = False
+        self.member = None
+
+
+class HaRouter(object):
+    """Sends reads that may be slightly stale to a secondary unit of an HA cluster, writes to the primary.
+
+    Only reads whose caller passes ``stale_ok`` go to a secondary: the read-only Get and list actions.
+    A read that comes before a write, such as the member list of a block group that is then replaced
+    whole, stays on the primary, since another worker's write may not have reached the secondary yet.
+
+    ``ha_read_addresses`` lists the management addresses of the secondary units. Which of them are
+    members of the primary's cluster is checked against its ``ha-peer`` list, again every
+    ``HA_DISCOVERY_INTERVAL`` seconds; a secondary that fails a request is skipped for
+    ``HA_MEMBER_RETRY_INTERVAL`` seconds. Reads within ``HA_WRITE_STICKINESS`` seconds of a write stay on
+    the primary so that actions see their own changes. Reads that belong together, such as the pages of
+    a list, pass a ``ReadSession`` as ``stale_ok`` and all go to the unit the first of them went to.
+    """
+
+    def __init__(self, primary, candidates, probe):
+        self.primary = primary
+        self.candidates = candidates
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._discover_lock = threading.Lock()
+        self.members = []
+        self.unhealthy = {}
+        self.discovered_at = None
+        self.last_write = 0
+
+    def discover(self):
+        members = []
+        try:
+            response = self._probe(self.primary, HA_PEER_API)
+            serials = {peer.get('serial_no') for peer in response.get('results') or []}
+            serials.discard(response.get('serial'))
+            for candidate in self.candidates:
+                try:
+                    serial = self._probe(candidate, HA_PEER_API).get('serial')
+                except Exception as err:
+                    logger.warning('HA member {0} not reachable: {1}'.format(candidate, err))
+                    continue
+                if serial in serials:
+                    members.append(candidate)
+                else:
+                    logger.warning('{0} ({1}) is not a secondary unit of the cluster of {2}'.format(
+                        candidate, serial, self.primary))
+        except Exception as err:
+            logger.warning('HA discovery on {0} failed, reads stay on the primary: {1}'.format(self.primary, err))
+        with self._lock:
+            self.members = members
+            self.discovered_at = time.monotonic()
+        logger.info('HA read routing for {0}: {1}'.format(self.primary, members or 'primary only'))
+
+    def read_address(self, method, endpoint, stale_ok=False):
+        """Secondary to send this request to, or None for the primary."""
+        if isinstance(stale_ok, ReadSession) and method.upper() == 'GET':
+            with stale_ok.lock:
+                if not stale_ok.started:
+                    stale_ok.member = self._read_address(method, endpoint, True)
+                    stale_ok.started = True
+                return stale_ok.member
+        return self._read_address(method, endpoint, stale_ok)
+
+    def _read_address(self, method, endpoint, stale_ok):
+        now = time.monotonic()
+        if method.upper() != 'GET':
+            self.last_write = now
+            return None
+        if not stale_ok or now - self.last_write < HA_WRITE_STICKINESS or not endpoint.startswith(
+                HA_READ_ENDPOINTS):
+            return None
+        if self._stale(now):
+            with self._discover_lock:
+                if self._stale(now):
+                    self.discover()
+        with self._lock:
+            for member in self.members:
+                if self.unhealthy.get(member, 0) <= now:
+                    return member
+        return None
+
+    def _stale(self, now):
+        return self.discovered_at is None or now - self.discovered_at > HA_DISCOVERY_INTERVAL
+
+    def mark_unhealthy(self, member, reason):
+        logger.warning('HA member {0} failed, reading from the primary for {1} seconds: {2}'.format(
+            member, HA_MEMBER_RETRY_INTERVAL, reason))
+        with self._lock:
+            self.unhealthy[member] = time.monotonic() + HA_MEMBER_RETRY_INTERVAL
+
+
+def get_ha_router(config, primary, probe):
+    """Router of the cluster behind ``primary``, or None if no secondary addresses are configured."""
+    addresses = config.get('ha_read_addresses')
+    if not addresses:
+        return None
+    if isinstance(addresses, str):
+        addresses = addresses.split(',')
+    candidates = tuple(_server_url(address, config.get('port')) for address in addresses if address.strip())
+    if not candidates:
+        return None
+    with _routers_lock:
+        router = _routers.get((primary, candidates))
+        if router is None:
+            router = _routers[(primary, candidates)] = HaRouter(primary, list(candidates), probe)
+        return router
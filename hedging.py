@@ -0,0 +1,93 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, wait
+from time import perf_counter
+
+from connectors.core.connector import get_logger
+
+from .constants import *
+from .metrics import endpoint_label, propagate_invocation, record_hedge
+
+logger = get_logger('fortigate-firewall')
+
+_latencies = {}
+_latencies_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_THREADS, thread_name_prefix='fortigate-hedge')
+        return _executor
+
+
+def is_hedged(config, method, endpoint):
+    return bool(config.get('hedged_reads')) and method.upper() == 'GET' and not endpoint.startswith(
+        HEDGE_EXCLUDED_ENDPOINTS)
+
+
+def _observe(label, elapsed):
+    with _latencies_lock:
+        samples = _latencies.get(label)
+        if samples is None:
+            samples = _latencies[label] = deque(maxlen=HEDGE_SAMPLE_SIZE)
+        samples.append(elapsed)
+
+
+def hedge_delay(config, label):
+    """The ``hedge_percentile`` latency of recent reads of the endpoint."""
+    with _latencies_lock:
+        samples = sorted(_latencies.get(label) or ())
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_INITIAL_DELAY
+    percentile = float(config.get('hedge_percentile') or HEDGE_PERCENTILE)
+    index = min(int(len(samples) * percentile / 100), len(samples) - 1)
+    return max(samples[index], HEDGE_MIN_DELAY)
+
+
+def _close(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def hedged_request(config, endpoint, send, send_hedge):
+    """Response of ``send()``, or of ``send_hedge()`` if that answers first after being started once
+    ``send()`` took longer than the hedge delay. The responses must be streamed (``stream=True``) so the
+    losing one can be closed without reading its body.
+    """
+    label = endpoint_label(endpoint)
+    delay = hedge_delay(config, label)
+    started = perf_counter()
+    executor = _get_executor()
+    first = executor.submit(propagate_invocation(send))
+    # The latency of the first copy feeds the percentile whether it wins or not
+    first.add_done_callback(lambda future: future.exception() is None and _observe(label, perf_counter() - started))
+    try:
+        return first.result(timeout=delay)
+    except TimeoutError:
+        pass
+    hedge = executor.submit(propagate_invocation(send_hedge))
+    pending = {first, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winners = [future for future in (first, hedge) if future in done and future.exception() is None]
+        if not winners:
+            continue
+        winner = winners[0]
+        for future in (first, hedge):
+            if future is not winner:
+                future.add_done_callback(_close)
+        copy = 'first' if winner is first else 'hedge'
+        logger.debug('Hedged read of {0} after {1:.3f}s answered by the {2} copy'.format(label, delay, copy))
+        record_hedge(config, endpoint, copy)
+        return winner.result()
+    raise first.exception()
@@ -0,0 +1,143 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import ipaddress
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .address_index import get_address_index
+from .constants import *
+from .operation import _get_banned_ips
+from .url_actions import get_web_filter
+from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list, _run_concurrently
+
+logger = get_logger('fortigate-firewall')
+
+
+def _normalize_ip(value):
+    try:
+        return ipaddress.ip_address(value.strip()).compressed
+    except ValueError:
+        return value.strip()
+
+
+def _normalize_mac(value):
+    return value.strip().lower().replace('-', ':')
+
+
+def _read_banned(config, vdom_list):
+    response = _get_banned_ips(config, vdom_list)
+    if response['vdom_not_exist'] or any('results' not in record for record in response['result']):
+        raise ConnectorError('Check VDOM/user or API key permission to read banned IP addresses.')
+    return {_normalize_ip(entry.get('ip_address', '')): entry
+            for record in response['result'] for entry in record['results']}
+
+
+def _read_url_filter(config, params):
+    response = get_web_filter(config, params)
+    entries = response.get('results')[0].get('entries', []) if response.get('results') else []
+    return {entry.get('url'): entry for entry in entries}
+
+
+def _read_quarantine(config, vdom_list):
+    response = _api_request(config, QUARANTINE_HOST_API, parameters={'vdom': vdom_list} if vdom_list else {})
+    quarantine = response.get('results', {})
+    targets = {}
+    if quarantine.get('quarantine') == 'disable':
+        return targets
+    for target in quarantine.get('targets', []):
+        for mac in target.get('macs', []):
+            targets[_normalize_mac(mac.get('mac', ''))] = target.get('entry')
+    return targets
+
+
+def _blocked(found, unknown):
+    # A mechanism that couldn't be read leaves the status open unless another one blocks the indicator
+    return True if found else (None if unknown else False)
+
+
+def get_indicator_status(config, params):
+    """Where each IP address, URL and MAC address is blocked, from one snapshot of every block mechanism.
+
+    The banned IP list, the address index (address objects, groups and deny policies), the URL filter of
+    ``url_block_policy`` and the quarantine targets are read concurrently, only those the given indicators
+    need; the indicators are then resolved against them locally.
+    """
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        ip_list = _get_list_from_str_or_list(params, 'ip_addresses', is_ip=True)
+        url_list = _get_list_from_str_or_list(params, 'urls')
+        mac_list = _get_list_from_str_or_list(params, 'mac_addresses')
+        block_groups = set(_get_list_from_str_or_list(params, 'ip_group_name'))
+        if not (ip_list or url_list or mac_list):
+            raise ConnectorError('Specify at least one IP address, URL or MAC address')
+        readers = {}
+        if ip_list:
+            readers['banned_ip'] = lambda: _read_banned(config, vdom_list)
+            readers['address_index'] = lambda: get_address_index(config, vdom_list)
+        if url_list:
+            readers['url_filter'] = lambda: _read_url_filter(config, params)
+        if mac_list:
+            readers['quarantine_host'] = lambda: _read_quarantine(config, vdom_list)
+        sources, errors = {}, {}
+        for name, source, error in _run_concurrently(config, lambda name: readers[name](), list(readers)):
+            if error is not None:
+                logger.error('Unable to read {0}: {1}'.format(name, error))
+                errors[name] = str(error)
+            sources[name] = source
+        banned, index = sources.get('banned_ip'), sources.get('address_index')
+        url_filter, quarantine = sources.get('url_filter'), sources.get('quarantine_host')
+
+        ip_results = []
+        for ip in ip_list:
+            entry = banned.get(_normalize_ip(ip)) if banned is not None else None
+            status = {'ip': ip, 'banned': None if banned is None else entry is not None,
+                      'ban_expires': entry.get('expires') if entry else None}
+            if index is not None:
+                try:
+                    references = index.lookup(ip)
+                except ValueError as err:
+                    status.update({'error': str(err), 'blocked': _blocked(status['banned'], True)})
+                    ip_results.append(status)
+                    continue
+                status.update({
+                    'address_objects': references['address_objects'],
+                    'block_groups': [group for group in references['address_groups'] if group in block_groups],
+                    'deny_policies': [policy['policyid'] for policy in references['policies']
+                                      if policy['action'] == 'deny']})
+            status['blocked'] = _blocked(status['banned'] or status.get('block_groups') or status.get('deny_policies'),
+                                         banned is None or index is None)
+            ip_results.append(status)
+
+        url_results = []
+        for url in url_list:
+            entry = url_filter.get(url) if url_filter is not None else None
+            url_results.append({'url': url, 'action': entry.get('action') if entry else None,
+                                'status': entry.get('status') if entry else None,
+                                'blocked': _blocked(entry and entry.get('action') == 'block'
+                                                    and entry.get('status', 'enable') == 'enable', url_filter is None)})
+
+        mac_results = []
+        for mac in mac_list:
+            entry = quarantine.get(_normalize_mac(mac)) if quarantine is not None else None
+            mac_results.append({'mac': mac, 'quarantine_entry': entry,
+                                'quarantined': None if quarantine is None else _normalize_mac(mac) in quarantine})
+
+        return {
+            'vdom': vdom_list[0] if vdom_list else None,
+            'summary': {
+                'ip_addresses': {'total': len(ip_results), 'blocked': sum(1 for item in ip_results if item['blocked'])},
+                'urls': {'total': len(url_results), 'blocked': sum(1 for item in url_results if item['blocked'])},
+                'mac_addresses': {'total': len(mac_results),
+                                  'quarantined': sum(1 for item in mac_results if item['quarantined'])}
+            },
+            'ip_addresses': ip_results,
+            'urls': url_results,
+            'mac_addresses': mac_results,
+            'errors': errors
+        }
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -0,0 +1,65 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import json
+
+from connectors.core.connector import get_logger
+
+logger = get_logger('fortigate-firewall')
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _stdlib_dumps(value):
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _stdlib_loads(data):
+    # json.loads detects the UTF encoding of bytes itself, no need for requests' charset guessing
+    return json.loads(data)
+
+
+def _orjson_dumps(value):
+    try:
+        return orjson.dumps(value)
+    except TypeError:
+        # Integers beyond 64 bits, non-string keys and the like: let the stdlib encoder handle them
+        return _stdlib_dumps(value)
+
+
+CODECS = {'json': (_stdlib_dumps, _stdlib_loads)}
+if orjson is not None:
+    CODECS['orjson'] = (_orjson_dumps, orjson.loads)
+
+codec = 'orjson' if orjson is not None else 'json'
+_dumps, _loads = CODECS[codec]
+
+
+def use_codec(name):
+    """Switch the JSON codec used for REST bodies, e.g. to compare codecs in benchmarks."""
+    global codec, _dumps, _loads
+    if name not in CODECS:
+        raise ValueError('JSON codec {0} is not available, installed codecs: {1}'.format(name, ', '.join(CODECS)))
+    codec = name
+    _dumps, _loads = CODECS[name]
+
+
+def dumps(value):
+    """Serialize a request body to compact UTF-8 JSON bytes."""
+    return _dumps(value)
+
+
+def loads(data):
+    """Parse JSON from bytes or str without decoding bytes to text first where the codec allows it."""
+    return _loads(data)
+
+
+def decode_response(response):
+    """Faster drop-in for ``response.json()`` that parses the raw body bytes."""
+    return _loads(response.content)
@@ -0,0 +1,175 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import codecs
+import json
+import re
+
+from connectors.core.connector import get_logger
+
+logger = get_logger('fortigate-firewall')
+
+_decoder = json.JSONDecoder()
+_scan_once = _decoder.scan_once
+_WHITESPACE = ' \t\n\r'
+_SEPARATOR = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+
+class _Reader(object):
+    """Text buffer over a stream of UTF-8 byte chunks that drops everything already parsed."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return
+        self.buffer = self.buffer[self.pos:] + self._utf8.decode(b'', final=True)
+        self.pos = 0
+        self.eof = True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ''
+            self._fill()
+
+    def next_char(self):
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def expect(self, expected):
+        char = self.next_char()
+        if char != expected:
+            raise ValueError('Invalid JSON response: expected {0!r}, found {1!r}'.format(expected, char))
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+class ResultStream(object):
+    """Records of the ``results`` arrays of a FortiOS response, parsed one at a time from byte chunks.
+
+    Memory use is bounded by one chunk and one record. ``envelopes`` receives the other top-level
+    fields of each response object (one per VDOM when several were requested) as they are parsed, so
+    fields that follow ``results`` are only complete once the stream has been consumed.
+    """
+
+    def __init__(self, chunks, on_close=None):
+        self._reader = _Reader(chunks)
+        self._on_close = on_close
+        self._records = self._generate()
+        self.envelopes = []
+
+    @property
+    def envelope(self):
+        return self.envelopes[0] if self.envelopes else {}
+
+    def __iter__(self):
+        return self._records
+
+    def _generate(self):
+        reader = self._reader
+        try:
+            if reader.peek() == '[':
+                reader.next_char()
+                if reader.peek() == ']':
+                    return
+                while True:
+                    yield from self._object(reader)
+                    char = reader.next_char()
+                    if char == ']':
+                        break
+                    if char != ',':
+                        raise ValueError('Invalid JSON response: expected \',\' or \']\', found {0!r}'.format(char))
+            else:
+                yield from self._object(reader)
+        finally:
+            self.close()
+
+    def _object(self, reader):
+        envelope = {}
+        self.envelopes.append(envelope)
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.next_char()
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key == 'results' and reader.peek() == '[':
+                reader.next_char()
+                if reader.peek() == ']':
+                    reader.next_char()
+                else:
+                    yield from self._array(reader)
+            else:
+                envelope[key] = reader.value()
+            char = reader.next_char()
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError('Invalid JSON response: expected \',\' or \'}}\', found {0!r}'.format(char))
+
+    @staticmethod
+    def _array(reader):
+        # Hot loop over the records: one C scanner call and one regex match per record
+        buffer, pos = reader.buffer, reader.pos
+        while True:
+            try:
+                record, end = _scan_once(buffer, pos)
+                separator = _SEPARATOR.match(buffer, end)
+            except (StopIteration, ValueError):
+                separator = None
+            if separator is None:
+                # The record or its separator continues in the next chunk
+                if reader.eof:
+                    reader.pos = pos
+                    raise ValueError('Invalid JSON response: truncated results at offset {0}'.format(pos))
+                reader.pos = pos
+                reader._fill()
+                reader.peek()
+                buffer, pos = reader.buffer, reader.pos
+                continue
+            pos = separator.end()
+            yield record
+            if separator.group(1) == ']':
+                reader.pos = pos
+                return
+
+    def drain(self):
+        """Consume the remaining records without keeping them, so that ``envelopes`` is complete."""
+        for record in self:
+            pass
+
+    def close(self):
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close()
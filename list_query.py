@@ -0,0 +1,161 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import re
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .pagination import read_all_pages
+from .utils import _api_request, _get_list_from_str_or_list
+
+logger = get_logger('fortigate-firewall')
+
+_CONDITION = re.compile(r'^\s*([\w.\-]+)\s*(==|!=|=@|!@|<=|>=|=~|<|>)(.*)$')
+
+
+def _field_values(value, path):
+    if not path:
+        return value if isinstance(value, list) else [value]
+    if isinstance(value, list):
+        return [item for element in value for item in _field_values(element, path)]
+    if isinstance(value, dict) and path[0] in value:
+        return _field_values(value[path[0]], path[1:])
+    return []
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Condition(object):
+    """One ``<field><operator><value>`` expression of the FortiOS filter syntax.
+
+    Conditions on nested fields (``srcaddr.name==all``) or with the regular expression operator ``=~``
+    can't be sent to the device and are evaluated on the returned records instead.
+    """
+
+    def __init__(self, expression):
+        match = _CONDITION.match(expression)
+        if not match:
+            raise ConnectorError('Invalid filter condition: {0}. Expected <field><operator><value> with one of '
+                                 'the operators {1}'.format(expression, ', '.join(FILTER_OPERATORS)))
+        self.field, self.operator, self.value = match.group(1), match.group(2), match.group(3).strip()
+        self.path = self.field.split('.')
+        self.on_device = self.operator in DEVICE_FILTER_OPERATORS and len(self.path) == 1
+        self._pattern = re.compile(self.value) if self.operator == '=~' else None
+
+    def __str__(self):
+        return '{0}{1}{2}'.format(self.field, self.operator, self.value)
+
+    def _compare(self, value):
+        if self.operator in ('==', '!='):
+            return str(value) == self.value
+        if self.operator in ('=@', '!@'):
+            return self.value in str(value)
+        if self.operator == '=~':
+            return self._pattern.search(str(value)) is not None
+        left, right = _as_number(value), _as_number(self.value)
+        if left is None or right is None:
+            left, right = str(value), self.value
+        return {'<': left < right, '<=': left <= right, '>': left > right, '>=': left >= right}[self.operator]
+
+    def matches(self, record):
+        values = [value.get('name') if isinstance(value, dict) else value
+                  for value in _field_values(record, self.path)]
+        found = any(self._compare(value) for value in values)
+        return not found if self.operator in ('!=', '!@') else found
+
+
+class ListQuery(object):
+    """Field projection, filters and paging of a list action, pushed down to the device where possible.
+
+    ``fields`` become ``format=a|b``, each filter group becomes one ``filter=`` parameter (conditions in a
+    group are OR-ed, groups are AND-ed, as on FortiOS) and ``start``/``count`` are passed through. Groups
+    the device can't evaluate are applied to the returned records; paging is then done locally too, and
+    the fields those groups need are requested and stripped again afterwards. Responses served from the
+    CMDB mirror get the whole query applied locally.
+    """
+
+    def __init__(self, params):
+        self.fields = _get_list_from_str_or_list(params, 'fields') if params.get('fields') else []
+        filters = params.get('filter') or []
+        if isinstance(filters, str):
+            filters = filters.split('&')
+        self.groups = [[Condition(expression) for expression in str(group).split(',') if expression.strip()]
+                       for group in filters if str(group).strip()]
+        self.local_groups = [group for group in self.groups if not all(cond.on_device for cond in group)]
+        self.device_groups = [group for group in self.groups if group not in self.local_groups]
+        self.start = int(params['start']) if params.get('start') not in (None, '') else None
+        self.count = int(params['count']) if params.get('count') not in (None, '') else None
+        self.device_fields = list(self.fields)
+        for group in self.local_groups:
+            for cond in group:
+                if self.fields and cond.path[0] not in self.device_fields:
+                    self.device_fields.append(cond.path[0])
+        self.empty = not (self.fields or self.groups or self.start is not None or self.count is not None)
+
+    def parameters(self, parameters=None):
+        """Query string of the device request with the pushed-down parts of the query added."""
+        parameters = dict(parameters or {})
+        if self.device_fields:
+            parameters['format'] = '|'.join(self.device_fields)
+        if self.device_groups:
+            parameters['filter'] = [','.join(str(cond) for cond in group) for group in self.device_groups]
+        if not self.local_groups:
+            if self.start is not None:
+                parameters['start'] = self.start
+            if self.count is not None:
+                parameters['count'] = self.count
+        return parameters
+
+    def filter_records(self, records, pushed=False):
+        """Apply the query to a list of records; ``pushed`` if the device already applied its part."""
+        if self.empty:
+            return records
+        groups = self.local_groups if pushed else self.groups
+        if groups:
+            records = [record for record in records if all(any(cond.matches(record) for cond in group)
+                                                           for group in groups)]
+        if not pushed or self.local_groups:
+            start = self.start or 0
+            records = records[start:start + self.count] if self.count is not None else records[start:]
+        if self.fields and (not pushed or len(self.device_fields) > len(self.fields)):
+            records = [{field: record[field] for field in self.fields if field in record}
+                       if isinstance(record, dict) else record for record in records]
+        return records
+
+    def apply(self, response, pushed=False):
+        """Apply the query to the ``results`` of a response, a list of per-VDOM responses or a 403 result."""
+        if self.empty:
+            return response
+        if isinstance(response, list):
+            return [self.apply(item, pushed) for item in response]
+        if not isinstance(response, dict):
+            return response
+        if isinstance(response.get('result'), list):
+            return dict(response, result=[self.apply(item, pushed) for item in response['result']])
+        if isinstance(response.get('results'), list):
+            return dict(response, results=self.filter_records(response['results'], pushed))
+        return response
+
+    def read(self, config, url, parameters=None, cached=None, paginate=False, **kwargs):
+        """GET ``url`` with the query pushed down, or apply it to ``cached`` if the mirror answered.
+
+        List reads (``paginate``) are requested page by page, with ``start``/``count`` as the slice to read.
+        """
+        if cached is not None:
+            return self.apply(cached)
+        parameters = self.parameters(parameters)
+        if paginate:
+            response = read_all_pages(config, url, parameters, start=parameters.pop('start', 0),
+                                      limit=parameters.pop('count', None), **kwargs)
+        else:
+            response = _api_request(config, url, parameters=parameters, **kwargs)
+        return self.apply(response, pushed=True)
@@ -0,0 +1,224 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+
+logger = get_logger('fortigate-firewall')
+
+METRIC_HELP = {
+    'fortigate_operation_duration_seconds': ('histogram', 'Wall time of connector operations.'),
+    'fortigate_operation_errors_total': ('counter', 'Connector operations that raised an error.'),
+    'fortigate_operation_api_calls': ('histogram', 'REST calls made by one connector operation.'),
+    'fortigate_api_request_duration_seconds': ('histogram', 'Latency of FortiGate REST calls.'),
+    'fortigate_api_requests_total': ('counter', 'FortiGate REST calls by response status.'),
+    'fortigate_api_request_bytes_total': ('counter', 'Request body bytes sent to FortiGate.'),
+    'fortigate_api_response_bytes_total': ('counter', 'Response body bytes received from FortiGate.'),
+    'fortigate_api_retries_total': ('counter', 'Retried FortiGate REST calls.'),
+    'fortigate_api_hedged_requests_total': ('counter', 'Reads duplicated after the hedge delay, by the copy that won.')
+}
+
+
+class Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry(object):
+    """Process-wide counters and histograms, keyed by metric name and a sorted tuple of label pairs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{'name': name, 'labels': dict(labels), 'count': histogram.count,
+                           'sum': round(histogram.sum, 6),
+                           'buckets': {str(bound): count for bound, count in histogram.cumulative()}}
+                          for (name, labels), histogram in sorted(self.histograms.items())]
+        return {'started_at': self.started_at, 'counters': counters, 'histograms': histograms}
+
+    def prometheus(self):
+        lines = []
+        snapshot = self.snapshot()
+        series = {}
+        for item in snapshot['counters'] + snapshot['histograms']:
+            series.setdefault(item['name'], []).append(item)
+        for name in sorted(series):
+            metric_type, description = METRIC_HELP.get(name, ('untyped', name))
+            lines += ['# HELP {0} {1}'.format(name, description), '# TYPE {0} {1}'.format(name, metric_type)]
+            for item in series[name]:
+                if metric_type != 'histogram':
+                    lines.append('{0}{1} {2}'.format(name, _labels(item['labels']), item['value']))
+                    continue
+                for bound, count in item['buckets'].items():
+                    lines.append('{0}_bucket{1} {2}'.format(name, _labels(item['labels'], le=bound), count))
+                lines.append('{0}_sum{1} {2}'.format(name, _labels(item['labels']), item['sum']))
+                lines.append('{0}_count{1} {2}'.format(name, _labels(item['labels']), item['count']))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                          for key, value in sorted(labels.items())) + '}'
+
+
+registry = MetricsRegistry()
+_local = threading.local()
+_invocation_lock = threading.Lock()
+
+
+def endpoint_label(url):
+    """URL path with the object key of CMDB paths replaced, e.g. /api/v2/cmdb/firewall/address/{mkey}."""
+    path = url.split('?', 1)[0].rstrip('/')
+    parts = path.split('/')
+    if len(parts) > 6 and parts[3] == 'cmdb':
+        return '/'.join(parts[:6] + ['{mkey}'])
+    return path
+
+
+def record_api_call(method, url, status, elapsed, request_bytes, response_bytes):
+    endpoint = endpoint_label(url)
+    method = method.upper()
+    registry.observe('fortigate_api_request_duration_seconds', {'method': method, 'endpoint': endpoint}, elapsed,
+                     METRICS_LATENCY_BUCKETS)
+    registry.inc('fortigate_api_requests_total', {'method': method, 'endpoint': endpoint, 'status': str(status)})
+    if request_bytes:
+        registry.inc('fortigate_api_request_bytes_total', {'endpoint': endpoint}, request_bytes)
+    if response_bytes:
+        registry.inc('fortigate_api_response_bytes_total', {'endpoint': endpoint}, response_bytes)
+
+
+def count_api_call(elapsed):
+    """Add one REST call and its wait time to the operation running on this thread, if it is tracked."""
+    invocation = getattr(_local, 'invocation', None)
+    if invocation is not None:
+        with _invocation_lock:
+            invocation['api_calls'] += 1
+            invocation['network_wait'] += elapsed
+
+
+def record_retry(config, url):
+    if config.get('collect_metrics'):
+        registry.inc('fortigate_api_retries_total', {'endpoint': endpoint_label(url)})
+
+
+def record_hedge(config, url, winner):
+    if config.get('collect_metrics'):
+        registry.inc('fortigate_api_hedged_requests_total', {'endpoint': endpoint_label(url), 'winner': winner})
+
+
+@contextmanager
+def invocation_scope():
+    """Count the REST calls and network wait of the enclosed code; nested scopes share the outer counts."""
+    previous = getattr(_local, 'invocation', None)
+    if previous is not None:
+        yield previous
+        return
+    invocation = {'api_calls': 0, 'network_wait': 0.0}
+    _local.invocation = invocation
+    try:
+        yield invocation
+    finally:
+        _local.invocation = None
+
+
+@contextmanager
+def track_operation(operation):
+    """Record wall time, errors and the REST calls made while running one connector operation."""
+    started = time.perf_counter()
+    with invocation_scope() as invocation:
+        api_calls = invocation['api_calls']
+        try:
+            yield invocation
+        except Exception:
+            registry.inc('fortigate_operation_errors_total', {'operation': operation})
+            raise
+        finally:
+            registry.observe('fortigate_operation_duration_seconds', {'operation': operation},
+                             time.perf_counter() - started, METRICS_LATENCY_BUCKETS)
+            registry.observe('fortigate_operation_api_calls', {'operation': operation},
+                             invocation['api_calls'] - api_calls, METRICS_API_CALL_BUCKETS)
+
+
+def propagate_invocation(func):
+    """Wrap ``func`` so REST calls it makes on worker threads count towards the current operation."""
+    invocation = getattr(_local, 'invocation', None)
+    if invocation is None:
+        return func
+
+    def _wrapper(*args, **kwargs):
+        previous = getattr(_local, 'invocation', None)
+        _local.invocation = invocation
+        worker_hook = invocation.get('worker_hook')
+        try:
+            if worker_hook is not None:
+                return worker_hook(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            _local.invocation = previous
+    return _wrapper
+
+
+def get_connector_metrics(config, params):
+    try:
+        if params.get('format') == 'Prometheus':
+            result = {'format': 'prometheus', 'text': registry.prometheus()}
+        else:
+            result = dict(registry.snapshot(), format='json')
+        result['enabled'] = bool(config.get('collect_metrics'))
+        if params.get('reset'):
+            registry.reset()
+        return result
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -0,0 +1,267 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import ipaddress
+from bisect import bisect_right
+
+from connectors.core.connector import get_logger, ConnectorError
+
+logger = get_logger('fortigate-firewall')
+
+IPV4_SPACE = (0, 2 ** 32 - 1)
+IPV6_SPACE = (0, 2 ** 128 - 1)
+# Services are keyed as (protocol number << 16 | destination port)
+SERVICE_SPACE = (0, (255 << 16) | 0xFFFF)
+PROTOCOL_NUMBERS = {'icmp': 1, 'tcp': 6, 'udp': 17, 'udp-lite': 136, 'sctp': 132, 'icmp6': 58, 'ip': 0}
+PORT_RANGE_FIELDS = {'tcp-portrange': 6, 'udp-portrange': 17, 'udplite-portrange': 136, 'sctp-portrange': 132}
+PORT_PROTOCOLS = frozenset(PORT_RANGE_FIELDS.values())
+
+
+def merge_intervals(intervals):
+    """Sort and merge inclusive (start, end) integer intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(intervals, removed):
+    """Both arguments must be merged; returns intervals minus removed."""
+    result = []
+    removed = list(removed)
+    j = 0
+    for start, end in intervals:
+        while j < len(removed) and removed[j][1] < start:
+            j += 1
+        k = j
+        while k < len(removed) and removed[k][0] <= end:
+            if removed[k][0] > start:
+                result.append((start, removed[k][0] - 1))
+            start = max(start, removed[k][1] + 1)
+            k += 1
+        if start <= end:
+            result.append((start, end))
+    return result
+
+
+def complement_intervals(intervals, space):
+    return subtract_intervals([space], intervals)
+
+
+def intervals_contain(outer, inner):
+    """True when every point of the merged ``inner`` intervals lies inside the merged ``outer`` intervals."""
+    starts = [start for start, end in outer]
+    for start, end in inner:
+        i = bisect_right(starts, start) - 1
+        if i < 0 or outer[i][1] < end:
+            return False
+    return True
+
+
+def intervals_size(intervals):
+    return sum(end - start + 1 for start, end in intervals)
+
+
+def ip_to_int(ip):
+    """Integer value and family (4 or 6) of an IP address string."""
+    address = ipaddress.ip_address(ip.strip())
+    return int(address), address.version
+
+
+def network_interval(value):
+    """Interval of an IP, CIDR, 'ip mask' or 'start-end' string and its family (4 or 6)."""
+    value = value.strip()
+    if '-' in value and '/' not in value:
+        start, end = value.split('-', 1)
+        start_ip, end_ip = ipaddress.ip_address(start.strip()), ipaddress.ip_address(end.strip())
+        return (int(start_ip), int(end_ip)), start_ip.version
+    network = ipaddress.ip_network(value.replace(' ', '/'), strict=False)
+    return (int(network.network_address), int(network.broadcast_address)), network.version
+
+
+def parse_port_ranges(port_ranges):
+    """Destination port intervals of a FortiOS port range string such as '80 443 8000-8080:1024-65535'."""
+    intervals = []
+    for item in (port_ranges or '').split():
+        destination = item.split(':', 1)[0]
+        if '-' in destination:
+            low, high = destination.split('-', 1)
+        else:
+            low = high = destination
+        low, high = int(low), int(high)
+        if low == 0 and high == 0:
+            low, high = 0, 0xFFFF
+        intervals.append((min(low, high), max(low, high)))
+    return intervals
+
+
+def service_key(protocol, port=None):
+    """Point in the service space for a flow; ``protocol`` is a name (tcp, udp, icmp, ...) or number.
+
+    The flows of protocols with ports need their destination port: port 0 would match no port range.
+    """
+    number = PROTOCOL_NUMBERS[protocol.strip().lower()] if isinstance(protocol, str) and not protocol.isdigit() \
+        else int(protocol)
+    if port in (None, '') and number in PORT_PROTOCOLS:
+        raise ConnectorError('The destination port of the {0} flow is required'.format(protocol))
+    return (number << 16) | int(port or 0)
+
+
+class ObjectExpander(object):
+    """Expands FortiOS address and service objects (including nested groups) into merged integer intervals.
+
+    Every expansion returns ``(intervals, resolved)``; ``resolved`` is False when part of the object could
+    not be turned into intervals locally (FQDN without resolution data, geography, dynamic, ...).
+    """
+
+    def __init__(self, addresses=(), addrgrps=(), addresses6=(), addrgrps6=(), services=(), service_groups=(),
+                 fqdn_resolved=None):
+        self.address_objects = {4: {item.get('name'): item for item in addresses},
+                                6: {item.get('name'): item for item in addresses6}}
+        self.address_groups = {4: {item.get('name'): item for item in addrgrps},
+                               6: {item.get('name'): item for item in addrgrps6}}
+        self.service_objects = {item.get('name'): item for item in services}
+        self.service_groups = {item.get('name'): item for item in service_groups}
+        self.fqdn_resolved = fqdn_resolved or {}
+        self._address_cache = {4: {}, 6: {}}
+        self._service_cache = {}
+
+    def _address_object(self, item, family):
+        addr_type = item.get('type') or ('ipprefix' if family == 6 else 'ipmask')
+        try:
+            if addr_type in ('ipmask', 'interface-subnet', 'ipprefix'):
+                value = item.get('ip6') if family == 6 else item.get('subnet')
+                if value:
+                    return [network_interval(value)[0]], True
+            elif addr_type == 'iprange':
+                return [network_interval('{0}-{1}'.format(item.get('start-ip'), item.get('end-ip')))[0]], True
+            elif addr_type == 'fqdn':
+                resolved = self.fqdn_resolved.get(item.get('name'))
+                if resolved is not None:
+                    return merge_intervals([network_interval(ip)[0] for ip in resolved]), True
+            elif addr_type == 'wildcard' and family == 4:
+                # Only wildcards with a contiguous mask describe a single interval
+                return [network_interval(item.get('wildcard'))[0]], True
+        except ValueError as err:
+            logger.debug('Unable to expand address {0}: {1}'.format(item.get('name'), err))
+        return [], False
+
+    def address(self, name, family=4, _seen=None):
+        cache = self._address_cache[family]
+        if name in cache:
+            return cache[name]
+        if name in self.address_objects[family]:
+            result = self._address_object(self.address_objects[family][name], family)
+        elif name in self.address_groups[family]:
+            seen = (_seen or set()) | {name}
+            group = self.address_groups[family][name]
+            members, resolved = self._members(group.get('member', []), family, seen)
+            if group.get('exclude') == 'enable':
+                excluded, excluded_resolved = self._members(group.get('exclude-member', []), family, seen)
+                members = subtract_intervals(members, excluded)
+                resolved = resolved and excluded_resolved
+            result = (members, resolved)
+        elif name == 'all':
+            result = ([IPV6_SPACE if family == 6 else IPV4_SPACE], True)
+        elif name == 'none':
+            result = ([], True)
+        else:
+            result = ([], False)
+        cache[name] = result
+        return result
+
+    def _members(self, members, family, seen):
+        intervals = []
+        resolved = True
+        for member in members:
+            name = member.get('name')
+            if name in seen:
+                logger.debug('Address group loop detected at {0}'.format(name))
+                continue
+            member_intervals, member_resolved = self.address(name, family, seen)
+            intervals += member_intervals
+            resolved = resolved and member_resolved
+        return merge_intervals(intervals), resolved
+
+    def addresses(self, names, family=4, negate=False):
+        intervals = []
+        resolved = True
+        for name in names:
+            name_intervals, name_resolved = self.address(name, family)
+            intervals += name_intervals
+            resolved = resolved and name_resolved
+        intervals = merge_intervals(intervals)
+        if negate:
+            intervals = complement_intervals(intervals, IPV6_SPACE if family == 6 else IPV4_SPACE)
+        return intervals, resolved
+
+    def _service_object(self, item):
+        protocol = (item.get('protocol') or '').upper()
+        intervals = []
+        if protocol in ('ICMP', 'ICMP6'):
+            number = 1 if protocol == 'ICMP' else 58
+            icmp_type = item.get('icmptype')
+            if icmp_type in (None, ''):
+                intervals.append((number << 16, (number << 16) | 0xFFFF))
+            else:
+                intervals.append(((number << 16) | int(icmp_type), (number << 16) | int(icmp_type)))
+            return intervals, True
+        if protocol == 'IP' or protocol == 'ALL':
+            number = int(item.get('protocol-number') or 0)
+            if number == 0:
+                return [SERVICE_SPACE], True
+            return [(number << 16, (number << 16) | 0xFFFF)], True
+        for field, number in PORT_RANGE_FIELDS.items():
+            try:
+                for low, high in parse_port_ranges(item.get(field)):
+                    intervals.append(((number << 16) | low, (number << 16) | high))
+            except ValueError as err:
+                logger.debug('Unable to expand service {0}: {1}'.format(item.get('name'), err))
+                return merge_intervals(intervals), False
+        if not intervals:
+            return [], False
+        return merge_intervals(intervals), True
+
+    def service(self, name, _seen=None):
+        if name in self._service_cache:
+            return self._service_cache[name]
+        if name in self.service_objects:
+            result = self._service_object(self.service_objects[name])
+        elif name in self.service_groups:
+            seen = (_seen or set()) | {name}
+            intervals = []
+            resolved = True
+            for member in self.service_groups[name].get('member', []):
+                if member.get('name') in seen:
+                    continue
+                member_intervals, member_resolved = self.service(member.get('name'), seen)
+                intervals += member_intervals
+                resolved = resolved and member_resolved
+            result = (merge_intervals(intervals), resolved)
+        elif name.upper() == 'ALL':
+            result = ([SERVICE_SPACE], True)
+        elif name.upper() == 'NONE':
+            result = ([], True)
+        else:
+            result = ([], False)
+        self._service_cache[name] = result
+        return result
+
+    def services(self, names, negate=False):
+        intervals = []
+        resolved = True
+        for name in names:
+            name_intervals, name_resolved = self.service(name)
+            intervals += name_intervals
+            resolved = resolved and name_resolved
+        intervals = merge_intervals(intervals)
+        if negate:
+            intervals = complement_intervals(intervals, SERVICE_SPACE)
+        return intervals, resolved
@@ -4,25 +4,20 @@
   FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
   Copyright end """
 
+import ipaddress
+from importlib import import_module
+
 from connectors.core.connector import get_logger, ConnectorError
 
-from .address_actions import *
-from .address_grp_actions import *
-from .cli_based_action import *
-from .policy_actions import *
-from .policy_actions import _get_policy
-from .quarantine_actions import *
-from .service_actions import *
-from .service_group_actions import *
-from .user_actions import *
-from .url_actions import *
-from .application_actions import *
-from .utils import _get_list_from_str_or_list, _api_request, _validate_vdom, _get_vdom
+from .constants import *
+from .utils import add_bulk_address, get_address_grp, _get_list_from_str_or_list, _api_request, _validate_vdom, \
+    _get_vdom, _fan_out_vdoms, _merge_vdom_responses
 
 logger = get_logger('fortigate-firewall')
 
 
 def check_health(config):
+    from .policy_actions import get_list_of_policies
     try:
         res = get_list_of_policies(config, {})
         if res.get('vdom_not_exist'):
@@ -108,10 +103,11 @@ def delete_bulk_address(config, vdom, ip_list, type):
         logger.exception(err)
 
 
-def update_address_grp(config, vdom, ip_group_name, ip_list, blocked_ips=None, unblock_ips=None, type='', is_new=False):
+def update_address_grp(config, vdom, ip_group_name, ip_list, blocked_ips=None, unblock_ips=None, type='', is_new=False,
+                       comment=None):
     status = False
     if ip_list:
-        bulk_result = add_bulk_address(config, vdom, ip_list=ip_list, type=type)
+        bulk_result = add_bulk_address(config, vdom, ip_list=ip_list, type=type, comment=comment)
 
     querystring = {}
     if vdom:
@@ -138,7 +134,68 @@ def update_address_grp(config, vdom, ip_group_name, ip_list, blocked_ips=None, u
     return status
 
 
+def _compacted_block_ip(config, params, unblock=False):
+    from .address_compaction import AggregateMap, update_compacted_group
+    from .block_expiry import get_block_duration
+    ip_group_name = params.get('ip_group_name')
+    if not unblock and get_block_duration(params):
+        raise ConnectorError('Time to Live is not supported with Compact Blocked Addresses: an aggregate address '
+                             'object covers addresses blocked at different times.')
+    ip_list, blocked_ips, vdom = extract_blocked_unblock_ips(config, params, ip_group_name)
+    if unblock:
+        result = {'not_exist': [], 'newly_unblocked': [], 'error_with_unblock': [], 'split_aggregates': []}
+    else:
+        result = {'already_blocked': [], 'newly_blocked': [], 'error_with_block': []}
+    if isinstance(blocked_ips, bool):
+        result['error_with_unblock' if unblock else 'error_with_block'] += ip_list
+        return result
+    aggregates = AggregateMap(blocked_ips, 6 if params.get('ip_type') == 'IPv6' else 4)
+    current_ip_list = []
+    for ip in ip_list:
+        network = ipaddress.ip_network(ip, strict=False)
+        start, end = int(network.network_address), int(network.broadcast_address)
+        if network.version != aggregates.family:
+            raise ConnectorError('{0} is not an {1} address'.format(ip, params.get('ip_type') or 'IPv4'))
+        if unblock and not aggregates.overlaps(start, end):
+            result['not_exist'].append(ip)
+        elif not unblock and aggregates.covers(start, end):
+            result['already_blocked'].append(ip)
+        else:
+            current_ip_list.append(ip)
+    if unblock and ip_list == result['not_exist']:
+        logger.exception('{} not exists in {} group.'.format(', '.join(ip_list), ip_group_name))
+        raise ConnectorError('{} not exists in {} group.'.format(', '.join(ip_list), ip_group_name))
+    if not current_ip_list:
+        return result
+    try:
+        added, removed, still_blocked = update_compacted_group(
+            config, vdom, ip_group_name, blocked_ips, params.get('ip_type'),
+            **{'unblock' if unblock else 'block': current_ip_list})
+    except Exception as err:
+        logger.exception(err)
+        result['error_with_unblock' if unblock else 'error_with_block'] += current_ip_list
+        return result
+    if unblock:
+        if still_blocked:
+            logger.error('{0} still blocked by the objects of {1} group.'.format(', '.join(still_blocked),
+                                                                                 ip_group_name))
+        result['error_with_unblock'] += still_blocked
+        result['newly_unblocked'] = [ip for ip in current_ip_list if ip not in still_blocked]
+        # Aggregates that covered more than the unblocked addresses were replaced by the rest of them
+        for ip in result['newly_unblocked']:
+            network = ipaddress.ip_network(ip, strict=False)
+            for name in aggregates.split_by(int(network.network_address), int(network.broadcast_address)):
+                if name not in result['split_aggregates']:
+                    result['split_aggregates'].append(name)
+    else:
+        result['newly_blocked'] = current_ip_list
+    return result
+
+
 def policy_base_block_ip(config, params):
+    from .block_expiry import expiry_comment
+    if config.get('compact_blocked_addresses'):
+        return _compacted_block_ip(config, params)
     result = {'already_blocked': [], 'newly_blocked': [], 'error_with_block': []}
     ip_group_name = params.get('ip_group_name')
     current_ip_list = []
@@ -162,7 +219,7 @@ def policy_base_block_ip(config, params):
         logger.exception('{} already blocked'.format(', '.join(ip_list)))
         raise ConnectorError('{} already blocked'.format(', '.join(ip_list)))
     if update_address_grp(config, vdom, ip_group_name, current_ip_list[:remain_ips_len], blocked_ips=blocked_ips,
-                          type=params.get('ip_type'), is_new=params.get("is_new")):
+                          type=params.get('ip_type'), is_new=params.get("is_new"), comment=expiry_comment(params)):
         created_address_list += current_ip_list
     else:
         result['error_with_block'] += current_ip_list
@@ -171,24 +228,23 @@ def policy_base_block_ip(config, params):
     return result
 
 
+def _get_banned_ips(config, vdom_list, vdom_not_exists=None, stale_ok=False):
+    responses = _fan_out_vdoms(config, vdom_list, lambda vdom: _api_request(
+        config, LIST_BANNED_IPS_API, parameters={'vdom': vdom} if vdom else {}, stale_ok=stale_ok))
+    return _merge_vdom_responses(responses, vdom_not_exists)
+
+
 def check_ip_exists(config, ip_address_list, vdom, unblock=False):
-    vdoms_param = {}
     user_ip_list = []
     blocked_ip_list = []
-    blocked_ips = []
-    tmp = []
-    if vdom:
-        vdoms_param = {'vdom': ','.join(vdom)}
-    response = _api_request(config, LIST_BANNED_IPS_API, parameters=vdoms_param)
-    result = [response] if isinstance(response, dict) else response
-    for record in result:
-        if 'results' not in record:
-            # User don't have permission to read banned IPs
-            logger.error('Check VDOM/user or API key permission. {}'.format(response))
-            raise ConnectorError(
-                'Check VDOM/user or API key permission. Response: {}'.format(response))
-        blocked_ips += list(map(lambda ip: ip.get("ip_address"), record['results']))
-        tmp += blocked_ips
+    response = _get_banned_ips(config, vdom)
+    result = response['result']
+    if response['vdom_not_exist'] or any('results' not in record for record in result):
+        # User don't have permission to read banned IPs
+        logger.error('Check VDOM/user or API key permission. {}'.format(response))
+        raise ConnectorError(
+            'Check VDOM/user or API key permission. Response: {}'.format(response))
+    blocked_ips = [ip.get("ip_address") for record in result for ip in record['results']]
     for ip in ip_address_list:
         if ip not in blocked_ips:
             user_ip_list.append(ip)
@@ -203,6 +259,7 @@ def check_ip_exists(config, ip_address_list, vdom, unblock=False):
 
 
 def extract_blocked_unblock_ips(config, params, ip_group_name):
+    from .policy_actions import _get_policy
     try:
         ip_list = _get_list_from_str_or_list(params, 'ip', is_ip=True)
         vdom, vdom_not_exists = _validate_vdom(config, params)
@@ -277,6 +334,8 @@ def unblock_ip(config, params):
 
 
 def policy_base_unblock_ip(config, params):
+    if config.get('compact_blocked_addresses'):
+        return _compacted_block_ip(config, params, unblock=True)
     result = {'not_exist': [], 'newly_unblocked': [], 'error_with_unblock': []}
     ip_group_name = params.get('ip_group_name')
     current_unblock_ips = []
@@ -305,22 +364,13 @@ def policy_base_unblock_ip(config, params):
 
 def _get_blocked_ip(config, params):
     try:
-        vdoms_param = {}
         vdoms, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
-        if vdoms:
-            vdoms_param.update({'vdom': ','.join(vdoms)})
-        response = _api_request(config, LIST_BANNED_IPS_API, parameters=vdoms_param)
-        if 'result' in response and not response.get('result', []):
+        response = _get_banned_ips(config, vdoms, vdom_not_exists, stale_ok=True)
+        if not response['result']:
             logger.error('Check VDOM/user or API key permission. {}'.format(response))
             raise ConnectorError(
                 'Check VDOM/user or API key permission. Response: {}'.format(
                     response))
-        response = {'result': [response]} if isinstance(response,
-                                                        dict) and 'result' not in response else response
-
-        if isinstance(response, list):
-            response = {'result': response}
-        if 'vdom_not_exist' not in response: response.update({'vdom_not_exist': vdom_not_exists})
         return response
     except Exception as Err:
         raise ConnectorError(str(Err))
@@ -338,7 +388,7 @@ def get_profile_schedule_used_reference(config, params):
     mkey = params.get("profile_name")
     qtypes = "[38]"
     parameters = { "mkey": mkey,"qtypes": qtypes}
-    endpoint = "/api/v2/monitor/system/object/usage"
+    endpoint = OBJECT_USAGE_API
     result = _api_request(config, endpoint, method='GET' ,parameters=parameters)
     return result["results"]["currently_using"]
 
@@ -361,7 +411,7 @@ def get_address_reference(config, params):
   mkey = params.get("address_name")
   qtypes = "[31]"
   parameters = { "mkey": mkey,"qtypes": qtypes}
-  endpoint = "/api/v2/monitor/system/object/usage"
+  endpoint = OBJECT_USAGE_API
   result = _api_request(config, endpoint, method='GET' ,parameters=parameters)
   return result["results"]["currently_using"]
 
@@ -370,7 +420,7 @@ def get_service_reference(config, params):
   mkey = params.get("service_name")
   qtypes = "[36]"
   parameters = { "mkey": mkey,"qtypes": qtypes}
-  endpoint = "/api/v2/monitor/system/object/usage"
+  endpoint = OBJECT_USAGE_API
   result = _api_request(config, endpoint, method='GET' ,parameters=parameters)
   return result["results"]["currently_using"]
 
@@ -397,12 +447,13 @@ def get_policy_details_used(config, params):
     policyid = params.get("policy_id")
     vdom = params.get("vdom")
     parameters = {"policyid": policyid, "vdom": vdom}
-    endpoint = "/api/v2/monitor/firewall/policy"
+    endpoint = POLICY_STATS_API
     result = _api_request(config, endpoint, method='GET' ,parameters=parameters)
     return result
 
 
 def policy_base_get_blocked_ips(config, params):
+    from .policy_actions import _get_policy
     result_data = {
         "addrgrp": [],
         "addrgrp_not_exist": []
@@ -410,7 +461,7 @@ def policy_base_get_blocked_ips(config, params):
     ip_group_name = _get_list_from_str_or_list(params, 'ip_group_name')
     try:
         vdom = _get_vdom(config, params, check_multiple_vdom=True)
-        policy_list = _get_policy(config, params, vdom)
+        policy_list = _get_policy(config, params, vdom, stale_ok=True)
         policy = policy_list.get('result')[0] if 'result' in policy_list else policy_list[0]
         if len(policy.get('results', [])) <= 0:
             raise ConnectorError('Input policy name not found.')
@@ -430,7 +481,7 @@ def policy_base_get_blocked_ips(config, params):
                                                                                   policy.get('results')[0].get('name')))
                 continue
             grp_type ='IPv4' if grp_name in ipv4_data else 'IPv6'
-            blocked_ips = get_address_grp(config, grp_name, vdom, type=grp_type)
+            blocked_ips = get_address_grp(config, grp_name, vdom, type=grp_type, stale_ok=True)
             result_data['addrgrp'].append(
                 {"name": grp_name, "member": [] if isinstance(blocked_ips, bool) else blocked_ips})
         return result_data
@@ -438,67 +489,102 @@ def policy_base_get_blocked_ips(config, params):
         raise ConnectorError(Err)
 
 
-fortigate_operations = {
-    'create_policy': create_policy,
-    'get_list_of_policies': get_list_of_policies,
-    'update_policy': update_policy,
-    'delete_policy': delete_policy,
+class _LazyOperations(dict):
+    """Operation name -> handler; handlers given as 'module.function' are imported on first use.
+
+    Keeps connector start-up from importing every action module (and their dependencies) when a worker
+    only ever runs a few operations.
+    """
+
+    def __getitem__(self, operation):
+        handler = dict.__getitem__(self, operation)
+        if isinstance(handler, str):
+            module_name, function_name = handler.rsplit('.', 1)
+            handler = getattr(import_module('.' + module_name, __package__), function_name)
+            dict.__setitem__(self, operation, handler)
+        return handler
+
+    def get(self, operation, default=None):
+        return self[operation] if operation in self else default
+
+
+fortigate_operations = _LazyOperations({
+    'create_policy': 'policy_actions.create_policy',
+    'get_list_of_policies': 'policy_actions.get_list_of_policies',
+    'update_policy': 'policy_actions.update_policy',
+    'delete_policy': 'policy_actions.delete_policy',
 
     'get_blocked_ip': get_blocked_ip,
     'block_ip': block_ip,
     'unblock_ip': unblock_ip,
     'block_ip_new': block_ip,
 
-    'get_list_of_applications': get_list_of_applications,
-    'block_applications': block_applications,
-    'unblock_applications': unblock_applications,
-    'get_blocked_applications': get_blocked_applications,
+    'get_list_of_applications': 'application_actions.get_list_of_applications',
+    'block_applications': 'application_actions.block_applications',
+    'unblock_applications': 'application_actions.unblock_applications',
+    'get_blocked_applications': 'application_actions.get_blocked_applications',
 
-    'block_url': block_url,
-    'unblock_url': unblock_url,
-    'get_blocked_urls': get_blocked_urls,
+    'block_url': 'url_actions.block_url',
+    'unblock_url': 'url_actions.unblock_url',
+    'get_blocked_urls': 'url_actions.get_blocked_urls',
 
-    'quarantine_host': quarantine_host,
-    'unquarantine_host': unquarantine_host,
-    'get_quarantine_hosts': get_quarantine_hosts,
+    'quarantine_host': 'quarantine_actions.quarantine_host',
+    'unquarantine_host': 'quarantine_actions.unquarantine_host',
+    'get_quarantine_hosts': 'quarantine_actions.get_quarantine_hosts',
 
-    'create_address': create_address,
-    'get_addresses': get_addresses,
-    'update_address': update_address,
-    'delete_address': delete_address,
+    'create_address': 'address_actions.create_address',
+    'get_addresses': 'address_actions.get_addresses',
+    'update_address': 'address_actions.update_address',
+    'delete_address': 'address_actions.delete_address',
 
-    'create_address_group': create_address_group,
-    'get_address_groups': get_address_groups,
-    'update_address_group': update_address_group,
-    'delete_address_group': delete_address_group,
+    'create_address_group': 'address_grp_actions.create_address_group',
+    'get_address_groups': 'address_grp_actions.get_address_groups',
+    'update_address_group': 'address_grp_actions.update_address_group',
+    'delete_address_group': 'address_grp_actions.delete_address_group',
 
-    'create_service_group': create_service_group,
-    'get_service_groups': get_service_groups,
-    'update_service_group': update_service_group,
-    'delete_service_group': delete_service_group,
+    'create_service_group': 'service_group_actions.create_service_group',
+    'get_service_groups': 'service_group_actions.get_service_groups',
+    'update_service_group': 'service_group_actions.update_service_group',
+    'delete_service_group': 'service_group_actions.delete_service_group',
 
-    'create_firewall_service': create_firewall_service,
-    'get_firewall_services': get_firewall_services,
-    'update_firewall_service': update_firewall_service,
-    'delete_firewall_service': delete_firewall_service,
+    'create_firewall_service': 'service_actions.create_firewall_service',
+    'get_firewall_services': 'service_actions.get_firewall_services',
+    'update_firewall_service': 'service_actions.update_firewall_service',
+    'delete_firewall_service': 'service_actions.delete_firewall_service',
 
-    'get_country_names': get_country_names,
+    'get_country_names': 'utils.get_country_names',
 
-    'execute_command': execute_command,
+    'execute_command': 'cli_based_action.execute_command',
 
-    'create_user': create_user,
-    'get_users': get_users,
-    'update_user': update_user,
-    'delete_user': delete_user,
-    'get_user_list_login_details': get_user_list_login_details,
+    'create_user': 'user_actions.create_user',
+    'get_users': 'user_actions.get_users',
+    'update_user': 'user_actions.update_user',
+    'delete_user': 'user_actions.delete_user',
+    'get_user_list_login_details': 'user_actions.get_user_list_login_details',
 
     'get_profile_schedule_used_reference': get_profile_schedule_used_reference,
     'create_profile_schedule': create_profile_schedule,
     'get_address_reference': get_address_reference,
     'get_service_reference': get_service_reference,
-    'get_all_profile_schedule':get_all_profile_schedule,
+    'get_all_profile_schedule': get_all_profile_schedule,
     'get_policy_details_used': get_policy_details_used,
-    
-    'get_system_events': get_system_events
 
-}
+    'get_system_events': 'utils.get_system_events',
+
+    'sync_cmdb_mirror': 'cmdb_mirror.sync_cmdb_mirror',
+    'match_policy': 'policy_match.match_policy',
+    'lookup_ip_references': 'address_index.lookup_ip_references',
+    'analyze_policy_ruleset': 'policy_analysis.analyze_policy_ruleset',
+    'get_bulk_policy_usage': 'usage_actions.get_bulk_policy_usage',
+    'get_bulk_object_usage': 'usage_actions.get_bulk_object_usage',
+    'geo_block_countries': 'country_catalog.geo_block_countries',
+    'get_connector_metrics': 'metrics.get_connector_metrics',
+    'get_operation_profiles': 'profiling.get_operation_profiles',
+    'run_fleet_operation': 'fleet.run_fleet_operation',
+    'get_indicator_status': 'indicator_status.get_indicator_status',
+    'reconcile_block_list': 'reconcile.reconcile_block_list',
+    'sweep_expired_blocks': 'block_expiry.sweep_expired_blocks',
+    'update_threat_feed': 'threat_feed.update_threat_feed',
+    'collect_orphaned_addresses': 'address_gc.collect_orphaned_addresses'
+
+})
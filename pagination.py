@@ -0,0 +1,151 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from connectors.core.connector import get_logger
+
+from .constants import *
+from .ha_routing import ReadSession
+from .metrics import propagate_invocation
+from .utils import _api_request, _fan_out_vdoms, _merge_vdom_responses
+
+logger = get_logger('fortigate-firewall')
+
+
+def _get_page_size(config):
+    page_size = config.get('page_size')
+    return PAGE_SIZE if page_size in (None, '') else int(page_size)
+
+
+def _vdoms(parameters):
+    vdom = parameters.get('vdom')
+    vdoms = vdom.split(',') if isinstance(vdom, str) else list(vdom or [])
+    return [item for item in vdoms if item]
+
+
+def _page_records(response):
+    if isinstance(response, list):
+        envelopes = response
+    elif isinstance(response, dict) and isinstance(response.get('result'), list):
+        envelopes = response['result']
+    else:
+        envelopes = [response]
+    return [record for envelope in envelopes if isinstance(envelope, dict) and isinstance(envelope.get('results'), list)
+            for record in envelope['results']]
+
+
+class PageIterator(object):
+    """Records of a CMDB or monitor list endpoint, requested ``page_size`` entries at a time as they are consumed.
+
+    ``start`` and ``limit`` select a slice of the table; with ``prefetch`` the next page is requested on a
+    background thread while the current one is consumed. Several VDOMs in ``parameters['vdom']`` are paged
+    one after the other. Endpoints that ignore ``start``/``count`` are detected and read once. The first
+    response of each VDOM is kept in ``responses``. With ``stale_ok`` the pages of a VDOM are all read from
+    the same HA unit.
+    """
+
+    def __init__(self, config, url, parameters=None, start=0, limit=None, page_size=None, prefetch=False, **kwargs):
+        self.config = config
+        self.url = url
+        self.parameters = dict(parameters or {})
+        self.start = int(start or 0)
+        self.limit = None if limit in (None, '') else int(limit)
+        self.page_size = page_size or _get_page_size(config) or None
+        self.prefetch = prefetch
+        self.kwargs = kwargs
+        self.responses = []
+        self._records = self._generate()
+
+    def __iter__(self):
+        return self._records
+
+    def _generate(self):
+        vdoms = _vdoms(self.parameters)
+        if len(vdoms) <= 1:
+            yield from self._pages(self.parameters)
+            return
+        for vdom in vdoms:
+            yield from self._pages(dict(self.parameters, vdom=vdom))
+
+    def _count(self, remaining):
+        if self.page_size is None:
+            return remaining
+        return self.page_size if remaining is None else min(self.page_size, remaining)
+
+    def _pages(self, parameters):
+        kwargs = dict(self.kwargs)
+        if kwargs.get('stale_ok'):
+            # All pages from the same HA unit
+            kwargs['stale_ok'] = ReadSession()
+
+        def fetch(offset, count):
+            page_parameters = dict(parameters, start=offset)
+            if count is not None:
+                page_parameters['count'] = count
+            elif not offset:
+                page_parameters.pop('start')
+            return _api_request(self.config, self.url, parameters=page_parameters, **kwargs)
+
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        fetch_page = propagate_invocation(fetch)
+
+        def request(offset, count):
+            if executor is None:
+                return offset, count
+            return executor.submit(fetch_page, offset, count)
+
+        offset, remaining = self.start, self.limit
+        count = self._count(remaining)
+        pending = request(offset, count)
+        first_record = None
+        try:
+            while pending is not None:
+                response = pending.result() if isinstance(pending, Future) else fetch(*pending)
+                records = _page_records(response)
+                if offset == self.start:
+                    self.responses.append(response)
+                    first_record = records[0] if records else None
+                elif records and records[0] == first_record:
+                    logger.debug('{0} ignores start/count, stopping after the first page'.format(self.url))
+                    break
+                if remaining is not None:
+                    records = records[:remaining]
+                    remaining -= len(records)
+                # A short page ends the table, a long one means the endpoint returned everything at once
+                if count is None or len(records) != count or remaining == 0:
+                    pending = None
+                else:
+                    pending = request(offset + count, self._count(remaining))
+                offset += count or 0
+                yield from records
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+
+def read_all_pages(config, url, parameters=None, start=0, limit=None, prefetch=True, **kwargs):
+    """Whole (or ``start``/``limit`` slice of a) list response read page by page, shaped like one response.
+
+    Several VDOMs are read concurrently, each page by page, and returned as a list of per-VDOM responses.
+    Responses without a ``results`` list (errors, 403 per-VDOM results) are returned as the device sent them.
+    """
+    parameters = dict(parameters or {})
+    vdoms = _vdoms(parameters)
+    if len(vdoms) > 1:
+        responses = _fan_out_vdoms(config, vdoms, lambda vdom: read_all_pages(
+            config, url, dict(parameters, vdom=vdom), start, limit, prefetch, **kwargs))
+        merged = _merge_vdom_responses(responses)
+        # Same shapes as one request for the comma-joined VDOMs: a list, or the 403 result of _api_request
+        return merged if merged['vdom_not_exist'] else merged['result']
+    pages = PageIterator(config, url, parameters, start=start, limit=limit, prefetch=prefetch, **kwargs)
+    results = list(pages)
+    response = pages.responses[0] if pages.responses else {}
+    if not isinstance(response, dict) or not isinstance(response.get('results'), list):
+        return response
+    response = dict(response, results=results)
+    response.pop('next_idx', None)
+    return response
@@ -6,6 +6,8 @@
 
 from connectors.core.connector import get_logger, ConnectorError
 
+from .cmdb_mirror import get_cached_response
+from .list_query import ListQuery
 from .utils import *
 from .utils import _validate_vdom, _api_request, _get_list_from_str_or_list, _get_vdom
 
@@ -143,7 +145,7 @@ def delete_policy(config, params):
         raise ConnectorError(str(Err))
 
 
-def _get_policy(config, params, vdoms, check_multiple_policy=True):
+def _get_policy(config, params, vdoms, check_multiple_policy=True, query=None, stale_ok=False):
     try:
         policy_param = {'vdom': ','.join(vdoms)} if vdoms else {}
         result = []
@@ -153,7 +155,7 @@ def _get_policy(config, params, vdoms, check_multiple_policy=True):
             for policy in block_ip_policy:
                 policy_param.update({'key': 'name', 'pattern': policy})
                 response = _api_request(config, url=endpoint, parameters=policy_param,
-                                        header={'accept': 'application/json'})
+                                        header={'accept': 'application/json'}, stale_ok=stale_ok)
                 try:
                     if response.get("results") and response.get("results")[0].get("action") != 'deny':
                         logger.exception('IP4 policy {0} action is not deny: {1}'.
@@ -168,7 +170,9 @@ def _get_policy(config, params, vdoms, check_multiple_policy=True):
                         'Check VDOM/user/API key permission or IPv4 Policy not found. Policy response: {}'.format(
                             response))
         else:
-            result = _api_request(config, url=endpoint, parameters=policy_param)
+            cached = get_cached_response(config, 'policy', vdoms) if endpoint == LIST_OF_POLICIES_API else None
+            result = (query or ListQuery({})).read(config, endpoint, policy_param, cached=cached, paginate=True,
+                                                   stale_ok=stale_ok)
             response = {'result': [result]} if isinstance(result, dict) and 'result' not in result else result
             return response
         return result
@@ -179,11 +183,14 @@ def _get_policy(config, params, vdoms, check_multiple_policy=True):
 def get_list_of_policies(config, params):
     try:
         vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
+        query = ListQuery(params)
         if params.get('policyid'):
             endpoint = LIST_OF_SECURITY_POLICIES_API if params.get('ngfw_mode') == 'Policy Based' else LIST_OF_POLICIES_API
-            response = _api_request(config, endpoint + str(params.get('policyid')), parameters={"vdom": vdom_list})
+            response = query.read(config, endpoint + str(params.get('policyid')), {"vdom": vdom_list},
+                                  stale_ok=True)
         else:
-            response = _get_policy(config, params, vdoms=vdom_list, check_multiple_policy=False)
+            response = _get_policy(config, params, vdoms=vdom_list, check_multiple_policy=False, query=query,
+                                   stale_ok=True)
         if 'result' in response and not response.get('result', []):
             logger.error('Check VDOM/user or API key permission to access policies. {0}'.format(response))
             raise ConnectorError(
@@ -0,0 +1,114 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import time
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .object_expansion import intervals_contain
+from .policy_match import get_policy_matcher, lowest_bit
+from .utils import _api_request, _validate_vdom
+
+logger = get_logger('fortigate-firewall')
+
+RULE_DIMENSIONS = (('src', 4), ('dst', 4), ('src', 6), ('dst', 6), 'service')
+
+
+def _interfaces_cover(outer, inner):
+    return 'any' in outer or ('any' not in inner and set(inner) <= set(outer))
+
+
+def _rule_covers(outer, inner):
+    if not all(intervals_contain(outer[dimension], inner[dimension]) for dimension in RULE_DIMENSIONS):
+        return False
+    return _interfaces_cover(outer['srcintf'], inner['srcintf']) and \
+        _interfaces_cover(outer['dstintf'], inner['dstintf'])
+
+
+def _same_rule(first, second):
+    return all(first[dimension] == second[dimension] for dimension in RULE_DIMENSIONS) and \
+        set(first['srcintf']) == set(second['srcintf']) and set(first['dstintf']) == set(second['dstintf'])
+
+
+def _candidate_mask(matcher, rule, position):
+    """Earlier policies that contain one point of every non-empty dimension of ``rule`` (and its interfaces).
+
+    Any policy covering the rule must contain those points, so only these candidates need the full
+    interval containment check.
+    """
+    mask = (1 << position) - 1
+    for family in (4, 6):
+        for dimension, index in (('src', matcher.src[family]), ('dst', matcher.dst[family])):
+            intervals = rule[(dimension, family)]
+            if intervals:
+                mask &= index.lookup(intervals[0][0])
+    if rule['service']:
+        mask &= matcher.service.lookup(rule['service'][0][0])
+    for field, interfaces in (('srcintf', matcher.srcintf), ('dstintf', matcher.dstintf)):
+        if 'any' in rule[field]:
+            mask &= interfaces.get('any', 0)
+        else:
+            for name in rule[field]:
+                mask &= interfaces.get(name, 0) | interfaces.get('any', 0)
+    return mask
+
+
+def find_covering_rules(matcher):
+    """Yield (position, covering position) for every policy fully covered by an earlier policy."""
+    for position, rule in enumerate(matcher.rules):
+        if not rule['resolved']:
+            continue
+        if not any(rule[dimension] for dimension in RULE_DIMENSIONS[:4]) or not rule['service']:
+            continue
+        mask = _candidate_mask(matcher, rule, position) & ~matcher.unresolved_mask
+        while mask:
+            candidate = lowest_bit(mask)
+            if _rule_covers(matcher.rules[candidate], rule):
+                yield position, candidate
+                break
+            mask &= mask - 1
+
+
+def _get_policy_hit_counts(config, vdom_list):
+    parameters = {'vdom': vdom_list[0]} if vdom_list else {}
+    response = _api_request(config, POLICY_STATS_API, parameters=parameters)
+    records = response if isinstance(response, list) else [response]
+    return {item.get('policyid'): item for record in records for item in record.get('results', [])}
+
+
+def _summary(policy):
+    return {'policyid': policy.get('policyid'), 'name': policy.get('name'), 'action': policy.get('action')}
+
+
+def analyze_policy_ruleset(config, params):
+    try:
+        start = time.time()
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        matcher = get_policy_matcher(config, vdom_list)
+        result = {'vdom': vdom_list[0] if vdom_list else None, 'policies': len(matcher.policies),
+                  'shadowed': [], 'redundant': [], 'never_hit': [],
+                  'unresolved': [rule['policy'].get('policyid') for rule in matcher.rules if not rule['resolved']]}
+        for position, covering in find_covering_rules(matcher):
+            rule, earlier = matcher.rules[position], matcher.rules[covering]
+            entry = _summary(rule['policy'])
+            entry.update({'covered_by': earlier['policy'].get('policyid'),
+                          'covered_by_name': earlier['policy'].get('name'),
+                          'exact_duplicate': _same_rule(rule, earlier)})
+            if rule['policy'].get('action') == earlier['policy'].get('action'):
+                result['redundant'].append(entry)
+            else:
+                result['shadowed'].append(entry)
+        if params.get('include_hit_counts', True):
+            hit_counts = _get_policy_hit_counts(config, vdom_list)
+            for policy in matcher.policies:
+                stats = hit_counts.get(policy.get('policyid'))
+                if stats is not None and not stats.get('hit_count'):
+                    result['never_hit'].append(_summary(policy))
+        result['elapsed'] = round(time.time() - start, 3)
+        return result
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -0,0 +1,187 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import json
+from bisect import bisect_right
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .cmdb_mirror import get_derived
+from .object_expansion import ObjectExpander, ip_to_int, service_key
+from .utils import _validate_vdom
+
+logger = get_logger('fortigate-firewall')
+
+POLICY_MATCH_TABLES = ('policy', 'address', 'address6', 'addrgrp', 'addrgrp6', 'service', 'service_group')
+
+
+def _names(items):
+    return [item.get('name') for item in items or []]
+
+
+def lowest_bit(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+class IntervalIndex(object):
+    """Maps every point of an integer space to the bitmask of owners whose intervals cover it.
+
+    Owners add merged (disjoint) intervals; each interval toggles the owner bit at its start and one past
+    its end, so a prefix XOR over the sorted boundaries gives the covering mask of every elementary segment.
+    """
+
+    def __init__(self):
+        self._events = {}
+        self.bounds = []
+        self.masks = []
+
+    def add(self, bit, intervals):
+        for start, end in intervals:
+            self._events[start] = self._events.get(start, 0) ^ bit
+            self._events[end + 1] = self._events.get(end + 1, 0) ^ bit
+
+    def build(self):
+        self.bounds = sorted(self._events)
+        self.masks = []
+        mask = 0
+        for bound in self.bounds:
+            mask ^= self._events[bound]
+            self.masks.append(mask)
+        self._events = {}
+        return self
+
+    def lookup(self, point):
+        i = bisect_right(self.bounds, point) - 1
+        return self.masks[i] if i >= 0 else 0
+
+
+class PolicyMatcher(object):
+    """Offline first-match evaluation of the firewall policy table for 5-tuple flows.
+
+    Policies keep their sequence position as bit number, so the first matching policy of a flow is the
+    lowest bit set in the AND of the source, destination, service and (optional) interface masks.
+    Schedules, identity-based matching and internet-service destinations are not evaluated; policies that
+    use objects which can't be expanded locally are reported through ``unresolved_before``.
+    """
+
+    def __init__(self, policies, expander):
+        self.policies = [policy for policy in policies if policy.get('status', 'enable') != 'disable']
+        self.expander = expander
+        self.src = {4: IntervalIndex(), 6: IntervalIndex()}
+        self.dst = {4: IntervalIndex(), 6: IntervalIndex()}
+        self.service = IntervalIndex()
+        self.srcintf = {}
+        self.dstintf = {}
+        self.unresolved_mask = 0
+        self.rules = []
+        for position, policy in enumerate(self.policies):
+            self._add_policy(1 << position, policy)
+        for index in (self.src[4], self.src[6], self.dst[4], self.dst[6], self.service):
+            index.build()
+
+    def _add_policy(self, bit, policy):
+        rule = {'policy': policy, 'resolved': policy.get('internet-service') != 'enable' and
+                policy.get('internet-service-src') != 'enable'}
+        for family, suffix in ((4, ''), (6, '6')):
+            src_names, dst_names = _names(policy.get('srcaddr' + suffix)), _names(policy.get('dstaddr' + suffix))
+            # Negation complements the addresses of a family the policy has; an empty family stays empty
+            src, src_resolved = self.expander.addresses(src_names, family, negate=bool(src_names) and policy.get(
+                'srcaddr-negate') == 'enable')
+            dst, dst_resolved = self.expander.addresses(dst_names, family, negate=bool(dst_names) and policy.get(
+                'dstaddr-negate') == 'enable')
+            self.src[family].add(bit, src)
+            self.dst[family].add(bit, dst)
+            rule.update({('src', family): src, ('dst', family): dst})
+            rule['resolved'] = rule['resolved'] and src_resolved and dst_resolved
+        services, services_resolved = self.expander.services(_names(policy.get('service')),
+                                                             negate=policy.get('service-negate') == 'enable')
+        self.service.add(bit, services)
+        rule.update({'service': services, 'resolved': rule['resolved'] and services_resolved})
+        for interfaces, field in ((self.srcintf, 'srcintf'), (self.dstintf, 'dstintf')):
+            rule[field] = _names(policy.get(field)) or ['any']
+            for name in rule[field]:
+                interfaces[name] = interfaces.get(name, 0) | bit
+        if not rule['resolved']:
+            self.unresolved_mask |= bit
+        self.rules.append(rule)
+
+    def _interface_mask(self, interfaces, name):
+        return interfaces.get(name, 0) | interfaces.get('any', 0)
+
+    def match(self, src_ip, dst_ip, protocol='tcp', port=None, srcintf=None, dstintf=None):
+        src, family = ip_to_int(src_ip)
+        dst, dst_family = ip_to_int(dst_ip)
+        if family != dst_family:
+            raise ConnectorError('Source {0} and destination {1} are not of the same IP family'.format(src_ip, dst_ip))
+        key = service_key(protocol, port)
+        mask = self.src[family].lookup(src) & self.dst[family].lookup(dst)
+        if mask:
+            mask &= self.service.lookup(key)
+        if mask and srcintf:
+            mask &= self._interface_mask(self.srcintf, srcintf)
+        if mask and dstintf:
+            mask &= self._interface_mask(self.dstintf, dstintf)
+        if not mask:
+            return {'policyid': 0, 'name': 'Implicit Deny', 'action': 'deny', 'implicit': True,
+                    'unresolved_before': self._policy_ids(self.unresolved_mask)}
+        position = lowest_bit(mask)
+        policy = self.policies[position]
+        return {'policyid': policy.get('policyid'), 'name': policy.get('name'), 'action': policy.get('action'),
+                'implicit': False, 'unresolved_before': self._policy_ids(self.unresolved_mask & ((1 << position) - 1))}
+
+    def _policy_ids(self, mask):
+        ids = []
+        while mask:
+            position = lowest_bit(mask)
+            ids.append(self.policies[position].get('policyid'))
+            mask &= mask - 1
+        return ids
+
+    def match_many(self, flows):
+        results = []
+        for flow in flows:
+            try:
+                result = self.match(flow.get('src_ip'), flow.get('dst_ip'), flow.get('protocol') or 'tcp',
+                                    flow.get('port'), flow.get('srcintf'), flow.get('dstintf'))
+            except Exception as err:
+                result = {'error': str(err)}
+            result.update({'flow': flow})
+            results.append(result)
+        return results
+
+
+def build_policy_matcher(tables):
+    expander = ObjectExpander(addresses=tables.get('address', []), addrgrps=tables.get('addrgrp', []),
+                              addresses6=tables.get('address6', []), addrgrps6=tables.get('addrgrp6', []),
+                              services=tables.get('service', []), service_groups=tables.get('service_group', []))
+    return PolicyMatcher(tables.get('policy', []), expander)
+
+
+def get_policy_matcher(config, vdom_list):
+    return get_derived(config, vdom_list, POLICY_MATCH_TABLES, 'policy_matcher', build_policy_matcher)
+
+
+def _get_flows(params):
+    flows = params.get('flows')
+    if flows:
+        if isinstance(flows, str):
+            flows = json.loads(flows)
+        if isinstance(flows, dict):
+            flows = [flows]
+        return flows
+    return [{'src_ip': params.get('src_ip'), 'dst_ip': params.get('dst_ip'),
+             'protocol': (params.get('protocol') or 'TCP').lower(), 'port': params.get('port'),
+             'srcintf': params.get('srcintf'), 'dstintf': params.get('dstintf')}]
+
+
+def match_policy(config, params):
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        matcher = get_policy_matcher(config, vdom_list)
+        return {'vdom': vdom_list[0] if vdom_list else None, 'policies': len(matcher.policies),
+                'results': matcher.match_many(_get_flows(params))}
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -0,0 +1,201 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import base64
+import cProfile
+import json
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from io import StringIO
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .metrics import invocation_scope
+
+logger = get_logger('fortigate-firewall')
+
+_profile_lock = threading.Lock()
+
+
+def _get_profile_directory(config):
+    return config.get('profile_directory') or os.path.join(tempfile.gettempdir(), PROFILE_DIRECTORY_NAME)
+
+
+def should_profile(config, operation):
+    """True if ``operation`` is listed in ``profile_operations`` or falls in the ``profile_sample_percent`` sample."""
+    if operation in PROFILE_EXCLUDED_OPERATIONS:
+        return False
+    operations = config.get('profile_operations')
+    if operations:
+        if isinstance(operations, str):
+            operations = [name.strip() for name in operations.split(',')]
+        if operation in operations or '*' in operations:
+            return True
+    sample_percent = config.get('profile_sample_percent')
+    return bool(sample_percent) and random.random() * 100 < float(sample_percent)
+
+
+def _enable_profiler():
+    # Python 3.12+ allows one active profiler per interpreter; the timing split is still recorded without it
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+
+def _profile_worker(profile, func, *args, **kwargs):
+    # Runs on _run_concurrently workers: cProfile only sees the thread it was enabled on
+    cpu_started = time.thread_time()
+    profiler = _enable_profiler()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        with _profile_lock:
+            if profiler is not None:
+                profile['profilers'].append(profiler)
+            profile['workers'] += 1
+            profile['cpu'] += time.thread_time() - cpu_started
+
+
+@contextmanager
+def profile_operation(config, operation):
+    """Run the enclosed operation under cProfile and save the profile and its timing split as an artifact.
+
+    CPU time and REST wait time are summed over the calling thread and the ``_run_concurrently`` workers,
+    so with concurrent requests they can exceed the wall time; on a single thread the remainder of the
+    wall time is spent waiting on anything else (locks, sleeps between retries).
+    """
+    profile = {'profilers': [], 'workers': 0, 'cpu': 0.0}
+    started_at = time.time()
+    started = time.perf_counter()
+    error = None
+    with invocation_scope() as invocation:
+        api_calls = invocation['api_calls']
+        network_wait = invocation['network_wait']
+        invocation['worker_hook'] = lambda func, *args, **kwargs: _profile_worker(profile, func, *args, **kwargs)
+        cpu_started = time.thread_time()
+        profiler = _enable_profiler()
+        try:
+            yield
+        except Exception as err:
+            error = str(err)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profile['profilers'].insert(0, profiler)
+            invocation.pop('worker_hook', None)
+            wall = time.perf_counter() - started
+            summary = {
+                'operation': operation,
+                'started_at': started_at,
+                'wall_time': round(wall, 6),
+                'cpu_time': round(time.thread_time() - cpu_started + profile['cpu'], 6),
+                'network_wait': round(invocation['network_wait'] - network_wait, 6),
+                'api_calls': invocation['api_calls'] - api_calls,
+                'worker_calls': profile['workers'],
+                'error': error
+            }
+            try:
+                _save_profile(config, summary, profile['profilers'])
+            except Exception as err:
+                logger.warning('Unable to save the profile of operation {0}: {1}'.format(operation, err))
+
+
+def _save_profile(config, summary, profilers):
+    directory = _get_profile_directory(config)
+    os.makedirs(directory, exist_ok=True)
+    profile_id = '{0}-{1}-{2}'.format(time.strftime('%Y%m%dT%H%M%S', time.gmtime(summary['started_at'])),
+                                      summary['operation'], uuid.uuid4().hex[:8])
+    summary['profile_id'] = profile_id
+    summary['profiled'] = bool(profilers)
+    if profilers:
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(os.path.join(directory, profile_id + '.prof'))
+    with open(os.path.join(directory, profile_id + '.json'), 'w') as summary_file:
+        json.dump(summary, summary_file)
+    logger.info('Saved profile {0}: wall {1}s, cpu {2}s, network wait {3}s'.format(
+        profile_id, summary['wall_time'], summary['cpu_time'], summary['network_wait']))
+    _prune_profiles(directory)
+
+
+def _list_profiles(directory):
+    if not os.path.isdir(directory):
+        return []
+    names = [name[:-len('.json')] for name in os.listdir(directory) if name.endswith('.json')]
+    return sorted(names, key=lambda name: os.path.getmtime(os.path.join(directory, name + '.json')), reverse=True)
+
+
+def _prune_profiles(directory):
+    with _profile_lock:
+        for profile_id in _list_profiles(directory)[PROFILE_MAX_ARTIFACTS:]:
+            for extension in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(directory, profile_id + extension))
+                except OSError:
+                    pass
+
+
+def _load_summary(directory, profile_id):
+    with open(os.path.join(directory, profile_id + '.json')) as summary_file:
+        return json.load(summary_file)
+
+
+def _top_functions(path, sort_by, limit):
+    stats = pstats.Stats(path, stream=StringIO())
+    stats.sort_stats(sort_by)
+    functions = []
+    for func in stats.fcn_list[:limit]:
+        primitive_calls, calls, total_time, cumulative_time, callers = stats.stats[func]
+        functions.append({'function': '{0}:{1}({2})'.format(*func), 'calls': calls,
+                          'total_time': round(total_time, 6), 'cumulative_time': round(cumulative_time, 6)})
+    return functions
+
+
+def get_operation_profiles(config, params):
+    try:
+        directory = _get_profile_directory(config)
+        profile_id = params.get('profile_id')
+        if not profile_id:
+            profiles = []
+            for name in _list_profiles(directory):
+                try:
+                    profiles.append(_load_summary(directory, name))
+                except (OSError, ValueError):
+                    continue
+            operation = params.get('operation')
+            if operation:
+                profiles = [item for item in profiles if item.get('operation') == operation]
+            return {'directory': directory, 'profiles': profiles}
+        profile_id = os.path.basename(profile_id)
+        if not os.path.exists(os.path.join(directory, profile_id + '.json')):
+            raise ConnectorError('Profile {0} not found in {1}'.format(profile_id, directory))
+        result = _load_summary(directory, profile_id)
+        path = os.path.join(directory, profile_id + '.prof')
+        if not os.path.exists(path):
+            return result
+        result['path'] = path
+        result['top_functions'] = _top_functions(path, params.get('sort_by') or 'cumulative',
+                                                 int(params.get('limit') or PROFILE_TOP_FUNCTIONS))
+        if params.get('include_raw'):
+            with open(path, 'rb') as profile_file:
+                result['raw_profile'] = base64.b64encode(profile_file.read()).decode()
+        return result
+    except Exception as Err:
+        raise ConnectorError(str(Err))
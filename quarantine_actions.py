@@ -35,7 +35,7 @@ def get_quarantine_hosts(config, params):
     try:
         vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
         param = {"vdom": vdom_list}
-        return _api_request(config, QUARANTINE_HOST_API, parameters=param, method="GET")
+        return _api_request(config, QUARANTINE_HOST_API, parameters=param, method="GET", stale_ok=True)
     except Exception as Err:
         raise ConnectorError(str(Err))
 
@@ -0,0 +1,271 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import ipaddress
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .address_compaction import AggregateMap, update_compacted_group
+from .application_actions import _get_app_block_profile, _iter_applications
+from .constants import *
+from .object_expansion import merge_intervals, subtract_intervals
+from .operation import _get_banned_ips, delete_bulk_address, extract_blocked_unblock_ips
+from .url_actions import get_web_filter
+from .utils import add_bulk_address
+from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list, _run_concurrently
+
+logger = get_logger('fortigate-firewall')
+
+
+class Reconciliation(object):
+    """Difference between the desired and the live entries of a block list.
+
+    Entries are compared by key (the normalized IP address, the URL or the application ID) and kept in
+    input order; ``remove`` is empty unless entries missing from the desired set are to be removed.
+    """
+
+    def __init__(self, desired, live, remove_extra=True):
+        self.desired = desired
+        self.live = live
+        add_keys = set(desired) - set(live)
+        remove_keys = set(live) - set(desired) if remove_extra else set()
+        self.add = [key for key in desired if key in add_keys]
+        self.remove = [key for key in live if key in remove_keys]
+        self.unchanged = len(set(desired) & set(live))
+
+    def report(self, added, removed, failed, dry_run):
+        return {
+            'desired': len(self.desired),
+            'live': len(self.live),
+            'unchanged': self.unchanged,
+            'to_add': [self.desired[key] for key in self.add],
+            'to_remove': [self.live[key] for key in self.remove],
+            'added': added,
+            'removed': removed,
+            'failed': failed,
+            'dry_run': dry_run
+        }
+
+
+def _normalize_ip(value):
+    try:
+        return ipaddress.ip_address(value.strip()).compressed
+    except ValueError:
+        return value.strip()
+
+
+def _chunks(items, size):
+    return [items[index:index + size] for index in range(0, len(items), size)]
+
+
+def _post_banned(config, endpoint, vdom_list, ip_list, data=None):
+    """POST the IP addresses to a ban endpoint in batches; returns the addresses of the failed batches."""
+    querystring = {'vdom': ','.join(vdom_list)} if vdom_list else {}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    batches = _chunks(ip_list, int(RECONCILE_BATCH_SIZE))
+    failed = []
+    for batch, response, error in _run_concurrently(config, lambda batch: _api_request(
+            config, endpoint, header=headers, parameters=querystring, method='POST',
+            body=dict(data or {}, ip_addresses=batch)), batches):
+        if error is not None or (isinstance(response, dict) and response.get('vdom_not_exist')):
+            logger.error('Failed to update {0} IP addresses with {1}: {2}'.format(
+                len(batch), endpoint, error or response))
+            failed += batch
+    return failed
+
+
+def _reconcile_banned_ips(config, params, vdom_list, desired, remove_extra, dry_run):
+    response = _get_banned_ips(config, vdom_list)
+    if response['vdom_not_exist'] or any('results' not in record for record in response['result']):
+        raise ConnectorError('Check VDOM/user or API key permission. Response: {}'.format(response))
+    live = {}
+    for record in response['result']:
+        for entry in record['results']:
+            live.setdefault(_normalize_ip(entry.get('ip_address', '')), entry.get('ip_address'))
+    diff = Reconciliation(desired, live, remove_extra)
+    if dry_run:
+        return diff.report([], [], [], dry_run)
+    to_add = [desired[key] for key in diff.add]
+    to_remove = [live[key] for key in diff.remove]
+    time_to_live = params.get('time_to_live') or 'Never'
+    duration = params.get('duration') if time_to_live == 'Custom Time' else int(time_to_live_values.get(time_to_live))
+    failed = _post_banned(config, BAN_IP_API, vdom_list, to_add, {'expiry': duration, 'src': 'ips'})
+    failed += _post_banned(config, REMOVE_BAN_API, vdom_list, to_remove)
+    failed_ips = set(failed)
+    return diff.report([ip for ip in to_add if ip not in failed_ips],
+                       [ip for ip in to_remove if ip not in failed_ips], failed, dry_run)
+
+
+def _is_single_ip(name):
+    try:
+        ipaddress.ip_address(name)
+        return True
+    except ValueError:
+        return False
+
+
+def _reconcile_compacted_group(config, vdom, ip_group_name, members, ip_type, desired, remove_extra, dry_run):
+    """Reconcile a group kept by Compact Blocked Addresses: desired addresses that no aggregate covers are
+    blocked, and covered addresses outside the desired set are unblocked, both through the compaction."""
+    family = 6 if ip_type == 'IPv6' else 4
+    aggregates = AggregateMap(members, family)
+    intervals = {}
+    for key, ip in desired.items():
+        network = ipaddress.ip_network(ip, strict=False)
+        intervals[key] = (int(network.network_address), int(network.broadcast_address))
+    to_add = [desired[key] for key, interval in intervals.items() if not aggregates.covers(*interval)]
+    extra = subtract_intervals(aggregates.covered, merge_intervals(intervals.values())) if remove_extra else []
+    address = ipaddress.IPv4Address if family == 4 else ipaddress.IPv6Address
+    to_remove = [str(network.network_address) if network.num_addresses == 1 else str(network)
+                 for start, end in extra for network in ipaddress.summarize_address_range(address(start), address(end))]
+    report = {'desired': len(desired), 'live': len(aggregates.managed), 'unchanged': len(desired) - len(to_add),
+              'to_add': to_add, 'to_remove': to_remove, 'added': [], 'removed': [], 'failed': [],
+              'dry_run': dry_run}
+    if dry_run or not (to_add or to_remove):
+        return report
+    try:
+        added, removed, still_blocked = update_compacted_group(config, vdom, ip_group_name, members, ip_type,
+                                                               block=to_add, unblock=to_remove)
+    except Exception as err:
+        logger.error('Failed to update address group {0}: {1}'.format(ip_group_name, err))
+        report['failed'] = to_add + to_remove
+        return report
+    report.update({'added': to_add, 'removed': [ip for ip in to_remove if ip not in still_blocked],
+                   'failed': still_blocked})
+    return report
+
+
+def _reconcile_address_group(config, params, vdom_list, desired, remove_extra, dry_run):
+    ip_group_name = params.get('ip_group_name')
+    ip_type = params.get('ip_type') or 'IPv4'
+    ip_list, members, vdom = extract_blocked_unblock_ips(
+        config, dict(params, ip=list(desired.values()), ip_type=ip_type), ip_group_name)
+    if isinstance(members, bool):
+        raise ConnectorError('Check Firewall Address permission to read the members of {0}.'.format(ip_group_name))
+    if config.get('compact_blocked_addresses'):
+        return _reconcile_compacted_group(config, vdom, ip_group_name, members, ip_type, desired, remove_extra,
+                                          dry_run)
+    # Only the address objects named by one IP address, as Block IP Address creates them, are reconciled;
+    # other members (objects created by hand, CIDR and range aggregates) stay in the group as they are
+    live = {_normalize_ip(name): name for name in members if _is_single_ip(name)}
+    diff = Reconciliation(desired, live, remove_extra)
+    if dry_run:
+        return diff.report([], [], [], dry_run)
+    member_set = set(members)
+    to_add = [desired[key] for key in diff.add if desired[key] not in member_set]
+    to_remove = [live[key] for key in diff.remove]
+    if not to_add and not to_remove:
+        return diff.report([], [], [], dry_run)
+    removed = set(to_remove)
+    member_names = [name for name in members if name not in removed] + to_add
+    if len(member_names) > MAX_GROUP_SIZE:
+        raise ConnectorError('Maximum {0} items exceeded for {1} group: the desired state has {2}.'.format(
+            MAX_GROUP_SIZE, ip_group_name, len(member_names)))
+    # New address objects are created concurrently; one that already exists is reused
+    _run_concurrently(config, lambda ip: add_bulk_address(config, vdom, ip_list=[ip], type=ip_type), to_add)
+    querystring = {'vdom': ','.join(vdom)} if vdom else {}
+    endpoint = ADDRESS_GROUP_API if 'IPv4' in ip_type else ADDRESS_GROUP_API_IPv6
+    try:
+        _api_request(config, endpoint.format(ip_group_name=ip_group_name.replace('/', '%2f')),
+                     parameters=querystring, method='PUT',
+                     body={'member': [{'name': name} for name in member_names]})
+    except Exception as err:
+        logger.error('Failed to update address group {0}: {1}'.format(ip_group_name, err))
+        return diff.report([], [], to_add + to_remove, dry_run)
+    # Objects still referenced elsewhere are kept, as by Unblock IP Address
+    _run_concurrently(config, lambda ip: delete_bulk_address(config, vdom, ip_list=[ip], type=ip_type), to_remove)
+    return diff.report(to_add, to_remove, [], dry_run)
+
+
+def _reconcile_urls(config, params, vdom_list, desired, remove_extra, dry_run):
+    url_filter = get_web_filter(config, params)
+    if not url_filter.get('results'):
+        raise ConnectorError('Check Web Filter permission to read the URL filter of {0}.'.format(
+            config.get('url_block_policy')))
+    entries = url_filter.get('results')[0].get('entries', [])
+    live = {entry.get('url'): entry.get('url') for entry in entries if entry.get('action') == 'block'}
+    diff = Reconciliation(desired, live, remove_extra)
+    if dry_run or not (diff.add or diff.remove):
+        return diff.report([], [], [], dry_run)
+    removed = set(diff.remove)
+    # Entries with other actions (allow, monitor, exempt) are left as they are
+    entries = [entry for entry in entries if not (entry.get('action') == 'block' and entry.get('url') in removed)]
+    entries += [{'status': 'enable',
+                 'exempt': 'av web-content activex-java-cookie dlp fortiguard range-block all',
+                 'web-proxy-profile': '', 'action': 'block', 'type': 'simple', 'url': url, 'referrer-host': ''}
+                for url in diff.add]
+    url_profile_id = url_filter.get('mkey')
+    response = _api_request(config, URL_FILTER + '/' + str(url_profile_id), method='PUT',
+                            body={'id': url_profile_id, 'name': config.get('url_block_policy'), 'entries': entries},
+                            parameters={'vdom': vdom_list})
+    if response.get('status') != 'success':
+        return diff.report([], [], diff.add + diff.remove, dry_run)
+    return diff.report(diff.add, diff.remove, [], dry_run)
+
+
+def _reconcile_applications(config, params, vdom_list, desired, remove_extra, dry_run):
+    if not config.get('app_block_policy'):
+        raise ConnectorError('Application control profile name is not defined in configuration parameter.')
+    profile = _get_app_block_profile(config, params).get('results')[0]
+    block_entries = [entry for entry in profile.get('entries', []) if entry.get('action') == 'block']
+    if not block_entries:
+        logger.error(APP_PERMISSION)
+        raise ConnectorError(APP_PERMISSION)
+    live_ids = [app.get('id') for entry in block_entries for app in entry.get('application', [])]
+    # One pass over the application catalog names both the desired and the blocked applications
+    wanted_ids = set(live_ids)
+    desired_ids, app_names = {}, {}
+    for app in _iter_applications(config, params):
+        if app.get('name') in desired:
+            desired_ids.setdefault(app.get('id'), app.get('name'))
+        if app.get('name') in desired or app.get('id') in wanted_ids:
+            app_names[app.get('id')] = app.get('name')
+    live = {app_id: app_names.get(app_id, app_id) for app_id in live_ids}
+    not_found = [name for name in desired if name not in set(desired_ids.values())]
+    diff = Reconciliation(desired_ids, live, remove_extra)
+    report = diff.report([], [], [], dry_run)
+    report['not_found'] = not_found
+    if dry_run or not (diff.add or diff.remove):
+        return report
+    removed = set(diff.remove)
+    for entry in block_entries:
+        entry['application'] = [app for app in entry.get('application', []) if app.get('id') not in removed]
+    block_entries[0]['application'] += [{'id': app_id, 'q_origin_key': app_id} for app_id in diff.add]
+    app_param = {'vdom': vdom_list} if vdom_list else {}
+    response = _api_request(config, BLOCK_APP.format(app_block_policy=config.get('app_block_policy')),
+                            parameters=app_param, method='PUT', body=profile)
+    if response.get('status') != 'success':
+        report['failed'] = report['to_add'] + report['to_remove']
+        return report
+    report.update({'added': report['to_add'], 'removed': report['to_remove']})
+    return report
+
+
+def reconcile_block_list(config, params):
+    try:
+        indicator_type = params.get('indicator_type')
+        if indicator_type not in RECONCILE_INDICATOR_TYPES:
+            raise ConnectorError('Indicator Type must be one of {0}'.format(', '.join(RECONCILE_INDICATOR_TYPES)))
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        remove_extra = params.get('remove_extra', True) not in (False, 'false', 'False')
+        dry_run = bool(params.get('dry_run'))
+        if indicator_type == 'IP Address':
+            desired = {_normalize_ip(ip): ip.strip() for ip in
+                       _get_list_from_str_or_list(params, 'desired_entries', is_ip=True)}
+            if params.get('method') == 'Policy Based':
+                result = _reconcile_address_group(config, params, vdom_list, desired, remove_extra, dry_run)
+            else:
+                result = _reconcile_banned_ips(config, params, vdom_list, desired, remove_extra, dry_run)
+        elif indicator_type == 'URL':
+            desired = {url.strip(): url.strip() for url in _get_list_from_str_or_list(params, 'desired_entries')}
+            result = _reconcile_urls(config, params, vdom_list, desired, remove_extra, dry_run)
+        else:
+            desired = {name.strip(): name.strip() for name in _get_list_from_str_or_list(params, 'desired_entries')}
+            result = _reconcile_applications(config, params, vdom_list, desired, remove_extra, dry_run)
+        result.update({'indicator_type': indicator_type, 'vdom': vdom_list[0] if vdom_list else None})
+        return result
+    except Exception as Err:
+        raise ConnectorError(str(Err))
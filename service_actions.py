@@ -6,6 +6,8 @@
 
 from connectors.core.connector import get_logger, ConnectorError
 
+from .cmdb_mirror import get_cached_response
+from .list_query import ListQuery
 from .utils import *
 from .utils import _validate_vdom, _api_request
 
@@ -42,10 +44,14 @@ def get_firewall_services(config, params):
         vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
 
         app_param = {'vdom': vdom_list} if vdom_list else {}
+        query = ListQuery(params)
         if params.get('name'):
-            return _api_request(config, '{}/{}'.format(FIREWALL_SERVICE_API, params.get('name').replace('/', '%2f')), parameters=app_param)
+            return query.read(config, '{}/{}'.format(FIREWALL_SERVICE_API, params.get('name').replace('/', '%2f')), app_param,
+                              stale_ok=True)
         else:
-            return _api_request(config, FIREWALL_SERVICE_API, parameters=app_param)
+            return query.read(config, FIREWALL_SERVICE_API, app_param,
+                              cached=get_cached_response(config, 'service', vdom_list), paginate=True,
+                              stale_ok=True)
     except Exception as Err:
         raise ConnectorError(str(Err))
 
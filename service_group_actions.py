@@ -6,6 +6,8 @@
 
 from connectors.core.connector import get_logger, ConnectorError
 
+from .cmdb_mirror import get_cached_response
+from .list_query import ListQuery
 from .utils import *
 from .utils import _validate_vdom, _api_request, _get_list_from_str_or_list
 
@@ -47,12 +49,15 @@ def get_service_groups(config, params, param=None, Flag=True):
         if Flag:
             vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
             param = {"vdom": vdom_list}
+        cached = None
         if params.get('name'):
             url = FIREWALL_SERVICE_GRP_API + '/{group_name}'.format(group_name=params.get('name').replace('/', '%2f'))
         else:
             url = FIREWALL_SERVICE_GRP_API
-        response = _api_request(config, url , parameters=param, method='GET',
-                                header={'accept': 'application/json'})
+            if Flag:
+                cached = get_cached_response(config, 'service_group', param.get('vdom'))
+        response = ListQuery(params).read(config, url, param, cached=cached, paginate=not params.get('name'),
+                                          method='GET', header={'accept': 'application/json'}, stale_ok=Flag)
         return response
     except Exception as Err:
         raise ConnectorError(str(Err))
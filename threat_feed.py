@@ -0,0 +1,248 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+import fcntl
+import http.client
+import ipaddress
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .address_compaction import AggregateMap, address_object, compact_intervals
+from .constants import *
+from .feed_server import FEED_NAME, FEED_SERVER_VERSION, feed_path
+from .object_expansion import merge_intervals, subtract_intervals
+from .utils import _api_request, _get_config, _validate_vdom, _get_list_from_str_or_list
+
+logger = get_logger('fortigate-firewall')
+
+FEED_SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feed_server.py')
+_server_lock = threading.Lock()
+_ensured = set()
+
+
+def _get_feed_directory(config):
+    return config.get('threat_feed_directory') or os.path.join(tempfile.gettempdir(), THREAT_FEED_DIRECTORY_NAME)
+
+
+def _bind_address(config):
+    """``threat_feed_bind_address``, or the local address of the interface the FortiGate is reached through."""
+    address = (config.get('threat_feed_bind_address') or '').strip()
+    if address:
+        return address
+    server_url, api_key, verify_ssl = _get_config(config)
+    host = urlsplit(server_url).hostname
+    try:
+        family, socktype, proto, canonname, sockaddr = socket.getaddrinfo(host, None, type=socket.SOCK_DGRAM)[0]
+        with socket.socket(family, socket.SOCK_DGRAM) as probe:
+            # Connecting a UDP socket only picks the route, nothing is sent
+            probe.connect((sockaddr[0], 443))
+            return probe.getsockname()[0]
+    except OSError as err:
+        raise ConnectorError('Unable to find the local address through which {0} is reached, specify Threat Feed '
+                             'Bind Address: {1}'.format(host, err))
+
+
+def _is_served(address, port, name):
+    """Whether the feed server answers for feed ``name``, rather than anything else listening on the port."""
+    connection = http.client.HTTPConnection(address, port, timeout=1)
+    try:
+        connection.request('HEAD', '/{0}.txt'.format(name))
+        response = connection.getresponse()
+        return response.status == 200 and (response.getheader('Server') or '').startswith(FEED_SERVER_VERSION)
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        connection.close()
+
+
+def ensure_feed_server(config, name):
+    """Start the feed server on ``threat_feed_port`` unless it already serves feed ``name`` there.
+
+    The server is a process of its own (see feed_server.py) rather than a thread of this worker, so it
+    keeps serving when the worker that started it is recycled, and the other workers find the port in
+    use and leave it be. It listens on the bind address only, never on all interfaces. Returns whether
+    the feed is served.
+    """
+    port = int(config.get('threat_feed_port') or 0)
+    if not port:
+        raise ConnectorError('Threat Feed Port is not defined in configuration parameter.')
+    address = _bind_address(config)
+    if _is_served(address, port, name):
+        return True
+    directory = _get_feed_directory(config)
+    with _server_lock:
+        if _is_served(address, port, name):
+            return True
+        subprocess.Popen([sys.executable, FEED_SERVER_SCRIPT, '--port', str(port), '--directory', directory,
+                          '--bind', address], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, close_fds=True, start_new_session=True)
+        deadline = time.monotonic() + THREAT_FEED_SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if _is_served(address, port, name):
+                logger.info('Serving threat feeds from {0} on {1}:{2}'.format(directory, address, port))
+                return True
+            time.sleep(0.1)
+    logger.warning('Threat feed server did not start on {0}:{1}; another service may hold the port'.format(
+        address, port))
+    return False
+
+
+def _normalize_domain(domain):
+    return domain.strip().lower().rstrip('.')
+
+
+def _read_feed(path):
+    if not os.path.isfile(path):
+        return []
+    with open(path, encoding='utf-8') as feed_file:
+        return [line.strip() for line in feed_file if line.strip() and not line.startswith('#')]
+
+
+def _write_feed(path, lines):
+    # Replaced in one step so the FortiGate never downloads a half written file
+    directory = os.path.dirname(path)
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix='.feed-')
+    with os.fdopen(handle, 'w', encoding='utf-8') as feed_file:
+        feed_file.write(''.join(line + '\n' for line in lines))
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, path)
+
+
+def _intervals(values):
+    intervals = []
+    for value in values:
+        network = ipaddress.ip_network(value.strip(), strict=False)
+        intervals.append((value, network.version, int(network.network_address), int(network.broadcast_address)))
+    return intervals
+
+
+def update_address_feed(lines, add, remove):
+    """Feed lines with ``add`` added and ``remove`` removed, as the fewest IP addresses, CIDRs and ranges.
+
+    Returns the lines and the indicators that were added (not in the feed yet) and removed (in it before).
+    """
+    add, remove = _intervals(dict.fromkeys(add)), _intervals(dict.fromkeys(remove))
+    result, added, removed = [], [], []
+    for family in (4, 6):
+        current = AggregateMap(lines, family)
+        family_add = [(value, start, end) for value, version, start, end in add if version == family]
+        family_remove = [(value, start, end) for value, version, start, end in remove if version == family]
+        added += [value for value, start, end in family_add if not current.covers(start, end)]
+        removed += [value for value, start, end in family_remove if current.overlaps(start, end)]
+        target = subtract_intervals(
+            merge_intervals(current.covered + [(start, end) for value, start, end in family_add]),
+            merge_intervals((start, end) for value, start, end in family_remove))
+        result += [address_object(family, start, end)[0] for start, end in compact_intervals(target, family, 100)]
+    return result, added, removed
+
+
+def update_domain_feed(lines, add, remove):
+    current = set(lines)
+    add = list(dict.fromkeys(_normalize_domain(domain) for domain in add))
+    remove = set(_normalize_domain(domain) for domain in remove)
+    added = [domain for domain in add if domain not in current]
+    removed = [domain for domain in remove if domain in current]
+    # Sorted by their labels from the top down, so the names of one domain stay together
+    return sorted((current | set(add)) - remove, key=lambda domain: domain.split('.')[::-1]), added, removed
+
+
+def _feed_url(config, name):
+    base_url = config.get('threat_feed_url')
+    if not base_url:
+        raise ConnectorError('Threat Feed URL is not defined in configuration parameter.')
+    return '{0}/{1}.txt'.format(base_url.rstrip('/'), name)
+
+
+def _ensure_external_resource(config, vdom, name, resource_type, resource, refresh_rate, category):
+    """Create the external resource of the feed, or point it at the feed; checked once per process."""
+    server_url, api_key, verify_ssl = _get_config(config)
+    key = (server_url, tuple(vdom), name, resource_type, resource, refresh_rate, category)
+    if key in _ensured:
+        return False
+    querystring = {'vdom': ','.join(vdom)} if vdom else {}
+    payload = {'name': name, 'type': resource_type, 'resource': resource, 'refresh-rate': refresh_rate,
+               'status': 'enable'}
+    if resource_type == 'domain':
+        payload['category'] = category
+    try:
+        response = _api_request(config, EXTERNAL_RESOURCE_API + '/' + name, parameters=querystring)
+        existing = response.get('results', [{}])[0] if isinstance(response, dict) else {}
+    except ConnectorError as err:
+        if RESOURCE_NOT_FOUND not in str(err):
+            raise
+        existing = None
+    if existing is None:
+        _api_request(config, EXTERNAL_RESOURCE_API, parameters=querystring, body=payload, method='POST')
+        created = True
+    else:
+        if any(str(existing.get(field)) != str(value) for field, value in payload.items()):
+            _api_request(config, EXTERNAL_RESOURCE_API + '/' + name, parameters=querystring, body=payload,
+                         method='PUT')
+        created = False
+    _ensured.add(key)
+    return created
+
+
+def _refresh_external_resource(config, vdom, name):
+    querystring = {'vdom': ','.join(vdom)} if vdom else {}
+    try:
+        _api_request(config, REFRESH_EXTERNAL_RESOURCE_API, parameters=querystring,
+                     body={'mkey': name, 'check_status_only': False}, method='POST')
+        return True
+    except Exception as err:
+        logger.warning('Unable to trigger the refresh of external resource {0}, it is fetched again within its '
+                       'refresh rate: {1}'.format(name, err))
+        return False
+
+
+def update_threat_feed(config, params):
+    try:
+        name = params.get('feed_name', '').strip()
+        if not FEED_NAME.match(name):
+            raise ConnectorError('Feed Name may only contain letters, digits, ".", "_" and "-", up to 35 characters.')
+        feed_type = params.get('feed_type') or 'IP Address'
+        if feed_type not in THREAT_FEED_TYPES:
+            raise ConnectorError('Feed Type must be one of {0}'.format(', '.join(THREAT_FEED_TYPES)))
+        vdom, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        is_ip = feed_type == 'IP Address'
+        add = _get_list_from_str_or_list(params, 'add_indicators', is_ip=is_ip)
+        remove = _get_list_from_str_or_list(params, 'remove_indicators', is_ip=is_ip)
+        resource = _feed_url(config, name)
+        directory = _get_feed_directory(config)
+        os.makedirs(directory, exist_ok=True)
+        path = feed_path(directory, name)
+        # Workers of other processes may update the same feed: the lock file orders them
+        with open(path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            lines = _read_feed(path)
+            previous_entries = len(lines)
+            update = update_address_feed if is_ip else update_domain_feed
+            lines, added, removed = update([] if params.get('replace_feed') else lines, add, remove)
+            _write_feed(path, lines)
+        try:
+            served = ensure_feed_server(config, name)
+        except Exception as err:
+            logger.warning('Unable to start the threat feed server: {0}'.format(err))
+            served = False
+        refresh_rate = int(params.get('refresh_rate') or THREAT_FEED_REFRESH_RATE)
+        created = _ensure_external_resource(config, vdom, name, THREAT_FEED_TYPES[feed_type], resource, refresh_rate,
+                                            int(params.get('category') or THREAT_FEED_DOMAIN_CATEGORY))
+        refreshed = bool(params.get('refresh', True)) and (added or removed or created) and \
+            _refresh_external_resource(config, vdom, name)
+        return {'feed_name': name, 'feed_type': feed_type, 'resource': resource,
+                'previous_entries': previous_entries, 'entries': len(lines),
+                'added': added, 'removed': removed, 'created': created, 'refreshed': bool(refreshed),
+                'served': served}
+    except Exception as Err:
+        raise ConnectorError(str(Err))
@@ -7,6 +7,7 @@
 from connectors.core.connector import get_logger, ConnectorError
 
 from .constants import *
+from .list_query import ListQuery
 from .utils import *
 from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list
 
@@ -97,13 +98,13 @@ def unblock_url(config, params):
         raise ConnectorError(Err)
 
 
-def get_web_filter(config, params):
+def get_web_filter(config, params, stale_ok=False):
     profile_name = config.get('url_block_policy')
     vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
     web_param = dict()
     web_param.update({'key': 'name', 'pattern': profile_name, 'vdom': vdom_list})
     if profile_name:
-        response = _api_request(config, GET_WEB_PROFILE, parameters=web_param)
+        response = _api_request(config, GET_WEB_PROFILE, parameters=web_param, stale_ok=stale_ok)
         if not response.get('results'):
             logger.exception('{0}'.format(response))
             raise ConnectorError(
@@ -113,7 +114,8 @@ def get_web_filter(config, params):
             logger.error(WEB_PERMISSION)
             raise ConnectorError(WEB_PERMISSION)
         url_table_id = response.get('results')[0].get('web', {}).get('urlfilter-table')
-        response = _api_request(config, URL_FILTER + '/' + str(url_table_id), parameters={'vdom': vdom_list})
+        response = _api_request(config, URL_FILTER + '/' + str(url_table_id), parameters={'vdom': vdom_list},
+                                stale_ok=stale_ok)
         return response
     else:
         raise ConnectorError("Web filter profile name not defined in configuration parameter.")
@@ -122,8 +124,9 @@ def get_web_filter(config, params):
 def get_blocked_urls(config, params):
     profile_name = config.get('url_block_policy')
     if profile_name:
-        response = get_web_filter(config, params)
-        return list(filter(lambda url_obj: url_obj.get("action") == "block",
-                           response.get("results", [])[0].get("entries"))) if response.get("results") else []
+        response = get_web_filter(config, params, stale_ok=True)
+        blocked_urls = list(filter(lambda url_obj: url_obj.get("action") == "block",
+                                   response.get("results", [])[0].get("entries"))) if response.get("results") else []
+        return ListQuery(params).filter_records(blocked_urls)
     else:
         raise ConnectorError("Web filter profile name not defined in configuration parameter.")
@@ -0,0 +1,88 @@
+""" Copyright start
+  Copyright (C) 2008 - 2024 Fortinet Inc.
+  All rights reserved.
+  FORTINET CONFIDENTIAL & FORTINET PROPRIETARY SOURCE CODE
+  Copyright end """
+
+from connectors.core.connector import get_logger, ConnectorError
+
+from .constants import *
+from .pagination import PageIterator
+from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list, _run_concurrently
+
+logger = get_logger('fortigate-firewall')
+
+POLICY_USAGE_COLUMNS = ['policyid', 'name', 'hit_count', 'last_used', 'first_used', 'bytes', 'packets',
+                        'active_sessions']
+OBJECT_USAGE_COLUMNS = ['name', 'policy_count', 'policies', 'hit_count', 'last_used', 'bytes']
+OBJECT_TABLES = {'address': ADD_ADDRESS, 'service': FIREWALL_SERVICE_API}
+
+
+def _get_pages(config, url, parameters, key):
+    """All results of a list endpoint, one per ``key``, read page by page with the next page prefetched."""
+    results = {}
+    for item in PageIterator(config, url, parameters, prefetch=True):
+        results.setdefault(item.get(key), item)
+    return list(results.values())
+
+
+def _get_policy_stats(config, vdom_list):
+    parameters = {'vdom': vdom_list[0]} if vdom_list else {}
+    stats = _get_pages(config, POLICY_STATS_API, parameters, 'policyid')
+    names = _get_pages(config, LIST_OF_POLICIES_API, dict(parameters, format='policyid|name'), 'policyid')
+    names = {item.get('policyid'): item.get('name') for item in names}
+    for item in stats:
+        item.setdefault('name', names.get(item.get('policyid')))
+    return stats
+
+
+def get_bulk_policy_usage(config, params):
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        stats = _get_policy_stats(config, vdom_list)
+        rows = [[item.get(column) for column in POLICY_USAGE_COLUMNS] for item in stats]
+        if params.get('unused_only'):
+            rows = [row for row in rows if not row[2]]
+        return {'vdom': vdom_list[0] if vdom_list else None, 'columns': POLICY_USAGE_COLUMNS, 'rows': rows}
+    except Exception as Err:
+        raise ConnectorError(str(Err))
+
+
+def _get_object_usage(config, vdom, object_type, name):
+    parameters = {'mkey': name, 'qtypes': OBJECT_USAGE_QTYPES[object_type]}
+    if vdom:
+        parameters['vdom'] = vdom
+    response = _api_request(config, OBJECT_USAGE_API, parameters=parameters)
+    results = response.get('results', {}) if isinstance(response, dict) else {}
+    return results.get('currently_using', []) if isinstance(results, dict) else []
+
+
+def get_bulk_object_usage(config, params):
+    try:
+        vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=True)
+        vdom = vdom_list[0] if vdom_list else None
+        object_type = (params.get('object_type') or 'Address').lower()
+        names = _get_list_from_str_or_list(params, 'names')
+        if not names:
+            parameters = {'vdom': vdom, 'format': 'name'} if vdom else {'format': 'name'}
+            names = [item.get('name') for item in _get_pages(config, OBJECT_TABLES[object_type], parameters, 'name')]
+        usage = _run_concurrently(config, lambda name: _get_object_usage(config, vdom, object_type, name), names)
+        policy_stats = {str(item.get('policyid')): item for item in _get_policy_stats(config, vdom_list)}
+        rows = []
+        errors = []
+        for name, references, error in usage:
+            if error is not None:
+                errors.append({'name': name, 'error': str(error)})
+                continue
+            policies = sorted({str(ref.get('mkey')) for ref in references
+                               if ref.get('path') == 'firewall' and ref.get('name') == 'policy'})
+            stats = [policy_stats[policyid] for policyid in policies if policyid in policy_stats]
+            last_used = [item.get('last_used') for item in stats if item.get('last_used')]
+            rows.append([name, len(policies), policies, sum(item.get('hit_count') or 0 for item in stats),
+                         max(last_used) if last_used else None, sum(item.get('bytes') or 0 for item in stats)])
+        if params.get('unused_only'):
+            rows = [row for row in rows if not row[1] or not row[3]]
+        return {'vdom': vdom, 'object_type': object_type, 'columns': OBJECT_USAGE_COLUMNS, 'rows': rows,
+                'errors': errors}
+    except Exception as Err:
+        raise ConnectorError(str(Err))
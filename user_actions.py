@@ -6,9 +6,11 @@
 
 from connectors.core.connector import get_logger, ConnectorError
 
+from .cmdb_mirror import get_cached_response
 from .constants import *
+from .list_query import ListQuery
 from .utils import *
-from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list
+from .utils import _api_request, _validate_vdom, _get_list_from_str_or_list, _get_system_events
 
 logger = get_logger('fortigate-firewall')
 
@@ -120,12 +122,14 @@ def get_users(config, params):
         if vdom_list:
             querystring.update({'vdom': ','.join(vdom_list)})
 
+        query = ListQuery(params)
         if params.get('name'):
-            response = _api_request(config, USER_API + str(params.get('name')), parameters=querystring, method='GET')
+            response = query.read(config, USER_API + str(params.get('name')), querystring, method='GET',
+                                  stale_ok=True)
         else:
-            querystring.update({'start': params.get('start'), 'count': params.get('count')})
-            data = {k: v for k, v in querystring.items() if v is not None and v != '' and v != {} and v != []}
-            response = _api_request(config, USER_API, parameters=data, method='GET')
+            # start/count are paged on the device, or on the mirror's rows when it serves the table
+            response = query.read(config, USER_API, querystring, cached=get_cached_response(config, 'user', vdom_list),
+                                  paginate=True, method='GET', stale_ok=True)
         return response
     except Exception as Err:
         raise ConnectorError(str(Err))
@@ -183,7 +187,7 @@ def delete_user(config, params):
 
 def get_user_list_login_details(config, params):
     try:
-        res = get_system_events(config, params={'filter': 'user=*{}, logdesc=*"Admin login successful"'.format(params.get('username'))})
+        res = _get_system_events(config, params={'filter': 'user=*{}, logdesc=*"Admin login successful"'.format(params.get('username'))}, limit=1)
         if len(res.get('results')) > 0:
             return res.get('results')[0]
         return {'message': 'Login details not found', 'response': res}
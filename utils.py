@@ -5,8 +5,10 @@
   Copyright end """
 
 import ipaddress
-import json
-from time import sleep
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from time import sleep, perf_counter
 from urllib.parse import quote_plus
 import requests
 
@@ -17,6 +19,9 @@ from .constants import SYSTEM_EVENTS
 
 logger = get_logger('fortigate-firewall')
 
+_sessions = {}
+_sessions_lock = threading.Lock()
+
 
 def generate_dict_from_list(input_val):
     final_lst = []
@@ -61,22 +66,131 @@ def _get_config(config):
     return server_url, api_key, verify_ssl
 
 
-def _api_request(config, url, header=None, body=None, parameters={}, method='get'):
+def _get_session(config, server_url):
+    """Keep-alive connection pool of a device, shared by all operations and threads of the worker process."""
+    with _sessions_lock:
+        session = _sessions.get(server_url)
+        if session is None:
+            session = requests.Session()
+            # Requests authenticate with the access token; don't let cookies carry state between them
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(
+                int(config.get('max_workers') or MAX_WORKERS), MAX_WORKERS))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[server_url] = session
+        return session
+
+
+def _get_timeout(config):
+    timeout = config.get('request_timeout')
+    return float(timeout) if timeout not in (None, '', 0) else None
+
+
+def _send_request(config, server_url, method, endpoint, verify_ssl, stale_ok=False, **kwargs):
+    """Send a request to the device, or to a secondary HA unit for ``stale_ok`` reads it can answer (see
+    ha_routing.py).
+
+    With ``hedged_reads`` a read that hasn't answered within its hedge delay is sent once more, to the
+    primary (see hedging.py), unless it is pinned to a secondary by a ``ReadSession``.
+    """
+    from .ha_routing import ReadSession, get_ha_router
+    from .hedging import hedged_request, is_hedged
+    from .json_codec import decode_response
+
+    def _send(target):
+        return _get_session(config, target).request(method, url=target + endpoint, verify=verify_ssl, **kwargs)
+
+    def _send_routed():
+        if member_url is not None:
+            try:
+                response = _send(member_url)
+                if response.status_code < 500 and response.status_code != 401:
+                    return response
+                router.mark_unhealthy(member_url, 'status code {0}'.format(response.status_code))
+                response.close()
+            except requests.exceptions.RequestException as err:
+                router.mark_unhealthy(member_url, err)
+            if pinned:
+                raise ConnectorError('HA member {0} failed in the middle of a multi-request read'.format(member_url))
+            if session is not None:
+                # The first request of the session: the rest follow it to the primary
+                session.member = None
+        return _send(server_url)
+
+    def _probe(member_url, probe_endpoint):
+        response = _get_session(config, member_url).get(
+            member_url + probe_endpoint, params={'access_token': config.get('api_key')}, verify=verify_ssl,
+            timeout=_get_timeout(config) or HA_PROBE_TIMEOUT)
+        response.raise_for_status()
+        return decode_response(response)
+
+    router = get_ha_router(config, server_url, _probe)
+    session = stale_ok if isinstance(stale_ok, ReadSession) else None
+    pinned = session is not None and session.started
+    member_url = router.read_address(method, endpoint, stale_ok) if router is not None else None
+    if is_hedged(config, method, endpoint) and (session is None or member_url is None):
+        # Only the winning copy's body is downloaded
+        kwargs['stream'] = True
+        return hedged_request(config, endpoint, _send_routed, lambda: _send(server_url))
+    return _send_routed()
+
+
+def _api_request(config, url, header=None, body=None, parameters=None, method='get', stream=False, stale_ok=False):
+    """Send one REST request and return the parsed response.
+
+    With ``stream=True`` a successful (or per-VDOM 403) response is returned as a ``ResultStream`` that
+    parses the ``results`` records while they are read from the socket; consume or close it to release
+    the connection. ``stale_ok`` lets a read go to a secondary HA unit; leave it off for reads whose
+    result is written back, and pass one ``ReadSession`` to the requests of a read that spans several.
+    """
+    # Imported on the first request rather than with the connector, like the rest of the request pipeline
+    from .cassette import get_cassette
+    from .json_codec import dumps, decode_response
+    from .json_stream import ResultStream
+    from .metrics import record_api_call, count_api_call
     try:
         server_url, api_key, verify_ssl = _get_config(config)
+        parameters = dict(parameters) if parameters else {}
         parameters.update({'access_token': api_key})
         logger.debug('body = {}'.format(body))
+        endpoint = url
         url = server_url + url
         logger.debug('{} url: {}'.format(method, url))
-        body = json.dumps(body) if body else None
-        api_response = requests.request(method, url=url, data=body, headers=header, params=parameters,
-                                        verify=verify_ssl)
+        body = dumps(body) if body else None
+        collect_metrics = config.get('collect_metrics')
+        cassette = get_cassette(config)
+        # Recording needs the whole body anyway; it is then handed to the stream parser in slices
+        stream_body = stream and not (cassette is not None and cassette.mode == 'record')
+        started = perf_counter()
+        try:
+            if cassette is not None and cassette.mode == 'replay':
+                api_response = cassette.replay(method, endpoint, parameters, body)
+            else:
+                api_response = _send_request(config, server_url, method, endpoint, verify_ssl, stale_ok, data=body,
+                                             headers=header, params=parameters, stream=stream_body,
+                                             timeout=_get_timeout(config))
+        except Exception as err:
+            count_api_call(perf_counter() - started)
+            if collect_metrics:
+                record_api_call(method, endpoint, type(err).__name__, perf_counter() - started, len(body or ''), 0)
+            raise
+        elapsed = perf_counter() - started
+        count_api_call(elapsed)
+        if cassette is not None and cassette.mode == 'record':
+            cassette.record(method, endpoint, parameters, body, api_response, elapsed)
+        if collect_metrics:
+            response_bytes = int(api_response.headers.get('Content-Length') or 0) if stream_body else len(
+                api_response.content)
+            record_api_call(method, endpoint, api_response.status_code, elapsed, len(body or ''), response_bytes)
         logger.debug('api_response: {}'.format(api_response.status_code))
+        if stream and (api_response.ok or api_response.status_code == 403):
+            return ResultStream(api_response.iter_content(STREAM_CHUNK_SIZE), on_close=api_response.close)
         if api_response.ok:
-            return api_response.json()
+            return decode_response(api_response)
         elif api_response.status_code == 403:
             try:
-                api_response = api_response.json()
+                api_response = decode_response(api_response)
                 vdom_not_exist = list(filter(lambda x: x.get('status') == 'error',
                                              api_response if isinstance(api_response, list) else [api_response]))
                 result = list(filter(lambda x: x.get('status') == 'success',
@@ -110,6 +224,63 @@ def _api_request(config, url, header=None, body=None, parameters={}, method='get
         raise ConnectorError(Err)
 
 
+def _run_concurrently(config, func, items):
+    """Call ``func(item)`` for every item on a bounded thread pool.
+
+    Returns ``(item, result, error)`` tuples in input order; a failing item doesn't stop the others.
+    """
+    def _call(item):
+        try:
+            return item, func(item), None
+        except Exception as err:
+            return item, None, err
+    from .metrics import propagate_invocation
+    items = list(items)
+    if not items:
+        return []
+    func = propagate_invocation(func)
+    max_workers = min(int(config.get('max_workers') or MAX_WORKERS), len(items))
+    if max_workers <= 1:
+        return [_call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_call, items))
+
+
+def _fan_out_vdoms(config, vdom_list, func):
+    """Call ``func(vdom)`` for every VDOM concurrently, at most ``max_workers`` at a time.
+
+    Returns the responses in ``vdom_list`` order; ``func(None)`` is called once when no VDOM is given. The
+    first error, in VDOM order, is raised once all calls have finished.
+    """
+    responses = []
+    for vdom, response, error in _run_concurrently(config, func, vdom_list or [None]):
+        if error is not None:
+            raise error
+        responses.append(response)
+    return responses
+
+
+def _merge_vdom_responses(responses, vdom_not_exists=None):
+    """Merge per-VDOM responses into ``{'result': [...], 'vdom_not_exist': [...]}``.
+
+    Accepts single responses, lists of them (several VDOMs in one request) and the 403 shape of
+    ``_api_request``; responses of VDOMs the caller may not access go to ``vdom_not_exist``, after the
+    VDOM names ``_validate_vdom`` already rejected.
+    """
+    merged = {'result': [], 'vdom_not_exist': list(vdom_not_exists or [])}
+    for response in responses:
+        if isinstance(response, dict) and 'vdom_not_exist' in response and 'result' in response:
+            merged['result'] += response['result']
+            merged['vdom_not_exist'] += response['vdom_not_exist']
+            continue
+        for item in response if isinstance(response, list) else [response]:
+            if isinstance(item, dict) and item.get('status') == 'error':
+                merged['vdom_not_exist'].append(item)
+            else:
+                merged['result'].append(item)
+    return merged
+
+
 def _get_vdom(config, params, check_multiple_vdom=False):
     try:
         vdom = []
@@ -131,13 +302,33 @@ def _get_vdom(config, params, check_multiple_vdom=False):
         raise ConnectorError(e)
 
 
+def _read_vdoms_concurrently(config, url, vdom_list, parameters=None):
+    """GET ``url`` once per VDOM in parallel rather than once for the comma-joined VDOMs, which FortiOS
+    answers one VDOM after the other. Returns the 403 shape of ``_api_request``; a VDOM whose request failed
+    counts as not accessible, unless all of them failed.
+    """
+    responses = []
+    calls = _run_concurrently(config, lambda vdom: _api_request(
+        config, url, parameters=dict(parameters or {}, vdom=vdom)), vdom_list)
+    for vdom, response, error in calls:
+        if error is not None:
+            if all(call[2] is not None for call in calls):
+                raise error
+            response = {'vdom': vdom, 'status': 'error', 'error': str(error)}
+        responses.append(response)
+    return _merge_vdom_responses(responses)
+
+
 def _validate_vdom(config, params, check_multiple_vdom=True):
     vdom_list = _get_vdom(config, params, check_multiple_vdom=check_multiple_vdom)
     querystring = {}
     if vdom_list:
         querystring.update({'vdom': ','.join(vdom_list)})
     try:
-        response = _api_request(config, LIST_VDOM, parameters=querystring)
+        if len(vdom_list) > 1:
+            response = _read_vdoms_concurrently(config, LIST_VDOM, vdom_list)
+        else:
+            response = _api_request(config, LIST_VDOM, parameters=querystring)
         list_vdom = response.get('result') if 'result' in response else response
         list_vdom = [list_vdom] if isinstance(list_vdom, dict) else list_vdom
         vdom_names = [i.get('vdom') for i in list_vdom]
@@ -189,7 +380,7 @@ def _get_list_from_str_or_list(params, parameter, is_ip=False):
         raise ConnectorError(Err)
 
 
-def get_address_grp(config, ip_group_name, vdom, Flag=False, type=''):
+def get_address_grp(config, ip_group_name, vdom, Flag=False, type='', stale_ok=False):
     querystring = {}
     if vdom:
         querystring.update({'vdom': ','.join(vdom)})
@@ -197,7 +388,8 @@ def get_address_grp(config, ip_group_name, vdom, Flag=False, type=''):
         url = ADDRESS_GROUP_API
     else:
         url = ADDRESS_GROUP_API_IPv6
-    response = _api_request(config, url.format(ip_group_name=ip_group_name.replace('/', '%2f')), parameters=querystring)
+    response = _api_request(config, url.format(ip_group_name=ip_group_name.replace('/', '%2f')), parameters=querystring,
+                            stale_ok=stale_ok)
     if response.get('results') and 'member' not in response.get('results')[0]:
         logger.error("Check Firewall Address permission to read group member.")
         return True
@@ -240,7 +432,7 @@ def get_address(ip_addr, config, querystring, ip_type='IPv4'):
         raise ConnectorError(str(Err))
 
 
-def add_bulk_address(config, vdom, ip_list, type=''):
+def add_bulk_address(config, vdom, ip_list, type='', comment=None):
     try:
         querystring = {}
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
@@ -256,6 +448,7 @@ def add_bulk_address(config, vdom, ip_list, type=''):
                 payload = {"name": ip_addr, "subnet": ip_addr + '/32'}
             else:
                 payload = {"name": ip_addr, "ip6": ip_addr}
+            payload["comment"] = comment or CONNECTOR_OBJECT_COMMENT
             try:
                 response = _api_request(config, endpoint, header=headers, parameters=querystring, body=payload,
                                         method='POST')
@@ -264,7 +457,9 @@ def add_bulk_address(config, vdom, ip_list, type=''):
                 result = result + pre_addr_obj
             except Exception as err:
                 logger.info('failed to create address object {0}, error is {1}'.format(payload, err))
-                pass
+                # An object left from an earlier block gets the expiry of this one, or loses the expiry of the
+                # earlier block when this one is permanent, so the sweep doesn't remove it
+                _update_address_comment(config, endpoint, querystring, ip_addr, comment)
         return result
     except Exception as Err:
         logger.error(str(Err))
@@ -275,6 +470,20 @@ def add_bulk_address(config, vdom, ip_list, type=''):
                                  format(type))
 
 
+def _update_address_comment(config, endpoint, querystring, name, comment):
+    try:
+        if not comment:
+            response = _api_request(config, endpoint + name, parameters=dict(querystring, format='name|comment'))
+            records = response if isinstance(response, list) else [response]
+            if not any(EXPIRY_COMMENT_MARKER in (row.get('comment') or '') for record in records
+                       for row in record.get('results') or []):
+                return
+            comment = CONNECTOR_OBJECT_COMMENT
+        _api_request(config, endpoint + name, parameters=querystring, body={"comment": comment}, method='PUT')
+    except Exception as err:
+        logger.info('failed to update comment of address object {0}, error is {1}'.format(name, err))
+
+
 def add_bulk_urls(config, vdom_list, url_list):
     try:
         querystring ={}
@@ -296,15 +505,39 @@ def add_bulk_urls(config, vdom_list, url_list):
 
 def get_country_names(config, params):
     try:
-        tmp_country_list = []
-        for item in country_list:
-            tmp_country_list.append(item.get('name', ''))
-        return tmp_country_list
+        from .country_catalog import get_country_catalog
+        return list(get_country_catalog(config).names)
     except Exception as Err:
         raise ConnectorError(str(Err))
 
 
+def _read_log_response(config, url, querystring, keep, limit):
+    # Log windows can hold tens of thousands of rows: parse them as they arrive and keep only what is asked
+    # for; the rest of the stream is still read because percent_logs_processed may follow the results.
+    stream = _api_request(config, url, parameters=querystring, stream=True)
+    results = []
+    for record in stream:
+        if limit is not None and len(results) >= limit:
+            continue
+        record = keep(record) if keep else record
+        if record is not None:
+            results.append(record)
+    response = dict(stream.envelope)
+    response['results'] = results
+    return response
+
+
 def get_system_events(config, params):
+    return _get_system_events(config, params)
+
+
+def _get_system_events(config, params, keep=None, limit=None):
+    """Log query of ``get_system_events`` with the records filtered while they are streamed.
+
+    ``keep(record)`` returns the record, a projection of it or None to drop it; at most ``limit`` records
+    are kept.
+    """
+    from .metrics import record_retry
     try:
         vdom_list, vdom_not_exists = _validate_vdom(config, params, check_multiple_vdom=False)
         querystring = {}
@@ -326,15 +559,16 @@ def get_system_events(config, params):
         params.pop('filter', None)
         data = {k: v for k, v in params.items() if v is not None and v != '' and v != {} and v != []}
         querystring.update(data)
-        response = _api_request(config, url, parameters=querystring)
+        response = _read_log_response(config, url, querystring, keep, limit)
         for i in range(MAX_RETRY):
             if response.get('percent_logs_processed') == 100:
                 break
             logger.info("Log precessed {0}%".format(response.get('percent_logs_processed')))
             logger.info("Retrying attempt: {0}".format(i+1))
+            record_retry(config, endpoint)
             sleep(5)
             querystring['session_id'] = response.get('session_id')
-            response = _api_request(config, url, parameters=querystring)
+            response = _read_log_response(config, url, querystring, keep, limit)
         else:
             raise ConnectorError("Log precessed {0}%".format(response.get('percent_logs_processed')))
         return response